@@ -0,0 +1,250 @@
+# Dictionary micro-benchmarks
+#
+# Measures the word index behind check_word_existence, filter_words, get_random_word,
+# the virtual player of every game mode, the inline prefix search, "did you mean" suggestions
+# and Words.update (build, snapshot save and load), on synthetic and real word lists.
+#
+# The bot package connects to Telegram and the database on import, so it is registered without running it
+# and only the dictionary modules are imported, as in the tests. Lookups go through the functions the bot calls,
+# on an index saved and loaded like the snapshot of Words.update.
+#
+# Usage:
+#   python benchmarks/dictionary.py --sizes 10000 100000 --output before.json
+#   python benchmarks/dictionary.py --wordlist tudien.txt --output after.json --compare before.json
+
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import types
+from string import ascii_lowercase
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 2_000_000]
+
+# Approximate English letter frequencies, used for synthetic word lists
+LETTER_FREQUENCIES = [
+    8.2, 1.5, 2.8, 4.3, 12.7, 2.2, 2.0, 6.1, 7.0, 0.15, 0.77, 4.0, 2.4,
+    6.7, 7.5, 1.9, 0.095, 6.0, 6.3, 9.1, 2.8, 0.98, 2.4, 0.15, 2.0, 0.074
+]
+
+
+def load_bot_module(name: str) -> Any:
+    for package in ("on9wordchainbot", "on9wordchainbot.models"):
+        if package not in sys.modules:
+            module = types.ModuleType(package)
+            module.__path__ = [os.path.join(ROOT, *package.split("."))]
+            sys.modules[package] = module
+    # Constants are read from config.json in the working directory
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        return importlib.import_module(name)
+    finally:
+        os.chdir(cwd)
+
+
+constants = load_bot_module("on9wordchainbot.constants")
+constraints = load_bot_module("on9wordchainbot.models.constraints")
+wordindex = load_bot_module("on9wordchainbot.wordindex")
+words_module = load_bot_module("on9wordchainbot.words")
+Words = words_module.Words
+
+
+def synthetic_words(n: int, seed: int) -> List[str]:
+    # n distinct lowercase words with English-like letter and length distributions
+    rng = np.random.default_rng(seed)
+    p = np.array(LETTER_FREQUENCIES) / sum(LETTER_FREQUENCIES)
+    words = set()
+    while len(words) < n:
+        batch = max(n - len(words), 1000)
+        lengths = np.clip(rng.poisson(8, batch), 2, 20)
+        letters = (rng.choice(26, size=(batch, 20), p=p) + ord("a")).astype(np.uint8).tobytes()
+        words.update(letters[i * 20:i * 20 + length].decode() for i, length in enumerate(lengths))
+    return sorted(words)[:n] if len(words) > n else sorted(words)
+
+
+def read_words(path: str) -> List[str]:
+    # Normalized like Words.update
+    with open(path, encoding="utf-8") as f:
+        return sorted({w for w in (line.rstrip("\r\n").lower() for line in f) if w.isalpha()})
+
+
+def rss_kb() -> int:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def percentiles(fn: Callable[[Any], Any], args: List[Any]) -> Dict[str, float]:
+    # Latency percentiles in microseconds of fn over args
+    times = []
+    for arg in args:
+        start = time.perf_counter_ns()
+        fn(arg)
+        times.append(time.perf_counter_ns() - start)
+    times = np.array(times) / 1000
+    return {
+        "calls": len(times),
+        "p50_us": round(float(np.percentile(times, 50)), 2),
+        "p90_us": round(float(np.percentile(times, 90)), 2),
+        "p99_us": round(float(np.percentile(times, 99)), 2),
+        "max_us": round(float(times.max()), 2)
+    }
+
+
+def run_size(words: List[str], iterations: int, seed: int) -> Dict[str, Any]:
+    # Runs in a fresh worker process so that peak RSS is measured per word list
+    random.seed(seed)
+    result: Dict[str, Any] = {"words": len(words)}
+    rss_start = rss_kb()
+
+    start = time.perf_counter()
+    index = wordindex.WordIndex.build(words)
+    result["build_s"] = round(time.perf_counter() - start, 3)
+    result["build_peak_rss_mb"] = round(rss_kb() / 1024, 1)
+    result["build_rss_increase_mb"] = round((rss_kb() - rss_start) / 1024, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dictionary.snapshot")
+        start = time.perf_counter()
+        index.save(path)
+        result["save_s"] = round(time.perf_counter() - start, 3)
+        result["snapshot_mb"] = round(os.path.getsize(path) / 1024 / 1024, 1)
+        del index
+        start = time.perf_counter()
+        index = wordindex.WordIndex.load(path)
+        result["load_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        Words.added = set()
+        Words.swap(index)
+
+        hits = random.choices(words, k=iterations)
+        misses = [w + "q" for w in random.choices(words, k=iterations)]
+        letters = random.choices(ascii_lowercase, k=iterations)
+        prefixes = [w[:3] for w in random.choices(words, k=iterations)]
+        typos = []
+        for w in random.choices(words, k=iterations):
+            i = random.randrange(len(w))
+            typos.append(w[:i] + random.choice(ascii_lowercase) + w[i + 1:])
+
+        # A game some way in, with a few hundred used words
+        used = words_module.UsedWords()
+        for word in random.sample(words, min(300, len(words))):
+            used.add(word)
+        banned = [random.sample(ascii_lowercase, 3) for _ in range(iterations)]
+        required = random.choices(ascii_lowercase, k=iterations)
+        search = words_module.PrefixSearch(maxsize=1, ttl=0)  # First page of a new search, not a cached one
+        hard = constants.VPDifficulty.HARD
+
+        def turn(i: int, **kwargs: Any) -> Any:
+            # Constraints of a turn, as made by the game modes
+            return constraints.TurnConstraints(letters[i], used_words=used, **kwargs)
+
+        turns = list(range(iterations))
+        latency = {
+            "check_word_existence_hit": percentiles(words_module.check_word_existence, hits),
+            "check_word_existence_miss": percentiles(words_module.check_word_existence, misses),
+            "filter_words": percentiles(lambda c: words_module.filter_words(min_len=3, prefix=c), letters[:100]),
+            "get_random_word": percentiles(lambda c: words_module.get_random_word(min_len=3, prefix=c), letters),
+            "inline_search_page": percentiles(lambda p: search.page(p, 0, 50), prefixes),
+            "did_you_mean": percentiles(Words.suggest, typos),
+            # Virtual player answer of each game mode, at the hard difficulty
+            "vp_classic": percentiles(lambda i: turn(i, min_len=3).strategic_word(hard), turns),
+            "vp_hard_mode": percentiles(lambda i: turn(i, min_len=10).strategic_word(hard), turns),
+            "vp_chaos": percentiles(lambda i: turn(i, min_len=3).strategic_word(hard), turns),
+            "vp_chosen_first_letter": percentiles(lambda i: turn(i, min_len=3).random_word(), turns),
+            "vp_random_first_letter": percentiles(lambda i: turn(i, min_len=3).random_word(), turns),
+            "vp_banned_letters": percentiles(
+                lambda i: turn(i, min_len=3, banned_letters=banned[i]).strategic_word(hard), turns
+            ),
+            "vp_required_letter": percentiles(
+                lambda i: turn(i, min_len=3, required_letter=required[i]).strategic_word(hard), turns
+            ),
+            # Elimination modes have no virtual player, their turns only count remaining answers (/hint)
+            "hint_elimination": percentiles(lambda i: turn(i).count(), turns),
+            "hint_banned_letters": percentiles(lambda i: turn(i, banned_letters=banned[i]).count(), turns)
+        }
+        result["latency"] = latency
+
+    result["peak_rss_mb"] = round(rss_kb() / 1024, 1)
+    return result
+
+
+def compare(baseline: Dict[str, Any], results: Dict[str, Any]) -> None:
+    # Print changes relative to a baseline result file, matched by word list and size
+    old = {(r["source"], r["words"]): r for r in baseline["results"]}
+    for r in results["results"]:
+        b = old.get((r["source"], r["words"]))
+        if not b:
+            continue
+        print(f"{r['source']} {r['words']} words")
+        rows = [(k, b[k], r[k]) for k in ("build_s", "save_s", "load_ms", "snapshot_mb", "peak_rss_mb") if k in b]
+        rows += [
+            (f"{name} p50_us", b["latency"][name]["p50_us"], stats["p50_us"])
+            for name, stats in r["latency"].items() if name in b["latency"]
+        ]
+        for name, before, after in rows:
+            change = f"{(after - before) / before * 100:+.1f}%" if before else "n/a"
+            print(f"  {name:<36} {before:>12} -> {after:<12} {change}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Dictionary micro-benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="word list sizes")
+    parser.add_argument("--wordlist", help="real word list (one word per line), sampled down to each size")
+    parser.add_argument("--iterations", type=int, default=2000, help="calls per latency measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args()
+
+    real = read_words(args.wordlist) if args.wordlist else None
+    results = []
+    # Fork: each size gets a fresh process for its peak RSS, without re-importing this script
+    ctx = multiprocessing.get_context("fork")
+    for size in args.sizes:
+        if real is not None:
+            if size > len(real):
+                print(f"Skipping {size}: word list only has {len(real)} words", file=sys.stderr)
+                continue
+            source = os.path.basename(args.wordlist)
+            words = sorted(random.Random(args.seed).sample(real, size))
+        else:
+            source = "synthetic"
+            words = synthetic_words(size, args.seed)
+        print(f"Benchmarking {size} words from {source}", file=sys.stderr)
+        with ctx.Pool(1) as pool:
+            result = pool.apply(run_size, (words, args.iterations, args.seed))
+        results.append({"source": source, **result})
+
+    output = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "iterations": args.iterations,
+        "seed": args.seed,
+        "results": results
+    }
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# Fake Telegram Bot API for local end-to-end tests of update ingestion
+#
+# Plays a classic game in a fake group against a locally running bot and reports the answer latency,
+# from the moment a player's answer is sent until the bot accepts it, for whichever mode the bot uses:
+# - polling: the answer is returned to a pending getUpdates call
+# - webhook: the answer is POSTed to the URL given to setWebhook, with its secret token
+#
+# Usage (the bot still needs its database, the first player is made the owner so that it can /forcestart):
+#   python benchmarks/fake_bot_api.py --wordlist tudien.txt --owner-id <OWNER_ID> --output polling.json
+#   BOT_API_SERVER=http://127.0.0.1:8081 python -m on9wordchainbot
+# and for webhook mode, start the bot with
+#   BOT_API_SERVER=http://127.0.0.1:8081 WEBHOOK_URL=http://127.0.0.1:8443 python -m on9wordchainbot
+
+import argparse
+import asyncio
+import json
+import random
+import re
+import sys
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import aiohttp
+import numpy as np
+from aiohttp import web
+
+TURN_PATTERN = re.compile(r"tg://user\?id=(\d+).*?bắt đầu bằng <i>(\w)</i>.*?(\d+) (?:letters|thư|từ)", re.DOTALL)
+
+
+class FakeBotAPI:
+    def __init__(self, group_id: int) -> None:
+        self.group_id = group_id
+        self.update_id = 0
+        self.message_id = 0
+        self.mode: Optional[str] = None  # Set once the bot polls or sets a webhook
+        self.ready = asyncio.Event()
+        self.webhook_url: Optional[str] = None
+        self.webhook_secret = ""
+        self.updates: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+        self.sent: "asyncio.Queue[str]" = asyncio.Queue()  # Texts of messages sent by the bot
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def chat(self, chat_id: int) -> Dict[str, Any]:
+        if chat_id < 0:
+            return {"id": chat_id, "type": "supergroup", "title": "Fake group"}
+        return {"id": chat_id, "type": "private", "first_name": f"Player {chat_id}"}
+
+    @staticmethod
+    def user(user_id: int, is_bot: bool = False) -> Dict[str, Any]:
+        return {
+            "id": user_id, "is_bot": is_bot, "first_name": f"{'Bot' if is_bot else 'Player'} {user_id}",
+            "username": f"fake{user_id}{'bot' if is_bot else ''}"
+        }
+
+    def message(self, chat_id: int, user: Dict[str, Any], text: str) -> Dict[str, Any]:
+        self.message_id += 1
+        message = {"message_id": self.message_id, "date": int(time.time()), "chat": self.chat(chat_id), "from": user}
+        if text:
+            message["text"] = text
+        if text.startswith("/"):
+            message["entities"] = [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}]
+        return message
+
+    async def handle(self, request: web.Request) -> web.Response:
+        bot_id = int(request.match_info["token"].partition(":")[0])
+        method = request.match_info["method"].lower()
+        params: Dict[str, Any] = dict(request.query)
+        if request.content_type == "application/json":
+            params.update(await request.json())
+        elif request.can_read_body:
+            params.update(await request.post())
+
+        if method == "getme":
+            result: Any = self.user(bot_id, is_bot=True)
+        elif method == "getupdates":
+            result = await self.get_updates(int(params.get("offset") or 0), float(params.get("timeout") or 0))
+        elif method == "setwebhook":
+            self.webhook_url = params["url"]
+            self.webhook_secret = params.get("secret_token", "")
+            self.mode = "webhook"
+            self.ready.set()
+            result = True
+        elif method in ("sendmessage", "editmessagetext"):
+            text = str(params.get("text", ""))
+            self.sent.put_nowait(text)
+            result = self.message(int(params["chat_id"]), self.user(bot_id, is_bot=True), text)
+        elif method == "getchat":
+            result = self.chat(int(params["chat_id"]))
+        elif method == "getchatmember":
+            result = {"user": self.user(int(params["user_id"])), "status": "creator", "is_anonymous": False}
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    async def get_updates(self, offset: int, timeout: float) -> List[Dict[str, Any]]:
+        if self.mode != "polling":
+            self.mode = "polling"
+            self.ready.set()
+        updates = []
+        try:
+            updates.append(await asyncio.wait_for(self.updates.get(), timeout))
+        except asyncio.TimeoutError:
+            return []
+        while not self.updates.empty():
+            updates.append(self.updates.get_nowait())
+        return [u for u in updates if u["update_id"] >= offset]
+
+    async def send(self, user_id: int, text: str) -> None:
+        # Deliver a message from a player in the group to the bot
+        self.update_id += 1
+        update = {"update_id": self.update_id, "message": self.message(self.group_id, self.user(user_id), text)}
+        if self.mode == "webhook":
+            async with self.session.post(
+                self.webhook_url, json=update, headers={"X-Telegram-Bot-Api-Secret-Token": self.webhook_secret}
+            ) as resp:
+                resp.raise_for_status()
+        else:
+            self.updates.put_nowait(update)
+
+    async def wait_for_text(self, pattern: str, timeout: float) -> str:
+        deadline = time.monotonic() + timeout
+        while True:
+            text = await asyncio.wait_for(self.sent.get(), max(deadline - time.monotonic(), 0))
+            if re.search(pattern, text, re.DOTALL):
+                return text
+
+
+async def play(api: FakeBotAPI, args: argparse.Namespace, words: Dict[str, List[str]]) -> List[float]:
+    players = [args.owner_id] + [args.owner_id + i for i in range(1, args.players)]
+    await api.send(players[0], "/startclassic")
+    await api.wait_for_text(r"/join", args.timeout)
+    for player in players[1:]:
+        await api.send(player, "/join")
+    await api.send(players[0], "/forcestart")
+
+    used: Set[str] = set()
+    latencies = []
+    text = await api.wait_for_text(TURN_PATTERN.pattern, args.timeout)
+    for _ in range(args.turns):
+        user_id, letter, min_len = TURN_PATTERN.search(text).groups()
+        candidates = [w for w in words.get(letter.lower(), []) if len(w) >= int(min_len) and w not in used]
+        if not candidates:
+            print(f"No word left for {letter}, stopping", file=sys.stderr)
+            break
+        word = random.choice(candidates)
+        used.add(word)
+
+        start = time.perf_counter()
+        await api.send(int(user_id), word.capitalize())
+        text = await api.wait_for_text(r"được chấp nhận", args.timeout)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if not TURN_PATTERN.search(text):  # Next turn prompt in a separate message
+            text = await api.wait_for_text(TURN_PATTERN.pattern, args.timeout)
+
+    await api.send(players[0], "/killgame")
+    return latencies
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Fake Bot API measuring answer latency")
+    parser.add_argument("--wordlist", required=True, help="words to answer with, one per line")
+    parser.add_argument("--owner-id", type=int, required=True, help="OWNER_ID of the bot, used as the first player")
+    parser.add_argument("--players", type=int, default=2)
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--group-id", type=int, default=-1001000000001)
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--timeout", type=float, default=90, help="seconds to wait for each bot message")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    words: Dict[str, List[str]] = {}
+    with open(args.wordlist, encoding="utf-8") as f:
+        for line in f:
+            word = line.strip().lower()
+            if word.isascii() and word.isalpha():  # Answers must match the answer handler pattern
+                words.setdefault(word[0], []).append(word)
+
+    api = FakeBotAPI(args.group_id)
+    app = web.Application()
+    app.router.add_route("*", "/bot{token}/{method}", api.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", args.port).start()
+    api.session = aiohttp.ClientSession()
+    print(f"Fake Bot API on http://127.0.0.1:{args.port}, waiting for the bot", file=sys.stderr)
+
+    try:
+        await api.ready.wait()
+        print(f"Bot is using {api.mode}", file=sys.stderr)
+        latencies = await play(api, args, words)
+    finally:
+        await api.session.close()
+        await runner.cleanup()
+
+    times = np.array(latencies) if latencies else np.zeros(1)
+    output = {
+        "mode": api.mode,
+        "answers": len(latencies),
+        "p50_ms": round(float(np.percentile(times, 50)), 2),
+        "p90_ms": round(float(np.percentile(times, 90)), 2),
+        "p99_ms": round(float(np.percentile(times, 99)), 2),
+        "max_ms": round(float(times.max()), 2)
+    }
+    text = json.dumps(output, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -46,3 +46,10 @@ CREATE TABLE wordlist (
     accepted BOOLEAN NOT NULL,
     reason TEXT
 );
+
+CREATE TABLE gamesnapshot (
+    group_id BIGINT PRIMARY KEY,
+    game_mode TEXT NOT NULL,
+    data JSONB NOT NULL,
+    saved_at TIMESTAMP NOT NULL
+);
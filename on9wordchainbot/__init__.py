@@ -5,10 +5,18 @@ from typing import Dict, TYPE_CHECKING
 
 import aiohttp
 import asyncpg
-from aiogram import Bot, Dispatcher, types
+from aiogram import Bot, types
+from aiogram.bot.api import TELEGRAM_PRODUCTION, TelegramAPIServer
+from aiogram.utils.exceptions import RetryAfter
 
-from .constants import DB_URI, ON9BOT_TOKEN, TOKEN
+from .constants import (BOT_API_SERVER, CHAT_MESSAGE_BURST, CHAT_MESSAGES_PER_MINUTE, DB_URI,
+                        GLOBAL_MESSAGES_PER_SECOND, ON9BOT_TOKEN, SHARDS, TOKEN, WEBHOOK_MAX_CONCURRENCY, WEBHOOK_URL)
+from .dispatcher import ChatOrderedDispatcher
 from .filters import filters
+from .gate import UpdateGate
+from .outbox import Outbox
+from .scheduler import DeadlineScheduler
+from .snapshots import GameSnapshots
 
 if TYPE_CHECKING:
     from .models import ClassicGame
@@ -30,11 +38,20 @@ else:
     asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 loop = asyncio.get_event_loop()
-bot = Bot(TOKEN, parse_mode=types.ParseMode.MARKDOWN)
-on9bot = Bot(ON9BOT_TOKEN)
-dp = Dispatcher(bot)
+api_server = TelegramAPIServer.from_base(BOT_API_SERVER) if BOT_API_SERVER else TELEGRAM_PRODUCTION
+bot = Bot(TOKEN, parse_mode=types.ParseMode.MARKDOWN, server=api_server)
+on9bot = Bot(ON9BOT_TOKEN, server=api_server)
+# Updates of a chat are handled in order, different chats in parallel
+dp = ChatOrderedDispatcher(bot, max_concurrency=WEBHOOK_MAX_CONCURRENCY if WEBHOOK_URL else None)
 session = aiohttp.ClientSession()
 pool: asyncpg.pool.Pool
+scheduler = DeadlineScheduler()  # Game timers
+game_snapshots = GameSnapshots()  # Saved game states, restored on startup
+# Game messages, each shard gets its part of the global limit
+outbox = Outbox(
+    CHAT_MESSAGES_PER_MINUTE / 60, CHAT_MESSAGE_BURST,
+    GLOBAL_MESSAGES_PER_SECOND / SHARDS, max(GLOBAL_MESSAGES_PER_SECOND // SHARDS, 1), RetryAfter
+)
 
 
 class GlobalState:
@@ -42,7 +59,9 @@ class GlobalState:
     maint_mode = False
 
     games: Dict[int, "ClassicGame"] = {}  # Group id mapped to game instance
-    games_lock: asyncio.Lock = asyncio.Lock()
+
+
+dp.gate = UpdateGate(GlobalState.games)  # Drops group chatter before it is queued
 
 
 async def init() -> None:
@@ -6,7 +6,10 @@ from decimal import ROUND_HALF_UP, getcontext
 from aiogram import executor
 from periodic import Periodic
 
-from on9wordchainbot import dp, loop, pool, session
+from on9wordchainbot import GlobalState, dp, game_snapshots, loop, pool, session
+from on9wordchainbot.constants import SHARD_ID, WEBHOOK_URL
+from on9wordchainbot.sharding import run_front, run_worker, sharded
+from on9wordchainbot.webhook import run_webhook
 from on9wordchainbot.words import Words
 
 random.seed(time.time())
@@ -14,20 +17,46 @@ getcontext().rounding = ROUND_HALF_UP
 
 
 async def on_startup(_) -> None:
-    await Words.update()
+    # In sharded mode, the front process keeps the dictionary up to date for the workers
+    if Words.load_snapshot():
+        # Start serving right away with the saved dictionary and refresh it in the background
+        await Words.update_rejected()
+        if not sharded():
+            asyncio.create_task(Words.update())
+    else:
+        await Words.update()
 
-    # Update word list every 3 hours
-    task = Periodic(3 * 60 * 60, Words.update)
-    await task.start()
+    # Resume games interrupted by the last shutdown or crash before handling the updates queued in the meantime
+    await game_snapshots.restore()
+
+    if not sharded():
+        # Update word list every 3 hours
+        task = Periodic(3 * 60 * 60, Words.update)
+        await task.start()
 
 
 async def on_shutdown(_) -> None:
+    # Save the latest state of every game
+    for game in GlobalState.games.values():
+        game_snapshots.mark(game)
+    await game_snapshots.flush()
+
     await asyncio.gather(session.close(), pool.close())
 
 
 def main() -> None:
+    if sharded():
+        if SHARD_ID is None:
+            run_front()
+        else:
+            run_worker(on_startup, on_shutdown)
+        return
+    if WEBHOOK_URL:
+        run_webhook(on_startup, on_shutdown)
+        return
+
     executor.start_polling(
-        dp, loop=loop, on_startup=on_startup, on_shutdown=on_shutdown, skip_updates=True
+        dp, loop=loop, on_startup=on_startup, on_shutdown=on_shutdown, skip_updates=False
     )
 
 
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class QueueStats:
+    # Time items spent queued before being handled, in seconds
+
+    __slots__ = ("handled", "dropped", "total_wait", "max_wait", "max_depth")
+
+    def __init__(self) -> None:
+        self.handled = 0
+        self.dropped = 0  # Queue full or waited too long
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.max_depth = 0
+
+    def add(self, wait: float) -> None:
+        self.handled += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+
+class ChatQueues:
+    # Handles the items of each chat one at a time in arrival order, and different chats in parallel
+    # Each chat with queued items has a task draining them, which ends once the queue is empty
+    # Queues are bounded in depth and in how long an item may wait, items beyond either are dropped
+
+    __slots__ = (
+        "handle", "max_depth", "max_wait", "max_concurrency", "_semaphore", "stats_size",
+        "_queues", "_tasks", "chat_stats", "stats"
+    )
+
+    def __init__(
+        self,
+        handle: Callable[[Any], Awaitable[Any]],
+        max_depth: int = 100,
+        max_wait: float = 30,
+        max_concurrency: Optional[int] = None,  # Items handled at once across chats, unbounded if None
+        stats_size: int = 10000  # Chats to keep queue stats of, least recently active ones are dropped
+    ) -> None:
+        self.handle = handle
+        self.max_depth = max_depth
+        self.max_wait = max_wait
+        self.max_concurrency = max_concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None  # Created on first use since it needs the event loop
+        self.stats_size = stats_size
+
+        # Chat id mapped to (time.monotonic() when queued, item) waiting to be handled
+        self._queues: Dict[int, Deque[Tuple[float, Any]]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.chat_stats: "OrderedDict[int, QueueStats]" = OrderedDict()
+        self.stats = QueueStats()  # All chats
+
+    def __len__(self) -> int:
+        # Chats with items queued or being handled
+        return len(self._queues)
+
+    def put(self, chat_id: int, item: Any) -> bool:
+        # False if the item was dropped since the queue of the chat is full
+        stats = self.get_chat_stats(chat_id)
+        queue = self._queues.get(chat_id)
+        if queue is None:
+            queue = self._queues[chat_id] = deque()
+            task = asyncio.create_task(self._drain(chat_id, queue))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif len(queue) >= self.max_depth:
+            stats.dropped += 1
+            self.stats.dropped += 1
+            return False
+
+        queue.append((time.monotonic(), item))
+        stats.max_depth = max(stats.max_depth, len(queue))
+        self.stats.max_depth = max(self.stats.max_depth, len(queue))
+        return True
+
+    def get_chat_stats(self, chat_id: int) -> QueueStats:
+        stats = self.chat_stats.get(chat_id)
+        if stats is None:
+            stats = self.chat_stats[chat_id] = QueueStats()
+            if len(self.chat_stats) > self.stats_size:
+                self.chat_stats.popitem(last=False)
+        else:
+            self.chat_stats.move_to_end(chat_id)
+        return stats
+
+    async def _drain(self, chat_id: int, queue: Deque[Tuple[float, Any]]) -> None:
+        if self.max_concurrency and not self._semaphore:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        while queue:
+            queued_at, item = queue.popleft()
+            wait = time.monotonic() - queued_at
+            stats = self.get_chat_stats(chat_id)
+            if wait > self.max_wait:
+                stats.dropped += 1
+                self.stats.dropped += 1
+                logger.warning(f"Dropped an item of {chat_id} after waiting {wait:.1f}s")
+                continue
+            stats.add(wait)
+            self.stats.add(wait)
+
+            try:
+                if self._semaphore:
+                    async with self._semaphore:
+                        await self.handle(item)
+                else:
+                    await self.handle(item)
+            except Exception:
+                logger.exception(f"Error while handling an item of {chat_id}")
+        # No await since the last check, so no item can have been queued in between
+        del self._queues[chat_id]
+
+    async def drain(self, timeout: float) -> None:
+        # Wait for queued items to be handled, on shutdown
+        if self._tasks:
+            logger.info(f"Waiting for the queues of {len(self._tasks)} chats to be handled")
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            if pending:
+                logger.warning(f"Queues of {len(pending)} chats still being handled after {timeout}s")
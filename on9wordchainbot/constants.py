@@ -23,6 +23,34 @@ VIP_GROUP = config["VIP_GROUP"]
 
 WORDLIST_SOURCE = "https://raw.githubusercontent.com/tmq247/noitutest/main/src/assets/tudien.txt"    #https://raw.githubusercontent.com/dwyl/english-words/master/words.txt
 
+# Compiled dictionary saved by the last word list build, loaded on startup
+DICTIONARY_SNAPSHOT_PATH = os.getenv("DICTIONARY_SNAPSHOT_PATH", "dictionary.snapshot")
+
+# Sharded mode (see sharding.py), number of worker processes, 1 to run everything in a single process
+SHARDS = int(os.getenv("SHARDS", "1"))
+# Set by the front process for the workers it starts
+SHARD_ID = int(os.environ["SHARD_ID"]) if "SHARD_ID" in os.environ else None
+SHARD_SECRET = os.getenv("SHARD_SECRET")  # Likewise, random for each run of the front
+SHARD_BASE_PORT = int(os.getenv("SHARD_BASE_PORT", "8700"))  # Worker i listens on localhost at this port + i
+
+# Webhook mode (see webhook.py), used instead of polling if WEBHOOK_URL is set to the public HTTPS base URL of the bot
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_HOST = os.getenv("WEBHOOK_HOST", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("PORT") or os.getenv("WEBHOOK_PORT", "8443"))  # Heroku assigns PORT
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET")  # Random for each run if unset
+WEBHOOK_MAX_CONCURRENCY = int(os.getenv("WEBHOOK_MAX_CONCURRENCY", "40"))  # Updates handled at once
+WEBHOOK_DRAIN_SECONDS = 30  # Time given to updates being handled to finish on shutdown
+
+# Bot API server to use instead of Telegram's, e.g. benchmarks/fake_bot_api.py
+BOT_API_SERVER = os.getenv("BOT_API_SERVER")
+
+# Outbound message limits (see outbox.py), Telegram allows about 20 messages per minute in a group
+# in bursts of a few, and 30 per second in total, shared by the shards
+CHAT_MESSAGES_PER_MINUTE = 20
+CHAT_MESSAGE_BURST = 5
+GLOBAL_MESSAGES_PER_SECOND = 30
+
 STAR = "\u2b50\ufe0f"
 
 
@@ -32,9 +60,27 @@ class GameState:
     KILLGAME = -1
 
 
+class MessagePriority:
+    # Order in which queued messages of a group are sent, lowest first
+    TURN = 0  # Turn prompts, the player's time only starts once it is sent
+    GAME = 1  # Joins, accepted words, eliminations, game start and end
+    REPLY = 2  # Rejection replies and hints
+    REMINDER = 3  # Joining phase countdown
+    ALL = (TURN, GAME, REPLY, REMINDER)
+
+
+class VPDifficulty:
+    # Virtual player strategies, chosen with /addvp <difficulty>
+    EASY = "easy"  # Random valid word
+    NORMAL = "normal"  # Prefers end letters that leave fewer replies
+    HARD = "hard"  # Always leaves the fewest replies
+    ALL = (EASY, NORMAL, HARD)
+
+
 class GameSettings:
     JOINING_PHASE_SECONDS = 60
     MAX_JOINING_PHASE_SECONDS = 180
+    JOINING_REMINDER_SECONDS = (60, 30, 15)  # Descending
     MIN_PLAYERS = 2
     MAX_PLAYERS = 50
     INCREASED_MAX_PLAYERS = 300
@@ -45,6 +91,7 @@ class GameSettings:
     MAX_WORD_LENGTH_LIMIT = 10
     WORD_LENGTH_LIMIT_INCREASE_PER_LIMIT_CHANGE = 1
     TURNS_BETWEEN_LIMITS_CHANGE = 5
+    VP_DIFFICULTY = VPDifficulty.NORMAL
 
     ELIM_JOINING_PHASE_SECONDS = 90
     ELIM_MIN_PLAYERS = 5
@@ -0,0 +1,67 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from aiogram import Dispatcher, types
+
+from .chatqueues import ChatQueues
+
+logger = logging.getLogger(__name__)
+
+
+def update_chat_id(update: types.Update) -> int:
+    # Chat an update belongs to, or the user for updates outside chats (inline queries, payments)
+    message = update.message or update.edited_message or update.channel_post or update.edited_channel_post
+    if message:
+        return message.chat.id
+    if update.callback_query:
+        if update.callback_query.message:
+            return update.callback_query.message.chat.id
+        return update.callback_query.from_user.id
+    chat_member = update.my_chat_member or update.chat_member
+    if chat_member:
+        return chat_member.chat.id
+    for query in (update.inline_query, update.chosen_inline_result, update.shipping_query, update.pre_checkout_query):
+        if query:
+            return query.from_user.id
+    return 0  # Polls
+
+
+class ChatOrderedDispatcher(Dispatcher):
+    # Handles the updates of each chat one at a time in arrival order, and different chats in parallel
+    # so that a slow handler only holds back its own chat, and handlers of a group never race each other
+    # Updates are queued in self.queues (see ChatQueues), which is bounded in depth and in how long an update may wait
+
+    def __init__(
+        self,
+        *args: Any,
+        max_queue_depth: int = 100,
+        max_queue_wait: float = 30,
+        max_concurrency: Optional[int] = None,  # Updates handled at once across chats, unbounded if None
+        stats_size: int = 10000,  # Chats to keep queue stats of, least recently active ones are dropped
+        **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        # Through updates_handler like aiogram's own process_updates, so update middlewares still apply
+        self.queues = ChatQueues(
+            self.updates_handler.notify, max_queue_depth, max_queue_wait, max_concurrency, stats_size
+        )
+        # Takes a raw update dict or an Update and returns whether to handle it, checked before queueing
+        self.gate: Optional[Callable[[Any], bool]] = None
+
+    async def process_updates(self, updates: List[types.Update], fast: bool = True) -> List[Any]:
+        # Called by polling, updates are only queued here
+        for update in updates:
+            if self.gate is None or self.gate(update):
+                self.enqueue(update)
+        return []
+
+    async def process_raw_updates(self, updates: List[Dict[str, Any]]) -> None:
+        # Updates received as JSON, only deserialized if they pass the gate
+        for update in updates:
+            if self.gate is None or self.gate(update):
+                self.enqueue(types.Update.to_object(update))
+
+    def enqueue(self, update: types.Update) -> None:
+        chat_id = update_chat_id(update)
+        if not self.queues.put(chat_id, update):
+            logger.warning(f"Update queue of {chat_id} is full, dropped update {update.update_id}")
@@ -0,0 +1,63 @@
+from typing import Any, Dict, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import ClassicGame
+
+GROUP_CHAT_TYPES = ("group", "supergroup")
+
+
+class UpdateGate:
+    # Drops group messages that no handler can act on before they are queued and run through the filter chain,
+    # which is most of them since groups chat far more than they play
+    # Only a command, a new member, or a word from the current player of a game in the group gets through
+    # Works on raw update dicts (webhook, sharded workers, before deserializing) as well as on aiogram objects,
+    # since both support item access, and only looks up a few keys
+    # Other updates (private chats, callback queries, inline queries...) always pass
+
+    __slots__ = ("games", "checked", "dropped")
+
+    def __init__(self, games: Dict[int, "ClassicGame"]) -> None:
+        self.games = games  # GlobalState.games
+        self.checked = 0  # Group messages
+        self.dropped = 0
+
+    def __call__(self, update: Any) -> bool:
+        if "message" in update:
+            message = update["message"]
+            edited = False
+        elif "edited_message" in update:
+            message = update["edited_message"]
+            edited = True
+        else:
+            return True
+
+        chat = message["chat"]
+        if chat["type"] not in GROUP_CHAT_TYPES:
+            return True
+        self.checked += 1
+
+        if "text" not in message:
+            if not edited and "new_chat_members" in message:
+                return True
+            self.dropped += 1
+            return False
+
+        first = message["text"][0]
+        if first == "/":
+            if edited:  # Only answers are handled when edited
+                self.dropped += 1
+                return False
+            return True
+
+        # Answers only consist of English letters (see answer_handler)
+        if not ("a" <= first <= "z" or "A" <= first <= "Z"):
+            self.dropped += 1
+            return False
+        game = self.games.get(chat["id"])
+        if not game or not game.players_in_game or "from" not in message:
+            self.dropped += 1
+            return False
+        if message["from"]["id"] != game.players_in_game[0].user_id:
+            self.dropped += 1
+            return False
+        return True
@@ -1,13 +1,14 @@
 import asyncio
 from re import Match
-from typing import Type
+from typing import Any, Dict, Optional, Type
 
 from aiogram import types
 from aiogram.dispatcher.filters import RegexpCommandsFilter
 
-from .. import GlobalState, dp, on9bot
+from .. import GlobalState, dp, game_snapshots, on9bot
 from ..constants import GameSettings, GameState, VIP, VIP_GROUP
 from ..models import ClassicGame, EliminationGame, GAME_MODES, MixedEliminationGame
+from ..sharding import call_shard, rpc_method, shard_of
 from ..utils import amt_donated, send_groups_only_message
 
 
@@ -54,13 +55,13 @@ async def start_game(message: types.Message, game_type: Type[ClassicGame]) -> No
         )
         return
 
-    async with GlobalState.games_lock:  # Avoid duplicate game creation
-        if group_id in GlobalState.games:
-            asyncio.create_task(GlobalState.games[group_id].join(message))
-        else:
-            game = game_type(message.chat.id)
-            GlobalState.games[group_id] = game
-            asyncio.create_task(game.main_loop(message))
+    # Updates of the group are handled one at a time, but a game may have migrated here during the awaits above
+    if group_id in GlobalState.games:
+        asyncio.create_task(GlobalState.games[group_id].join(message))
+    else:
+        game = game_type(message.chat.id)
+        GlobalState.games[group_id] = game
+        asyncio.create_task(game.main_loop(message))
 
 
 @dp.message_handler(RegexpCommandsFilter([r"^/(start[a-z]+)"]))
@@ -104,7 +105,7 @@ async def cmd_extend(message: types.Message) -> None:
 async def cmd_forcestart(message: types.Message) -> None:
     group_id = message.chat.id
     if GlobalState.games[group_id].state == GameState.JOINING:
-        GlobalState.games[group_id].time_left = -99999
+        GlobalState.games[group_id].set_timer(0)
 
 
 @dp.message_handler(game_running=True, commands="flee")
@@ -117,30 +118,55 @@ async def cmd_forceflee(message: types.Message) -> None:
     await GlobalState.games[message.chat.id].forceflee(message)
 
 
+@rpc_method
+async def kill_game(group_id: int) -> Optional[str]:
+    # Reply to /killgame if any, run by the shard owning the group
+    if group_id not in GlobalState.games:
+        return "`AssertionError: không có trò chơi chạy`"
+
+    GlobalState.games[group_id].state = GameState.KILLGAME
+    GlobalState.games[group_id].wakeup.set()
+    await asyncio.sleep(2)
+
+    # If game is still not terminated
+    if group_id in GlobalState.games:
+        del GlobalState.games[group_id]
+        game_snapshots.discard(group_id)
+        return "Trò chơi kết thúc do lỗi."
+    return None
+
+
+@rpc_method
+async def adopt_game(group_id: int, game_mode: str, data: Dict[str, Any]) -> None:
+    # Continue a game handed over by another shard after its group migrated to a supergroup with an id owned here
+    game = game_snapshots.resume(group_id, game_mode, data, "sau khi nhóm được nâng cấp")
+    game_snapshots.mark(game)
+
+
 @dp.message_handler(is_owner=True, commands=["killgame", "killgaym"])
 async def cmd_killgame(message: types.Message) -> None:
     try:
         group_id = int(message.get_args() or message.chat.id)
         assert group_id < 0, "smh"
-        assert group_id in GlobalState.games, "không có trò chơi chạy"
     except (ValueError, AssertionError) as e:
         await message.reply(f"`{e.__class__.__name__}: {e}`", allow_sending_without_reply=True)
         return
 
-    GlobalState.games[group_id].state = GameState.KILLGAME
-    await asyncio.sleep(2)
-
-    # If game is still not terminated
-    if group_id in GlobalState.games:
-        del GlobalState.games[group_id]
-        await message.reply("Trò chơi kết thúc do lỗi.", allow_sending_without_reply=True)
+    reply = await call_shard(shard_of(group_id), "kill_game", group_id=group_id)
+    if reply:
+        await message.reply(reply, allow_sending_without_reply=True)
 
 
 @dp.message_handler(is_owner=True, game_running=True, commands="forceskip")
 async def cmd_forceskip(message: types.Message) -> None:
     group_id = message.chat.id
     if GlobalState.games[group_id].state == GameState.RUNNING and not GlobalState.games[group_id].answered:
-        GlobalState.games[group_id].time_left = 0
+        GlobalState.games[group_id].set_timer(0)
+
+
+@dp.message_handler(game_running=True, commands="hint")
+async def cmd_hint(message: types.Message) -> None:
+    await GlobalState.games[message.chat.id].hint(message)
 
 
 @dp.message_handler(game_running=True, commands="addvp")
@@ -1,14 +1,16 @@
 import asyncio
 import time
 from datetime import datetime
+from typing import Any, Dict, List
 
 from aiogram import types
 from aiogram.dispatcher.filters import ChatTypeFilter, CommandHelp, CommandStart
 from aiogram.utils.deep_linking import get_start_link
 from aiogram.utils.markdown import quote_html
 
-from .. import GlobalState, bot, dp
-from ..constants import GameState
+from .. import GlobalState, bot, dp, outbox, scheduler
+from ..constants import GameState, MessagePriority, SHARDS
+from ..sharding import call_shards, rpc_method
 from ..utils import inline_keyboard_from_button, send_private_only_message
 from ..words import Words
 
@@ -104,8 +106,46 @@ async def cmd_chatid(message: types.Message) -> None:
     await message.reply(f"`{message.chat.id}`", allow_sending_without_reply=True)
 
 
+@rpc_method
+async def run_info() -> Dict[str, Any]:
+    # Counts of this process for /runinfo
+    return {
+        "games": len(GlobalState.games),
+        "running_games": len([g for g in GlobalState.games.values() if g.state == GameState.RUNNING]),
+        "players": sum(len(g.players) for g in GlobalState.games.values()),
+        "timers": len(scheduler),
+        "timers_fired": scheduler.fired,
+        "total_timer_lateness": scheduler.total_lateness,
+        "max_timer_lateness": scheduler.max_lateness,
+        "queued_chats": len(dp.queues),
+        "updates_handled": dp.queues.stats.handled,
+        "updates_dropped": dp.queues.stats.dropped,
+        "total_update_wait": dp.queues.stats.total_wait,
+        "max_update_wait": dp.queues.stats.max_wait,
+        "max_update_queue_depth": dp.queues.stats.max_depth,
+        "group_messages": dp.gate.checked,
+        "group_messages_dropped": dp.gate.dropped,
+        "outbox_queued": len(outbox),
+        "messages_sent": sum(stats.handled for stats in outbox.stats),
+        "total_message_wait": sum(stats.total_wait for stats in outbox.stats),
+        "max_message_wait": max(stats.max_wait for stats in outbox.stats),
+        "turn_prompts_sent": outbox.stats[MessagePriority.TURN].handled,
+        "total_turn_prompt_wait": outbox.stats[MessagePriority.TURN].total_wait,
+        "max_turn_prompt_wait": outbox.stats[MessagePriority.TURN].max_wait,
+        "messages_expired": sum(stats.dropped for stats in outbox.stats),
+        "retry_afters": outbox.retry_afters
+    }
+
+
 @dp.message_handler(commands="runinfo")
 async def cmd_runinfo(message: types.Message) -> None:
+    shards = await call_shards("run_info")
+    info = {key: sum(shard[key] for shard in shards) for key in shards[0]}
+    for key in (
+        "max_timer_lateness", "max_update_wait", "max_update_queue_depth", "max_message_wait", "max_turn_prompt_wait"
+    ):
+        info[key] = max(shard[key] for shard in shards)
+
     build_time_str = (
         "{0.day}/{0.month}/{0.year}".format(GlobalState.build_time)
         + " "
@@ -118,23 +158,54 @@ async def cmd_runinfo(message: types.Message) -> None:
             f"Build time: `{build_time_str}`\n"
             f"Uptime: `{uptime.days}.{str(uptime).rsplit(maxsplit=1)[-1]}`\n"
             f"Words in dictionary: `{Words.count}`\n"
-            f"Total games: `{len(GlobalState.games)}`\n"
-            f"Running games: `{len([g for g in GlobalState.games.values() if g.state == GameState.RUNNING])}`\n"
-            f"Players: `{sum(len(g.players) for g in GlobalState.games.values())}`"
+            f"Total games: `{info['games']}`\n"
+            f"Running games: `{info['running_games']}`\n"
+            f"Players: `{info['players']}`\n"
+            f"Timers: `{info['timers']}` pending, "
+            f"`{info['total_timer_lateness'] / max(info['timers_fired'], 1) * 1000:.1f}ms` avg / "
+            f"`{info['max_timer_lateness'] * 1000:.1f}ms` max lateness\n"
+            f"Update queues: `{info['queued_chats']}` chats, "
+            f"`{info['total_update_wait'] / max(info['updates_handled'], 1) * 1000:.1f}ms` avg / "
+            f"`{info['max_update_wait'] * 1000:.1f}ms` max wait, "
+            f"`{info['max_update_queue_depth']}` max depth, `{info['updates_dropped']}` dropped\n"
+            f"Group messages: `{info['group_messages_dropped']}` of `{info['group_messages']}` dropped unhandled\n"
+            f"Outbox: `{info['outbox_queued']}` queued, "
+            f"`{info['total_message_wait'] / max(info['messages_sent'], 1) * 1000:.1f}ms` avg / "
+            f"`{info['max_message_wait'] * 1000:.1f}ms` max wait "
+            f"(turn prompts `{info['total_turn_prompt_wait'] / max(info['turn_prompts_sent'], 1) * 1000:.1f}ms` / "
+            f"`{info['max_turn_prompt_wait'] * 1000:.1f}ms`), "
+            f"`{info['retry_afters']}` RetryAfter, `{info['messages_expired']}` expired"
+            + (f"\nShards: `{SHARDS}`" if SHARDS > 1 else "")
         ),
         allow_sending_without_reply=True
     )
 
 
+@rpc_method
+async def playing_groups() -> List[List[int]]:
+    # [group id, players in game, players, words, seconds left, max update queue wait in ms]
+    # of games in this process for /playinggroups
+    return [
+        [
+            group_id, len(game.players_in_game), len(game.players), game.turns, game.time_left,
+            round(dp.queues.chat_stats[group_id].max_wait * 1000) if group_id in dp.queues.chat_stats else 0
+        ]
+        for group_id, game in GlobalState.games.items()
+    ]
+
+
 @dp.message_handler(is_owner=True, commands="playinggroups")
 async def cmd_playinggroups(message: types.Message) -> None:
-    if not GlobalState.games:
+    games = [game for shard in await call_shards("playing_groups") for game in shard]
+    if not games:
         await message.reply("Không có nhóm nào đang chơi trò chơi.", allow_sending_without_reply=True)
         return
 
     groups = []
 
-    async def append_group(group_id: int) -> None:
+    async def append_group(
+        group_id: int, players_in_game: int, players: int, turns: int, time_left: int, max_wait: int
+    ) -> None:
         try:
             group = await bot.get_chat(group_id)
             url = await group.get_url()
@@ -152,19 +223,11 @@ async def cmd_playinggroups(message: types.Message) -> None:
             else:
                 text = f"<b>{group.title}</b>"
 
-        if group_id not in GlobalState.games:  # In case the game ended during API calls
-            return
-
         groups.append(
-            text + (
-                f" <code>{group_id}</code> "
-                f"{len(GlobalState.games[group_id].players_in_game)}/{len(GlobalState.games[group_id].players)}P "
-                f"{GlobalState.games[group_id].turns}W "
-                f"{GlobalState.games[group_id].time_left}s"
-            )
+            text + f" <code>{group_id}</code> {players_in_game}/{players}P {turns}W {time_left}s {max_wait}ms"
         )
 
-    await asyncio.gather(*[append_group(gid) for gid in GlobalState.games])
+    await asyncio.gather(*[append_group(*game) for game in games])
     await message.reply(
         "\n".join(groups), parse_mode=types.ParseMode.HTML,
         disable_web_page_preview=True, allow_sending_without_reply=True
@@ -1,6 +1,7 @@
 import asyncio
 import traceback
-from uuid import uuid4
+from hashlib import md5
+from typing import List, Optional
 
 from aiogram import types
 from aiogram.dispatcher.filters import ChatTypeFilter, CommandStart
@@ -8,11 +9,12 @@ from aiogram.utils.exceptions import (BadRequest, BotBlocked, BotKicked, CantIni
                                       MigrateToChat, RetryAfter, TelegramAPIError, Unauthorized)
 
 from .donation import send_donate_invoice
-from .. import GlobalState, bot, dp, pool
+from .. import GlobalState, bot, dp, game_snapshots, outbox, pool
 from ..constants import ADMIN_GROUP_ID, GameState, OFFICIAL_GROUP_ID, VIP
 from ..models import GAME_MODES
+from ..sharding import call_shards, rpc_method
 from ..utils import ADD_TO_GROUP_KEYBOARD, amt_donated, is_word, send_admin_group
-from ..words import Words
+from ..words import PrefixSearch
 
 
 @dp.message_handler(CommandStart(), ChatTypeFilter([types.ChatType.PRIVATE]))
@@ -53,9 +55,14 @@ async def cmd_feedback(message: types.Message) -> None:
     asyncio.create_task(message.reply("Đã gửi phản hồi thành công.", allow_sending_without_reply=True))
 
 
+@rpc_method
+async def set_maint_mode(on: bool) -> None:
+    GlobalState.maint_mode = on
+
+
 @dp.message_handler(is_owner=True, commands="maintmode")
 async def cmd_maintmode(message: types.Message) -> None:
-    GlobalState.maint_mode = not GlobalState.maint_mode
+    await call_shards("set_maint_mode", on=not GlobalState.maint_mode)
     await message.reply(
         f"Chế độ bảo trì đã được chuyển đổi {'on' if GlobalState.maint_mode else 'off'}.",
         allow_sending_without_reply=True
@@ -105,62 +112,63 @@ async def new_member(message: types.Message) -> None:
         )
 
 
+INLINE_RESULTS_PER_PAGE = 50  # Maximum allowed by Telegram
+inline_search = PrefixSearch(maxsize=1024, ttl=10 * 60)
+# Game mode results only depend on the bot username, built on first use
+game_mode_results: List[types.InlineQueryResultArticle] = []
+
+INVALID_QUERY_RESULT = types.InlineQueryResultArticle(
+    id="invalid",
+    title="Một truy vấn chỉ có thể bao gồm các bảng chữ cái",
+    description="Hãy thử một truy vấn khác",
+    input_message_content=types.InputTextMessageContent(r"¯\\_(ツ)\_/¯")
+)
+NO_RESULTS_RESULT = types.InlineQueryResultArticle(
+    id="noresults",
+    title="không có kết quả nào được tìm thấy",
+    description="Hãy thử một truy vấn khác",
+    input_message_content=types.InputTextMessageContent(r"¯\\_(ツ)\_/¯")
+)
+
+
 @dp.inline_handler()
 async def inline_handler(inline_query: types.InlineQuery):
     text = inline_query.query.lower()
     if not text or inline_query.from_user.id not in VIP and (await amt_donated(inline_query.from_user.id)) < 10:
-        results = []
-        for mode in GAME_MODES:
-            command = f"/{mode.command}@{(await bot.me).username}"
-            results.append(
+        if not game_mode_results:
+            username = (await bot.me).username
+            game_mode_results.extend(
                 types.InlineQueryResultArticle(
-                    id=str(uuid4()),
+                    id="mode:" + mode.command,
                     title="Start " + mode.name,
-                    description=command,
-                    input_message_content=types.InputTextMessageContent(command)
+                    description=f"/{mode.command}@{username}",
+                    input_message_content=types.InputTextMessageContent(f"/{mode.command}@{username}")
                 )
+                for mode in GAME_MODES
             )
-        await inline_query.answer(results, is_personal=not text)
+        await inline_query.answer(game_mode_results, is_personal=not text)
         return
 
     if not is_word(text):
-        await inline_query.answer(
-            [
-                types.InlineQueryResultArticle(
-                    id=str(uuid4()),
-                    title="Một truy vấn chỉ có thể bao gồm các bảng chữ cái",
-                    description="Hãy thử một truy vấn khác",
-                    input_message_content=types.InputTextMessageContent(r"¯\\_(ツ)\_/¯")
-                )
-            ],
-            is_personal=True
-        )
+        await inline_query.answer([INVALID_QUERY_RESULT], is_personal=True)
         return
 
-    res = []
-    for word in Words.dawg.iterkeys(text):
-        word = word.capitalize()
-        res.append(
-            types.InlineQueryResultArticle(
-                id=str(uuid4()),
-                title=word,
-                input_message_content=types.InputTextMessageContent(word)
-            )
-        )
-        if len(res) == 50:  # Max 50 results
-            break
-
-    if not res:  # No results
-        res.append(
-            types.InlineQueryResultArticle(
-                id=str(uuid4()),
-                title="không có kết quả nào được tìm thấy",
-                description="Hãy thử một truy vấn khác",
-                input_message_content=types.InputTextMessageContent(r"¯\\_(ツ)\_/¯")
-            )
+    offset = int(inline_query.offset) if inline_query.offset.isdecimal() else 0
+    words, next_offset = inline_search.page(text, offset, INLINE_RESULTS_PER_PAGE)
+    res = [
+        types.InlineQueryResultArticle(
+            # Deterministic ids within Telegram's 64-byte limit
+            id="word:" + md5(word.encode()).hexdigest(),
+            title=word.capitalize(),
+            input_message_content=types.InputTextMessageContent(word.capitalize())
         )
+        for word in words
+    ]
 
-    await inline_query.answer(res, is_personal=True)
+    if not res and not offset:  # No results
+        res.append(NO_RESULTS_RESULT)
+
+    await inline_query.answer(res, is_personal=True, next_offset=str(next_offset) if next_offset else "")
 
 
 @dp.callback_query_handler()
@@ -171,16 +179,13 @@ async def callback_query_handler(callback_query: types.CallbackQuery) -> None:
     await callback_query.answer()
 
 
-@dp.errors_handler(exception=Exception)
-async def error_handler(update: types.Update, error: TelegramAPIError) -> None:
-    if update.message and update.message.chat:
-        group_id = update.message.chat.id
-        if group_id in GlobalState.games:
-            asyncio.create_task(GlobalState.games[group_id].scan_for_stale_timer())
+async def handle_known_error(group_id: Optional[int], error: Exception) -> bool:
+    # Errors needing no report to the owner, True if error is one of them
+    # Shared by error_handler and failed messages posted through the outbox
 
     # Unimportant errors
     if isinstance(error, (BotKicked, BotBlocked, CantInitiateConversation, InvalidQueryID)):
-        return
+        return True
     if isinstance(error, BadRequest) and str(error) in (
         "Không có quyền gửi tin nhắn",
         "Không đủ quyền để gửi tin nhắn văn bản đến cuộc trò chuyện",
@@ -188,23 +193,28 @@ async def error_handler(update: types.Update, error: TelegramAPIError) -> None:
         "Chat_write_forbidden",
         "Channel_private"
     ):
-        return
+        return True
     if isinstance(error, Unauthorized):
         if str(error).startswith("Bị cấm: bot không phải là thành viên"):
-            return
+            return True
         if str(error).startswith("Bị cấm: bot đã bị kick"):
-            return
+            return True
     if str(error).startswith("Lỗi máy chủ nội bộ: tin nhắn đã gửi bị xóa ngay lập tức"):
-        return
+        return True
 
-    if isinstance(error, MigrateToChat):  # TODO: Test
+    if isinstance(error, MigrateToChat) and group_id is not None:
         # Migrate group running game and statistics
         if group_id in GlobalState.games:
-            GlobalState.games[error.migrate_to_chat_id] = GlobalState.games.pop(group_id)
-            GlobalState.games[error.migrate_to_chat_id].group_id = error.migrate_to_chat_id
-            asyncio.create_task(
-                send_admin_group(f"Trò chơi chuyển từ {group_id} to {error.migrate_to_chat_id}.")
-            )
+            try:
+                await game_snapshots.migrate(group_id, error.migrate_to_chat_id)
+            except Exception as e:
+                await bot.send_message(error.migrate_to_chat_id, "Trò chơi kết thúc do lỗi.")
+                await send_admin_group(
+                    f"Không thể chuyển trò chơi từ {group_id} to {error.migrate_to_chat_id}: "
+                    f"{e.__class__.__name__}: {e}"
+                )
+                raise
+            asyncio.create_task(send_admin_group(f"Trò chơi chuyển từ {group_id} to {error.migrate_to_chat_id}."))
         async with pool.acquire() as conn:
             await conn.execute(
                 "CẬP NHẬT BỘ game group_id = $1 Tại group_id = $2;",
@@ -217,6 +227,29 @@ async def error_handler(update: types.Update, error: TelegramAPIError) -> None:
             await conn.execute("XÓA TỪ trò chơi Ở Tại group_id = $1;", group_id)
             await conn.execute("XÓA TỪ người chơi ở Tại group_id = $1;", group_id)
         await send_admin_group(f"Thống kê nhóm đã di chuyển từ {group_id} to {error.migrate_to_chat_id}.")
+        return True
+    return False
+
+
+async def outbox_error_handler(chat_id: int, error: Exception) -> None:
+    # Messages posted through the outbox have no handler to raise to, nor an update to reply to
+    if await handle_known_error(chat_id, error):
+        return
+    await send_admin_group(
+        "<pre>"
+        + "".join(traceback.format_exception(type(error), error, error.__traceback__))
+        + f"@ {chat_id}</pre>",
+        parse_mode=types.ParseMode.HTML
+    )
+
+
+outbox.error_handler = outbox_error_handler
+
+
+@dp.errors_handler(exception=Exception)
+async def error_handler(update: types.Update, error: TelegramAPIError) -> None:
+    group_id = update.message.chat.id if update.message and update.message.chat else None
+    if await handle_known_error(group_id, error):
         return
 
     send_admin_msg = await send_admin_group(
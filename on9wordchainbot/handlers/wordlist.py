@@ -1,13 +1,14 @@
 
 import asyncio
-import time
+from typing import List, Optional, Tuple
 
 from aiogram import types
 
 from .. import bot, dp, pool
 from ..constants import WORD_ADDITION_CHANNEL_ID
-from ..utils import check_word_existence, has_star, is_word, send_admin_group
-from ..words import Words
+from ..sharding import call_shards, rpc_method
+from ..utils import has_star, is_word, send_admin_group
+from ..words import Words, check_word_existence, suggestions_text
 
 
 @dp.message_handler(commands=["exist", "exists"])
@@ -27,12 +28,45 @@ async def cmd_exists(message: types.Message) -> None:
             return
         word = rmsg.text.lower()
 
+    exists = check_word_existence(word)
     await message.reply(
-        f"_{word.capitalize()}_ là *{'' if check_word_existence(word) else 'not '}trong* từ điển của tôi.",
+        f"_{word.capitalize()}_ là *{'' if exists else 'not '}trong* từ điển của tôi."
+        + ("" if exists else suggestions_text(word)),
         allow_sending_without_reply=True
     )
 
 
+@rpc_method
+async def add_words(words: List[str]) -> None:
+    Words.add_words(words)
+
+
+@rpc_method
+async def reject_word(word: str, reason: Optional[str]) -> None:
+    Words.rejected[word] = reason
+
+
+def classify_words(words: List[str]) -> Tuple[List[str], List[str], List[str], List[Tuple[str, str]]]:
+    # Split words into new, existing, rejected and rejected with reason
+    # Existing and rejected words are formatted for replies
+    new = []
+    existing = []
+    rejected = []
+    rejected_with_reason = []
+    for w in words:
+        if check_word_existence(w):
+            existing.append("_" + w.capitalize() + "_")
+        elif w in Words.rejected:
+            reason = Words.rejected[w]
+            if reason:
+                rejected_with_reason.append(("_" + w.capitalize() + "_", reason))
+            else:
+                rejected.append("_" + w.capitalize() + "_")
+        else:
+            new.append(w)
+    return new, existing, rejected, rejected_with_reason
+
+
 @dp.message_handler(commands=["reqaddword", "reqaddwords"])
 async def cmd_reqaddword(message: types.Message) -> None:
     if message.forward_from:
@@ -56,25 +90,7 @@ async def cmd_reqaddword(message: types.Message) -> None:
         )
         return
 
-    existing = []
-    rejected = []
-    rejected_with_reason = []
-    for w in words_to_add[:]:  # Iterate through a copy so removal of elements is possible
-        if check_word_existence(w):
-            existing.append("_" + w.capitalize() + "_")
-            words_to_add.remove(w)
-
-    async with pool.acquire() as conn:
-        rej = await conn.fetch("CHỌN từ, lý do TỪ danh sách từ KHÔNG được chấp nhận;")
-    for word, reason in rej:
-        if word not in words_to_add:
-            continue
-        words_to_add.remove(word)
-        word = "_" + word.capitalize() + "_"
-        if reason:
-            rejected_with_reason.append((word, reason))
-        else:
-            rejected.append(word)
+    words_to_add, existing, rejected, rejected_with_reason = classify_words(words_to_add)
 
     text = ""
     if words_to_add:
@@ -108,25 +124,7 @@ async def cmd_addwords(message: types.Message) -> None:
         await message.reply("tại từ", allow_sending_without_reply=True)
         return
 
-    existing = []
-    rejected = []
-    rejected_with_reason = []
-    for w in words_to_add[:]:  # Cannot iterate while deleting
-        if check_word_existence(w):
-            existing.append("_" + w.capitalize() + "_")
-            words_to_add.remove(w)
-
-    async with pool.acquire() as conn:
-        rej = await conn.fetch("CHỌN từ, lý do TỪ danh sách từ KHÔNG được chấp nhận;")
-    for word, reason in rej:
-        if word not in words_to_add:
-            continue
-        words_to_add.remove(word)
-        word = "_" + word.capitalize() + "_"
-        if reason:
-            rejected_with_reason.append((word, reason))
-        else:
-            rejected.append(word)
+    words_to_add, existing, rejected, rejected_with_reason = classify_words(words_to_add)
 
     text = ""
     if words_to_add:
@@ -139,16 +137,13 @@ async def cmd_addwords(message: types.Message) -> None:
         text += f"{', '.join(rejected)} {'was' if len(rejected) == 1 else 'were'} vật bị loại bỏ.\n"
     for word, reason in rejected_with_reason:
         text += f"{word} đã bị từ chối. Lý do: {reason}.\n"
-    msg = await message.reply(text, allow_sending_without_reply=True)
+    await message.reply(text, allow_sending_without_reply=True)
 
     if not words_to_add:
         return
 
-    t = time.time()
-    await Words.update()
-    asyncio.create_task(
-        msg.edit_text(msg.md_text + f"\n\nDanh sách từ được cập nhật. Mất thời gian: `{time.time() - t:.3f}s`")
-    )
+    # Available right away, folded into the dictionary on the next scheduled rebuild
+    await call_shards("add_words", words=words_to_add)
     asyncio.create_task(
         bot.send_message(
             WORD_ADDITION_CHANNEL_ID,
@@ -175,6 +170,9 @@ async def cmd_rejword(message: types.Message) -> None:
                 reason.strip() or None
             )
 
+    if r is None:
+        await call_shards("reject_word", word=word, reason=reason.strip() or None)
+
     word = word.capitalize()
     if r is None:
         await message.reply(f"_{word}_ vật bị loại bỏ.", allow_sending_without_reply=True)
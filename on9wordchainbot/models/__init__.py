@@ -1,9 +1,16 @@
+from .constraints import TurnConstraints
 from .game import (BannedLettersGame, ChaosGame, ChosenFirstLetterGame, ClassicGame, EliminationGame, GAME_MODES,
                    HardModeGame, MixedEliminationGame, RequiredLetterGame)
+from .leaderboard import Leaderboard
 from .player import Player
+from .roster import PlayerRegistry, TurnQueue
 
 __all__ = (
     "Player",
+    "Leaderboard",
+    "PlayerRegistry",
+    "TurnQueue",
+    "TurnConstraints",
     "ClassicGame",
     "HardModeGame",
     "ChaosGame",
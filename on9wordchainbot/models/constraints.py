@@ -0,0 +1,75 @@
+from typing import FrozenSet, Iterable, List, Optional
+
+from ..words import UsedWords, check_word_existence, count_words, get_random_word, get_strategic_word, suggestions_text
+
+
+class TurnConstraints:
+    # Rules an answer must follow in a turn, produced by each game mode once per turn
+    # Used both to validate answers and to find candidates for the virtual player and /hint
+
+    __slots__ = ("prefix", "min_len", "used_words", "required_letter", "banned_letters", "_banned_set")
+
+    def __init__(
+        self,
+        prefix: str,
+        min_len: int = 1,
+        used_words: Optional[UsedWords] = None,
+        required_letter: Optional[str] = None,
+        banned_letters: Optional[Iterable[str]] = None
+    ) -> None:
+        self.prefix = prefix
+        self.min_len = min_len
+        self.used_words = used_words
+        self.required_letter = required_letter
+        self.banned_letters: List[str] = sorted(banned_letters) if banned_letters else []
+        self._banned_set: FrozenSet[str] = frozenset(self.banned_letters)
+
+    def rejection_reason(self, word: str) -> Optional[str]:
+        # Reply explaining why word is not a valid answer, None if it is
+        # Cheapest checks first, the dictionary lookup comes before letter rules as players care about it more
+        if not word.startswith(self.prefix):
+            return f"_{word.capitalize()}_ không bắt đầu với _{self.prefix.upper()}_."
+        if len(word) < self.min_len:
+            return f"_{word.capitalize()}_ có ít hơn {self.min_len} letters."
+        if self.used_words is not None and word in self.used_words:
+            return f"_{word.capitalize()}_ đã được dùng."
+        if not check_word_existence(word):
+            return (
+                f"_{word.capitalize()}_ không có trong danh sách các từ của tôi."
+                + suggestions_text(word, prefix=self.prefix)
+            )
+        if self._banned_set:
+            used_banned_letters = sorted(self._banned_set.intersection(word))
+            if used_banned_letters:
+                return (
+                    f"_{word.capitalize()}_ chứa các chữ cái bị cấm "
+                    f"({', '.join(c.upper() for c in used_banned_letters)})."
+                )
+        if self.required_letter and self.required_letter not in word:
+            return f"_{word.capitalize()}_ không bao gồm _{self.required_letter.upper()}_."
+        return None
+
+    def random_word(self) -> Optional[str]:
+        return get_random_word(
+            min_len=self.min_len,
+            prefix=self.prefix,
+            required_letter=self.required_letter,
+            banned_letters=self.banned_letters,
+            exclude_words=self.used_words,
+            answerable=True
+        )
+
+    def count(self) -> int:
+        return count_words(
+            min_len=self.min_len,
+            prefix=self.prefix,
+            required_letter=self.required_letter,
+            banned_letters=self.banned_letters,
+            exclude_words=self.used_words
+        )
+
+    def strategic_word(self, difficulty: str) -> Optional[str]:
+        # Letter-transition counts only capture the starting letter and minimum length
+        if self.required_letter or self.banned_letters or len(self.prefix) != 1 or self.used_words is None:
+            return self.random_word()
+        return get_strategic_word(self.prefix, self.min_len, self.used_words, difficulty)
@@ -1,12 +1,14 @@
 import random
 from datetime import datetime
 from string import ascii_lowercase
-from typing import List, Optional
+from typing import Any, Dict, List
 
 from aiogram import types
 
 from .classic import ClassicGame
-from ...utils import get_random_word
+from ..constraints import TurnConstraints
+from ...constants import MessagePriority
+from ...words import get_random_word
 
 
 class BannedLettersGame(ClassicGame):
@@ -21,7 +23,7 @@ class BannedLettersGame(ClassicGame):
 
     async def send_turn_message(self) -> None:
         await self.send_message(
-            (
+            self.with_announcement(
                 f"Lượt: {self.players_in_game[0].mention} (Next: {self.players_in_game[1].name})\n"
                 f"Từ của bạn phải bắt đầu bằng <i>{self.current_word[-1].upper()}</i>, "
                 f"<b>exclude</b> <i>{', '.join(c.upper() for c in self.banned_letters)}</i> và "
@@ -31,36 +33,26 @@ class BannedLettersGame(ClassicGame):
                 f"Người chơi còn lại: {len(self.players_in_game)}/{len(self.players)}\n"
                 f"Tổng số từ: {self.turns}"
             ),
-            parse_mode=types.ParseMode.HTML
+            parse_mode=types.ParseMode.HTML,
+            priority=MessagePriority.TURN
         )
 
-        # Reset per-turn attributes
-        self.answered = False
-        self.accepting_answers = True
-        self.time_left = self.time_limit
+        self.reset_turn()
+
+        if await self.handle_dead_end():
+            return
 
         if self.players_in_game[0].is_vp:
             await self.vp_answer()
 
-    def get_random_valid_answer(self) -> Optional[str]:
-        return get_random_word(
-            min_len=self.min_letters_limit,
+    def get_turn_constraints(self) -> TurnConstraints:
+        return TurnConstraints(
             prefix=self.current_word[-1],
-            banned_letters=self.banned_letters,
-            exclude_words=self.used_words
+            min_len=self.min_letters_limit,
+            used_words=self.used_words,
+            banned_letters=self.banned_letters
         )
 
-    async def additional_answer_checkers(self, word: str, message: types.Message) -> bool:
-        used_banned_letters = sorted(set(word) & set(self.banned_letters))
-        if used_banned_letters:
-            await message.reply(
-                f"_{word.capitalize()}_ chứa các chữ cái bị cấm "
-                f"({', '.join(c.upper() for c in used_banned_letters)}).",
-                allow_sending_without_reply=True
-            )
-            return False
-        return True
-
     def set_banned_letters(self) -> None:
         self.banned_letters.clear()  # Mode may occur multiple times in mixed elimination
 
@@ -96,3 +88,12 @@ class BannedLettersGame(ClassicGame):
             ),
             parse_mode=types.ParseMode.HTML
         )
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["banned_letters"] = self.banned_letters
+        return data
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        super().restore(data)
+        self.banned_letters = data["banned_letters"]
@@ -1,10 +1,10 @@
-import random
 from datetime import datetime
 
 from aiogram import types
 
 from .classic import ClassicGame
-from ...utils import get_random_word
+from ...constants import MessagePriority
+from ...words import get_random_word
 
 
 class ChaosGame(ClassicGame):
@@ -13,7 +13,7 @@ class ChaosGame(ClassicGame):
 
     async def send_turn_message(self) -> None:
         await self.send_message(
-            (
+            self.with_announcement(
                 f"Lượt: {self.players_in_game[0].mention}\n"
                 f"Từ của bạn phải bắt đầu bằng <i>{self.current_word[-1].upper()}</i> và "
                 f"bao gồm <b>at ít nhất {self.min_letters_limit} letters</b>.\n"
@@ -21,13 +21,14 @@ class ChaosGame(ClassicGame):
                 f"Người chơi còn lại: {len(self.players_in_game)}/{len(self.players)}\n"
                 f"Tổng số từ: {self.turns}"
             ),
-            parse_mode=types.ParseMode.HTML
+            parse_mode=types.ParseMode.HTML,
+            priority=MessagePriority.TURN
         )
 
-        # Reset per-turn attributes
-        self.answered = False
-        self.accepting_answers = True
-        self.time_left = self.time_limit
+        self.reset_turn()
+
+        if await self.handle_dead_end():
+            return
 
         if self.players_in_game[0].is_vp:
             await self.vp_answer()
@@ -44,13 +45,13 @@ class ChaosGame(ClassicGame):
     async def running_phase_tick(self) -> bool:
         if self.answered:
             # Move player who just answered to the end of queue
-            self.players_in_game.append(self.players_in_game.pop(0))
+            answered_player = self.players_in_game[0]
+            self.players_in_game.rotate()
 
             # Choose random player excluding the one who just answered
-            player = self.players_in_game.pop(random.randint(0, len(self.players_in_game) - 2))
+            player = self.players_in_game.random(exclude=answered_player)
         else:
-            self.time_left -= 1
-            if self.time_left > 0:
+            if not self.timer_expired():
                 return False
 
             # Timer ran out
@@ -59,16 +60,16 @@ class ChaosGame(ClassicGame):
                 f"{self.players_in_game[0].mention} đã hết thời gian! Họ đã bị loại.",
                 parse_mode=types.ParseMode.HTML
             )
-            del self.players_in_game[0]
+            self.players_in_game.pop_current()
 
             if len(self.players_in_game) == 1:
                 await self.handle_game_end()
                 return True
 
             # Choose random player
-            player = self.players_in_game.pop(random.randint(0, len(self.players_in_game) - 1))
+            player = self.players_in_game.random()
 
         # Move player to start of queue
-        self.players_in_game.insert(0, player)
+        self.players_in_game.move_to_front(player)
         await self.send_turn_message()
         return False
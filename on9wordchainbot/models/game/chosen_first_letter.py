@@ -1,6 +1,7 @@
 import random
 from datetime import datetime
 from string import ascii_lowercase
+from typing import Optional
 
 from aiogram import types
 
@@ -11,6 +12,16 @@ class ChosenFirstLetterGame(ClassicGame):
     name = "Trò chơi chữ cái đầu tiên được chọn"
     command = "startcfl"
 
+    def get_vp_answer(self) -> Optional[str]:
+        # Every answer starts with the chosen letter regardless of the end letter of the last word
+        return self.constraints.random_word()
+
+    def post_turn_processing(self, word: str) -> None:
+        # self.current_word is constant for ChosenFirstLetterGame
+        chosen_first_letter = self.current_word
+        super().post_turn_processing(word)
+        self.current_word = chosen_first_letter
+
     async def running_initialization(self) -> None:
         # Instead of storing the last used word like in other game modes,
         # self.current_word stores in the chosen first letter which is constant throughout the game
@@ -1,16 +1,23 @@
 import asyncio
+import functools
+import math
 import random
+import time
 from datetime import datetime
-from typing import Any, List, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
 
 from aiocache import cached
 from aiogram import types
 from aiogram.utils.exceptions import BadRequest
 
+from ..constraints import TurnConstraints
 from ..player import Player
-from ... import GlobalState, bot, on9bot, pool
-from ...constants import GameSettings, GameState, OWNER_ID
-from ...utils import ADD_ON9BOT_TO_GROUP_KEYBOARD, check_word_existence, get_random_word, send_admin_group
+from ..roster import PlayerRegistry, TurnQueue
+from ... import GlobalState, bot, game_snapshots, on9bot, outbox, pool, scheduler
+from ...constants import GameSettings, GameState, MessagePriority, OWNER_ID, VPDifficulty
+from ...scheduler import Timer
+from ...utils import ADD_ON9BOT_TO_GROUP_KEYBOARD
+from ...words import UsedWords, get_random_word
 
 
 class ClassicGame:
@@ -19,27 +26,37 @@ class ClassicGame:
 
     __slots__ = (
         "group_id", "players", "players_in_game", "state", "start_time", "end_time",
-        "extended_user_ids", "min_players", "max_players", "time_left", "time_limit",
+        "extended_user_ids", "deadline", "timer", "wakeup", "min_players", "max_players", "time_limit",
         "min_letters_limit", "current_word", "longest_word", "longest_word_sender_id",
-        "answered", "accepting_answers", "turns", "used_words", "join_lock"
+        "answered", "accepting_answers", "turns", "used_words", "constraints", "vp_difficulty", "announcement",
+        "loop_task"
     )
 
     def __init__(self, group_id: int) -> None:
         self.group_id = group_id
-        self.players: List[Player] = []
-        self.players_in_game: List[Player] = []
+        self.players = PlayerRegistry()
+        self.players_in_game = TurnQueue()  # Set when the game starts
         self.state = GameState.JOINING
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
         # Store user ids rather than Player object since players may quit then join to extend again
         self.extended_user_ids: Set[int] = set()
 
+        # Game timer
+        # The game loop sleeps on self.wakeup, which is set by self.timer when the current phase (joining phase
+        # or turn) reaches its deadline or a joining phase reminder is due, and when a turn ends early
+        self.deadline = 0.0  # time.monotonic() deadline of the current phase
+        self.timer: Optional[Timer] = None
+        self.wakeup = asyncio.Event()
+        self.loop_task: Optional[asyncio.Task] = None  # Running main_loop, see stop
+
         # Game settings
         self.min_players = GameSettings.MIN_PLAYERS
         self.max_players = GameSettings.MAX_PLAYERS
-        self.time_left = GameSettings.JOINING_PHASE_SECONDS
+        self.set_timer(GameSettings.JOINING_PHASE_SECONDS)
         self.time_limit = GameSettings.MAX_TURN_SECONDS
         self.min_letters_limit = GameSettings.MIN_WORD_LENGTH_LIMIT
+        self.vp_difficulty = GameSettings.VP_DIFFICULTY
 
         # Game attributes
         self.current_word: Optional[str] = None
@@ -48,16 +65,54 @@ class ClassicGame:
         self.answered = False
         self.accepting_answers = False
         self.turns = 0
-        self.used_words: Set[str] = set()
-
-        self.join_lock = asyncio.Lock()  # Prevent same user / vp joining as multiple players
+        self.used_words = UsedWords()
+        self.constraints: Optional[TurnConstraints] = None  # Set at the start of each turn
+        self.announcement = ""  # Accepted word, sent along with the next message (see with_announcement)
+
+    @property
+    def time_left(self) -> int:
+        # Seconds left in the current phase
+        return max(math.ceil(self.deadline - time.monotonic()), 0)
+
+    def timer_expired(self) -> bool:
+        return time.monotonic() >= self.deadline
+
+    def set_timer(self, seconds: float) -> None:
+        # Move the deadline of the current phase to seconds from now
+        self.deadline = time.monotonic() + seconds
+        self.schedule_wakeup()
+
+    def schedule_wakeup(self) -> None:
+        if self.timer:
+            self.timer.cancel()
+        delay = self.deadline - time.monotonic()
+        if self.state == GameState.JOINING:
+            # Wake up for the next "Xs left to /join" reminder first
+            for seconds in GameSettings.JOINING_REMINDER_SECONDS:
+                if delay > seconds:
+                    delay -= seconds
+                    break
+        self.timer = scheduler.schedule(delay, self.wakeup.set)
 
     def user_in_game(self, user_id: int) -> bool:
-        return any(p.user_id == user_id for p in self.players)
-
-    async def send_message(self, *args: Any, **kwargs: Any) -> types.Message:
-        return await bot.send_message(
-            self.group_id, *args, disable_web_page_preview=True,
+        return user_id in self.players
+
+    async def send_message(self, *args: Any, priority: int = MessagePriority.GAME, **kwargs: Any) -> types.Message:
+        # Through the outbox, so this waits longer when the group is at its message limit
+        return await outbox.send(self.group_id, self._send_message_call(args, kwargs), priority)
+
+    def post_message(
+        self, *args: Any, priority: int = MessagePriority.GAME, ttl: Optional[float] = None, **kwargs: Any
+    ) -> None:
+        # Same without waiting for the message to be sent, so that handlers do not hold back the next updates
+        # of the group, dropped if not sent within ttl seconds
+        outbox.post(self.group_id, self._send_message_call(args, kwargs), priority, ttl)
+
+    def _send_message_call(
+        self, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+    ) -> Callable[[], Awaitable[types.Message]]:
+        return functools.partial(
+            bot.send_message, self.group_id, *args, disable_web_page_preview=True,
             allow_sending_without_reply=True, **kwargs
         )
 
@@ -67,181 +122,175 @@ class ClassicGame:
         return user.is_chat_admin()
 
     async def join(self, message: types.Message) -> None:
-        async with self.join_lock:
-            if self.state != GameState.JOINING or len(self.players) >= self.max_players:
-                return
-
-            # Try to detect game not starting
-            if self.time_left < 0:
-                asyncio.create_task(self.scan_for_stale_timer())
-                return
+        if self.state != GameState.JOINING or len(self.players) >= self.max_players:
+            return
 
-            # Check if user already joined
-            user = message.from_user
-            if self.user_in_game(user.id):
-                return
+        # Check if user already joined
+        user = message.from_user
+        if self.user_in_game(user.id):
+            return
 
-            player = await Player.create(user)
-            self.players.append(player)
+        player = await Player.create(user)
+        # Checked again since the game loop may have joined the game starter in the meantime
+        if self.state != GameState.JOINING or len(self.players) >= self.max_players or self.user_in_game(user.id):
+            return
+        self.players.add(player)
+        game_snapshots.mark(self)
 
-            await self.send_message(
-                f"{player.name} joined. There {'is' if len(self.players) == 1 else 'are'} now "
-                f"{len(self.players)} player{'' if len(self.players) == 1 else 's'}.",
-                parse_mode=types.ParseMode.HTML
-            )
+        self.post_message(
+            f"{player.name} joined. There {'is' if len(self.players) == 1 else 'are'} now "
+            f"{len(self.players)} player{'' if len(self.players) == 1 else 's'}.",
+            parse_mode=types.ParseMode.HTML
+        )
 
-            # Start game when max players reached
-            if len(self.players) >= self.max_players:
-                self.time_left = -99999
+        # Start game when max players reached
+        if len(self.players) >= self.max_players:
+            self.set_timer(0)
 
     async def forcejoin(self, message: types.Message) -> None:
-        async with self.join_lock:
-            if self.state == GameState.KILLGAME or len(self.players) >= self.max_players:
-                return
-
-            if message.reply_to_message:
-                user = message.reply_to_message.from_user
-            else:
-                user = message.from_user
+        if self.state == GameState.KILLGAME or len(self.players) >= self.max_players:
+            return
 
-            # Check if user already joined
-            if self.user_in_game(user.id):
-                return
+        if message.reply_to_message:
+            user = message.reply_to_message.from_user
+        else:
+            user = message.from_user
 
-            player = await Player.create(user)
-            self.players.append(player)
-            if self.state == GameState.RUNNING:
-                self.players_in_game.append(player)
+        # Check if user already joined
+        if self.user_in_game(user.id):
+            return
 
-            await self.send_message(
-                f"{player.name} was forced to join. There {'is' if len(self.players) == 1 else 'are'} now "
-                f"{len(self.players)} player{'' if len(self.players) == 1 else 's'}.",
-                parse_mode=types.ParseMode.HTML
-            )
+        player = await Player.create(user)
+        if self.state == GameState.KILLGAME or len(self.players) >= self.max_players or self.user_in_game(user.id):
+            return
+        self.players.add(player)
+        game_snapshots.mark(self)
+        if self.state == GameState.RUNNING:
+            self.players_in_game.append(player)
+
+        self.post_message(
+            f"{player.name} was forced to join. There {'is' if len(self.players) == 1 else 'are'} now "
+            f"{len(self.players)} player{'' if len(self.players) == 1 else 's'}.",
+            parse_mode=types.ParseMode.HTML
+        )
 
-            # Start game when max players reached
-            if len(self.players) >= self.max_players:
-                self.time_left = -99999
+        # Start game when max players reached
+        if self.state == GameState.JOINING and len(self.players) >= self.max_players:
+            self.set_timer(0)
 
     async def flee(self, message: types.Message) -> None:
-        async with self.join_lock:
-            if self.state != GameState.JOINING:
-                return
+        if self.state != GameState.JOINING:
+            return
 
-            # Find player to remove
-            user_id = message.from_user.id
-            for i in range(len(self.players)):
-                if self.players[i].user_id == user_id:
-                    player = self.players.pop(i)
-                    break
-            else:
-                return
+        player = self.players.remove(message.from_user.id)
+        if not player:
+            return
+        game_snapshots.mark(self)
 
-            await self.send_message(
-                f"{player.name} fled. There {'is' if len(self.players) == 1 else 'are'} now "
-                f"{len(self.players)} player{'' if len(self.players) == 1 else 's'}.",
-                parse_mode=types.ParseMode.HTML
-            )
+        self.post_message(
+            f"{player.name} fled. There {'is' if len(self.players) == 1 else 'are'} now "
+            f"{len(self.players)} player{'' if len(self.players) == 1 else 's'}.",
+            parse_mode=types.ParseMode.HTML
+        )
 
     async def forceflee(self, message: types.Message) -> None:
-        async with self.join_lock:
-            # Player to be fled = Sender of replies message
-            if self.state != GameState.JOINING or not message.reply_to_message:
-                return
+        # Player to be fled = Sender of replies message
+        if self.state != GameState.JOINING or not message.reply_to_message:
+            return
 
-            # Find player to remove
-            user_id = message.reply_to_message.from_user.id
-            for i in range(len(self.players)):
-                if self.players[i].user_id == user_id:
-                    player = self.players.pop(i)
-                    break
-            else:
-                return
+        player = self.players.remove(message.reply_to_message.from_user.id)
+        if not player:
+            return
+        game_snapshots.mark(self)
 
-            await self.send_message(
-                f"{player.name} buộc phải chạy trốn. Ở đó {'is' if len(self.players) == 1 else 'are'} ngay "
-                f"{len(self.players)} người chơi {'' if len(self.players) == 1 else 's'}.",
-                parse_mode=types.ParseMode.HTML
-            )
+        self.post_message(
+            f"{player.name} buộc phải chạy trốn. Ở đó {'is' if len(self.players) == 1 else 'are'} ngay "
+            f"{len(self.players)} người chơi {'' if len(self.players) == 1 else 's'}.",
+            parse_mode=types.ParseMode.HTML
+        )
 
     async def addvp(self, message: types.Message) -> None:
-        async with self.join_lock:
-            if self.state != GameState.JOINING or len(self.players) >= self.max_players:
-                return
+        if self.state != GameState.JOINING or len(self.players) >= self.max_players:
+            return
 
-            # Check if On9Bot already joined
-            if any(p.is_vp for p in self.players):
-                return
+        # Check if On9Bot already joined
+        if on9bot.id in self.players:
+            return
 
-            # Check if vp adder is player/admin/owner
-            if (
-                message.from_user.id != OWNER_ID
-                and not self.user_in_game(message.from_user.id)
-                and not await self.is_admin(message.from_user.id)
-            ):
-                await self.send_message("Tưởng tượng không chơi")
-                return
+        # Check if vp adder is player/admin/owner
+        if (
+            message.from_user.id != OWNER_ID
+            and not self.user_in_game(message.from_user.id)
+            and not await self.is_admin(message.from_user.id)
+        ):
+            self.post_message("Tưởng tượng không chơi")
+            return
 
-            try:
-                vp = await bot.get_chat_member(self.group_id, on9bot.id)
-                # VP must be chat member
-                assert vp.is_chat_member() or vp.is_chat_admin()
-            except (BadRequest, AssertionError):
-                await self.send_message(
-                    f"Thêm vào [On9Bot](tg://user?id={on9bot.id}) ở đây để chơi như một người chơi ảo.",
-                    reply_markup=ADD_ON9BOT_TO_GROUP_KEYBOARD
-                )
-                return
+        try:
+            vp = await bot.get_chat_member(self.group_id, on9bot.id)
+            # VP must be chat member
+            assert vp.is_chat_member() or vp.is_chat_admin()
+        except (BadRequest, AssertionError):
+            self.post_message(
+                f"Thêm vào [On9Bot](tg://user?id={on9bot.id}) ở đây để chơi như một người chơi ảo.",
+                reply_markup=ADD_ON9BOT_TO_GROUP_KEYBOARD
+            )
+            return
 
-            vp = await Player.vp()
-            self.players.append(vp)
+        # Optional difficulty argument, e.g. /addvp hard
+        difficulty = message.get_args().lower() if message.is_command() else ""
+        if difficulty in VPDifficulty.ALL:
+            self.vp_difficulty = difficulty
 
-            await on9bot.send_message(self.group_id, "/join@" + (await bot.me).username)
-            await self.send_message(
-                (
-                    f"{vp.name} tham gia. Ở đó {'is' if len(self.players) == 1 else 'are'} ngay "
-                    f"{len(self.players)} người chơi{'' if len(self.players) == 1 else 's'}."
-                ),
-                parse_mode=types.ParseMode.HTML
-            )
+        vp = await Player.vp()
+        if self.state != GameState.JOINING or len(self.players) >= self.max_players or on9bot.id in self.players:
+            return
+        self.players.add(vp)
+        game_snapshots.mark(self)
+
+        await on9bot.send_message(self.group_id, "/join@" + (await bot.me).username)
+        self.post_message(
+            (
+                f"{vp.name} ({self.vp_difficulty}) tham gia. Ở đó {'is' if len(self.players) == 1 else 'are'} ngay "
+                f"{len(self.players)} người chơi{'' if len(self.players) == 1 else 's'}."
+            ),
+            parse_mode=types.ParseMode.HTML
+        )
 
-            # Start game when max players reached
-            if len(self.players) >= self.max_players:
-                self.time_left = -99999
+        # Start game when max players reached
+        if len(self.players) >= self.max_players:
+            self.set_timer(0)
 
     async def remvp(self, message: types.Message) -> None:
-        async with self.join_lock:
-            if self.state != GameState.JOINING:
-                return
+        if self.state != GameState.JOINING:
+            return
 
-            # Check if On9Bot has joined
-            if not any(p.is_vp for p in self.players):
-                return
+        # Check if On9Bot has joined
+        if on9bot.id not in self.players:
+            return
 
-            # Check if vp remover is player/admin
-            if (
-                message.from_user.id != OWNER_ID
-                and not self.user_in_game(message.from_user.id)
-                and not await self.is_admin(message.from_user.id)
-            ):
-                await self.send_message("giả lập không chơi")
-                return
+        # Check if vp remover is player/admin
+        if (
+            message.from_user.id != OWNER_ID
+            and not self.user_in_game(message.from_user.id)
+            and not await self.is_admin(message.from_user.id)
+        ):
+            self.post_message("giả lập không chơi")
+            return
 
-            for i in range(len(self.players)):
-                if self.players[i].is_vp:
-                    vp = self.players.pop(i)
-                    break
-            else:
-                return
+        vp = self.players.remove(on9bot.id)
+        if not vp:
+            return
+        game_snapshots.mark(self)
 
-            await on9bot.send_message(self.group_id, "/flee@" + (await bot.me).username)
-            await self.send_message(
-                (
-                    f"{vp.name} bỏ trốn. Ở đó {'is' if len(self.players) == 1 else 'are'} ngay "
-                    f"{len(self.players)} người chơi{'' if len(self.players) == 1 else 's'}."
-                ),
-                parse_mode=types.ParseMode.HTML
-            )
+        await on9bot.send_message(self.group_id, "/flee@" + (await bot.me).username)
+        self.post_message(
+            (
+                f"{vp.name} bỏ trốn. Ở đó {'is' if len(self.players) == 1 else 'are'} ngay "
+                f"{len(self.players)} người chơi{'' if len(self.players) == 1 else 's'}."
+            ),
+            parse_mode=types.ParseMode.HTML
+        )
 
     async def extend(self, message: types.Message) -> None:
         if self.state != GameState.JOINING:
@@ -253,7 +302,7 @@ class ClassicGame:
             and not self.user_in_game(message.from_user.id)
             and not await self.is_admin(message.from_user.id)
         ):
-            await self.send_message("Giả lập không chơi")
+            self.post_message("Giả lập không chơi")
             return
 
         # Each player can only extend once and only for 30 seconds except admins
@@ -269,7 +318,7 @@ class ClassicGame:
                 n = 30
                 is_neg = False
         elif message.from_user.id in self.extended_user_ids:
-            await self.send_message("Bạn chỉ có thể gia hạn một lần")
+            self.post_message("Bạn chỉ có thể gia hạn một lần")
             return
         else:
             self.extended_user_ids.add(message.from_user.id)
@@ -279,15 +328,15 @@ class ClassicGame:
         if is_neg:
             # Reduce joining phase time (admins only)
             if not await self.is_admin(message.from_user.id):
-                await self.send_message("Hãy tưởng tượng không phải là quản trị viên")
+                self.post_message("Hãy tưởng tượng không phải là quản trị viên")
                 return
 
             if n >= self.time_left:
                 # Start game immediately
-                self.time_left = -99999
+                self.set_timer(0)
             else:
-                self.time_left -= n
-                await self.send_message(
+                self.set_timer(self.deadline - time.monotonic() - n)
+                self.post_message(
                     f"Giai đoạn tham gia đã được giảm bởi {n}s.\n"
                     f"Bạn có {self.time_left}s để /join."
                 )
@@ -295,15 +344,15 @@ class ClassicGame:
             # Extend joining phase time
             # Max joining phase duration is capped
             added_duration = min(n, GameSettings.MAX_JOINING_PHASE_SECONDS - self.time_left)
-            self.time_left += added_duration
-            await self.send_message(
+            self.set_timer(self.deadline - time.monotonic() + added_duration)
+            self.post_message(
                 f"Giai đoạn gia nhập đã được mở rộng bởi {added_duration}s.\n"
                 f"Bạn có {self.time_left}s để /join."
             )
 
     async def send_turn_message(self) -> None:
         await self.send_message(
-            (
+            self.with_announcement(
                 f"Lượt: {self.players_in_game[0].mention} (Next: {self.players_in_game[1].name})\n"
                 f"Từ của bạn phải bắt đầu bằng <i>{self.current_word[-1].upper()}</i> và "
                 f"bao gồm <b>at least {self.min_letters_limit} letters</b>.\n"
@@ -311,92 +360,95 @@ class ClassicGame:
                 f"Người chơi còn lại: {len(self.players_in_game)}/{len(self.players)}\n"
                 f"Tổng số từ: {self.turns}"
             ),
-            parse_mode=types.ParseMode.HTML
+            parse_mode=types.ParseMode.HTML,
+            priority=MessagePriority.TURN
         )
 
-        # Reset per-turn attributes
-        self.answered = False
-        self.accepting_answers = True
-        self.time_left = self.time_limit
+        self.reset_turn()
+
+        if await self.handle_dead_end():
+            return
 
         if self.players_in_game[0].is_vp:
             await self.vp_answer()
 
-    def get_random_valid_answer(self) -> Optional[str]:
-        return get_random_word(
-            min_len=self.min_letters_limit,
+    def get_turn_constraints(self) -> TurnConstraints:
+        # To be overridden by other game modes
+        return TurnConstraints(
             prefix=self.current_word[-1],
-            exclude_words=self.used_words
+            min_len=self.min_letters_limit,
+            used_words=self.used_words
+        )
+
+    def reset_turn(self) -> None:
+        # Reset per-turn attributes
+        self.answered = False
+        self.accepting_answers = True
+        self.set_timer(self.time_limit)
+        self.constraints = self.get_turn_constraints()
+
+    async def handle_dead_end(self) -> bool:
+        # End the turn right away if no valid answer is left instead of waiting out the time limit
+        # True: Turn ended
+        if self.constraints.count() > 0:
+            return False
+        self.accepting_answers = False
+        self.set_timer(0)
+        await self.send_message(
+            f"Không còn từ hợp lệ nào cho {self.players_in_game[0].mention}!", parse_mode=types.ParseMode.HTML
+        )
+        return True
+
+    async def hint(self, message: types.Message) -> None:
+        if self.state != GameState.RUNNING or not self.constraints:
+            return
+        count = self.constraints.count()
+        reply = functools.partial(
+            message.reply, f"Còn *{count}* từ hợp lệ cho lượt này.", allow_sending_without_reply=True
         )
+        outbox.post(self.group_id, reply, MessagePriority.REPLY, ttl=10)
+
+    def get_vp_answer(self) -> Optional[str]:
+        return self.constraints.strategic_word(self.vp_difficulty)
 
     async def vp_answer(self) -> None:
-        # Wait before answering to prevent exceeding 20 msg/min message limit
-        # Also simulate thinking/input time like human players, wowzers
-        await asyncio.sleep(random.uniform(5, 8))
+        # Simulate thinking/input time like human players, wowzers
+        # The outbox keeps the group under its message limit
+        await asyncio.sleep(random.uniform(1, 3))
 
-        word = self.get_random_valid_answer()
+        word = self.get_vp_answer()
 
         if not word:  # No valid words to choose from
             await on9bot.send_message(self.group_id, "/forceskip bey")
-            self.time_left = 0
+            self.set_timer(0)
             return
 
         await on9bot.send_message(self.group_id, word.capitalize())
 
         self.post_turn_processing(word)
-        await self.send_post_turn_message(word)
-
-    async def additional_answer_checkers(self, word: str, message: types.Message) -> bool:
-        # To be overridden by other game modes
-        # True/False: valid/invalid answer
-        return True
+        self.announcement = self.post_turn_announcement(word)
 
     async def handle_answer(self, message: types.Message) -> None:
-        # Prevent circular imports
-        from .elimination import EliminationGame
-
         word = message.text.lower()
 
-        # Check if answer is invalid
-        if not word.startswith(self.current_word[-1]):
-            await message.reply(
-                f"_{word.capitalize()}_ không bắt đầu với _{self.current_word[-1].upper()}_.",
-                allow_sending_without_reply=True
-            )
-            return
-        # No minimum letters limit for elimination game modes
-        if not isinstance(self, EliminationGame) and len(word) < self.min_letters_limit:
-            await message.reply(
-                f"_{word.capitalize()}_ có ít hơn {self.min_letters_limit} letters.",
-                allow_sending_without_reply=True
-            )
-            return
-        if word in self.used_words:
-            await message.reply(f"_{word.capitalize()}_ đã được dùng.", allow_sending_without_reply=True)
-            return
-        if not check_word_existence(word):
-            await message.reply(
-                f"_{word.capitalize()}_ không có trong danh sách các từ của tôi.",
-                allow_sending_without_reply=True
+        reason = self.constraints.rejection_reason(word)
+        if reason:
+            # Not worth holding back the next answers for, nor sending late
+            outbox.post(
+                self.group_id, functools.partial(message.reply, reason, allow_sending_without_reply=True),
+                MessagePriority.REPLY, ttl=10
             )
             return
-        if not await self.additional_answer_checkers(word, message):
-            return
 
+        # Nothing awaited, the game loop sends the announcement with the next turn prompt
         self.post_turn_processing(word)
-        await self.send_post_turn_message(word)
+        self.announcement = self.post_turn_announcement(word)
 
     def post_turn_processing(self, word: str) -> None:
-        # Prevent circular imports
-        from .chosen_first_letter import ChosenFirstLetterGame
-
         # Update attributes
         self.used_words.add(word)
         self.turns += 1
-
-        # self.current_word is constant for ChosenFirstLetterGame
-        if not isinstance(self, ChosenFirstLetterGame):
-            self.current_word = word
+        self.current_word = word
 
         self.players_in_game[0].word_count += 1
         self.players_in_game[0].letter_count += len(word)
@@ -410,26 +462,37 @@ class ClassicGame:
         # Set per-turn attributes
         self.answered = True
         self.accepting_answers = False
+        self.wakeup.set()  # Move on to the next turn without waiting for the deadline
 
-    async def send_post_turn_message(self, word: str) -> None:
-        text = f"_{word.capitalize()}_ được chấp nhận.\n\n"
+    def post_turn_announcement(self, word: str) -> str:
+        # Also changes the limits every set number of turns
+        text = f"<i>{word.capitalize()}</i> được chấp nhận."
         # Reduce limits if possible every set number of turns
         if self.turns % GameSettings.TURNS_BETWEEN_LIMITS_CHANGE == 0:
             if self.time_limit > GameSettings.MIN_TURN_SECONDS:
                 self.time_limit -= GameSettings.TURN_SECONDS_REDUCTION_PER_LIMIT_CHANGE
                 text += (
-                    f"Giới hạn thời gian giảm từ "
-                    f"*{self.time_limit + GameSettings.TURN_SECONDS_REDUCTION_PER_LIMIT_CHANGE}s* "
-                    f"ĐẾN *{self.time_limit}s*.\n"
+                    f"\nGiới hạn thời gian giảm từ "
+                    f"<b>{self.time_limit + GameSettings.TURN_SECONDS_REDUCTION_PER_LIMIT_CHANGE}s</b> "
+                    f"ĐẾN <b>{self.time_limit}s</b>."
                 )
             if self.min_letters_limit < GameSettings.MAX_WORD_LENGTH_LIMIT:
                 self.min_letters_limit += GameSettings.WORD_LENGTH_LIMIT_INCREASE_PER_LIMIT_CHANGE
                 text += (
-                    f"Các chữ cái tối thiểu trên mỗi từ tăng từ "
-                    f"*{self.min_letters_limit - GameSettings.WORD_LENGTH_LIMIT_INCREASE_PER_LIMIT_CHANGE}* "
-                    f"ĐẾN *{self.min_letters_limit}*.\n"
+                    f"\nCác chữ cái tối thiểu trên mỗi từ tăng từ "
+                    f"<b>{self.min_letters_limit - GameSettings.WORD_LENGTH_LIMIT_INCREASE_PER_LIMIT_CHANGE}</b> "
+                    f"ĐẾN <b>{self.min_letters_limit}</b>."
                 )
-        await self.send_message(text)
+        return text
+
+    def with_announcement(self, text: str) -> str:
+        # Put the pending announcement at the top of an HTML message, so that a turn takes one message
+        # instead of an announcement followed by the next turn prompt
+        if not self.announcement:
+            return text
+        text = self.announcement + "\n\n" + text
+        self.announcement = ""
+        return text
 
     async def running_initialization(self) -> None:
         # Random starting word
@@ -452,10 +515,9 @@ class ClassicGame:
         # False: Game is still ongoing
         if self.answered:
             # Move player who just answered to the end of queue
-            self.players_in_game.append(self.players_in_game.pop(0))
+            self.players_in_game.rotate()
         else:
-            self.time_left -= 1
-            if self.time_left > 0:
+            if not self.timer_expired():
                 return False
 
             # Timer ran out
@@ -464,7 +526,7 @@ class ClassicGame:
                 f"{self.players_in_game[0].mention} đã hết thời gian! Họ đã bị loại.",
                 parse_mode=types.ParseMode.HTML
             )
-            del self.players_in_game[0]
+            self.players_in_game.pop_current()
 
             if len(self.players_in_game) == 1:
                 await self.handle_game_end()
@@ -483,10 +545,10 @@ class ClassicGame:
         text = f"{winner} đã thắng trò chơi {len(self.players)} người chơi!\n"
         text += f"Tổng số từ: {self.turns}\n"
         if self.longest_word:
-            longest_word_sender_name = [p for p in self.players if p.user_id == self.longest_word_sender_id][0].name
+            longest_word_sender_name = self.players.get(self.longest_word_sender_id).name
             text += f"Từ dài nhất: <i>{self.longest_word.capitalize()}</i> từ {longest_word_sender_name}\n"
         text += f"Thời lượng trò chơi: <code>{game_len_str}</code>"
-        await self.send_message(text, parse_mode=types.ParseMode.HTML)
+        await self.send_message(self.with_announcement(text), parse_mode=types.ParseMode.HTML)
 
         GlobalState.games.pop(self.group_id, None)
 
@@ -562,42 +624,122 @@ class ClassicGame:
                 player.longest_word or None
             )
 
-    async def scan_for_stale_timer(self) -> None:
-        # Check if game timer is stuck
-        timer = self.time_left
-        for _ in range(5):
-            await asyncio.sleep(1)
-            if timer != self.time_left and timer >= 0:
-                return  # Timer not stuck
-            if self.state == GameState.KILLGAME or self.group_id not in GlobalState.games:
-                return  # Game already killed
-
-        await send_admin_group(f"Đã phát hiện bộ đếm thời gian cũ/âm tính kéo dài trong nhóm `{self.group_id}`. Game terminated.")
-        try:
-            await self.send_message("Hẹn giờ trò chơi bị trục trặc. Trò chơi đã kết thúc.")
-        except:
-            pass
-
-        GlobalState.games.pop(self.group_id, None)
+    def stop(self) -> None:
+        # End the game loop without a message, for games continued elsewhere
+        # The game must be removed from GlobalState.games first so that its snapshot is discarded
+        if self.loop_task:
+            self.loop_task.cancel()
+
+    def snapshot(self) -> Dict[str, Any]:
+        # State saved by game_snapshots, to be extended by other game modes along with restore
+        # Used words are saved as words since word ids change whenever the dictionary is rebuilt
+        # Only the time left is saved as time.monotonic() deadlines do not survive restarts
+        return {
+            "state": self.state,
+            "players": [p.snapshot() for p in self.players],
+            "players_in_game": [p.user_id for p in self.players_in_game],  # Turn order from the current player
+            "start_time": self.start_time.isoformat() if self.start_time else None,
+            "extended_user_ids": list(self.extended_user_ids),
+            "time_left": self.time_left,
+            "min_players": self.min_players,
+            "max_players": self.max_players,
+            "time_limit": self.time_limit,
+            "min_letters_limit": self.min_letters_limit,
+            "vp_difficulty": self.vp_difficulty,
+            "current_word": self.current_word,
+            "longest_word": self.longest_word,
+            "longest_word_sender_id": self.longest_word_sender_id,
+            "answered": self.answered,
+            "turns": self.turns,
+            "used_words": list(self.used_words),
+            "announcement": self.announcement
+        }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        # Load a snapshot into a new game, deadlines are re-armed by resume
+        self.state = data["state"]
+        for p in data["players"]:
+            self.players.add(Player.restore(p))
+        self.players_in_game = TurnQueue(self.players.get(user_id) for user_id in data["players_in_game"])
+        self.start_time = datetime.fromisoformat(data["start_time"]) if data["start_time"] else None
+        self.extended_user_ids = set(data["extended_user_ids"])
+        self.min_players = data["min_players"]
+        self.max_players = data["max_players"]
+        self.time_limit = data["time_limit"]
+        self.min_letters_limit = data["min_letters_limit"]
+        self.vp_difficulty = data["vp_difficulty"]
+        self.current_word = data["current_word"]
+        self.longest_word = data["longest_word"]
+        self.longest_word_sender_id = data["longest_word_sender_id"]
+        self.answered = data["answered"]
+        self.turns = data["turns"]
+        self.announcement = data.get("announcement", "")  # Missing from snapshots of older versions
+        for word in data["used_words"]:
+            self.used_words.add(word)
+        if self.state == GameState.JOINING:
+            self.set_timer(data["time_left"])
+
+    async def resume(self, reason: str) -> None:
+        # Continue a restored game
+        if self.state == GameState.RUNNING:
+            if self.answered:
+                self.wakeup.set()  # Move on to the next turn
+            else:
+                # Give the current player a full turn, before anything is awaited
+                # so that answers sent while the bot was down are accepted
+                self.reset_turn()
+
+        text = f"Trò chơi đã được khôi phục {reason}.\n"
+        if self.state == GameState.JOINING:
+            text += f"{self.time_left}s để /join."
+        elif not self.answered:
+            text += (
+                f"Lượt: {self.players_in_game[0].mention}\n"
+                f"Từ của bạn phải bắt đầu bằng <i>{self.constraints.prefix.upper()}</i>"
+            )
+            if self.constraints.banned_letters:
+                text += f", <b>exclude</b> <i>{', '.join(c.upper() for c in self.constraints.banned_letters)}</i>"
+            if self.constraints.required_letter:
+                text += f", <b>bao gồm</b> <i>{self.constraints.required_letter.upper()}</i>"
+            text += (
+                f" và bao gồm <b>at least {self.constraints.min_len} letters</b>.\n"
+                f"Bạn có <b>{self.time_left}s</b> để trả lời."
+            )
+        await self.send_message(text, parse_mode=types.ParseMode.HTML)
 
-    async def main_loop(self, message: types.Message) -> None:
-        # Attempt to fix issue of stuck game with negative timer.
-        negative_timer = 0
+        if self.state == GameState.RUNNING and not self.answered:
+            if await self.handle_dead_end():
+                return
+            if self.players_in_game[0].is_vp:
+                await self.vp_answer()
+
+    async def main_loop(
+        self, message: Optional[types.Message] = None, resume_reason: str = "sau khi bot khởi động lại"
+    ) -> None:
+        # message is the starting command, None if the game is restored from a snapshot
+        self.loop_task = asyncio.current_task()
         try:
-            await self.send_message(
-                f"A{'n' if self.name[0] in 'aeiou' else ''} {self.name} đang bắt đầu.\n"
-                f"{self.min_players}-{self.max_players} thời gian người chơi còn.\n"
-                f"{self.time_left}s để /join."
-            )
-            await self.join(message)
+            if message:
+                await self.send_message(
+                    f"A{'n' if self.name[0] in 'aeiou' else ''} {self.name} đang bắt đầu.\n"
+                    f"{self.min_players}-{self.max_players} thời gian người chơi còn.\n"
+                    f"{self.time_left}s để /join."
+                )
+                await self.join(message)
+            else:
+                await self.resume(resume_reason)
 
             while True:
-                await asyncio.sleep(1)
+                # Idle until the timer fires or a turn ends early
+                await self.wakeup.wait()
+                self.wakeup.clear()
                 if self.state == GameState.JOINING:
-                    if self.time_left > 0:
-                        self.time_left -= 1
-                        if self.time_left in (15, 30, 60):
-                            await self.send_message(f"{self.time_left}s left to /join.")
+                    if not self.timer_expired():  # Reminder
+                        if self.time_left in GameSettings.JOINING_REMINDER_SECONDS:
+                            self.post_message(
+                                f"{self.time_left}s left to /join.", priority=MessagePriority.REMINDER, ttl=5
+                            )
+                        self.schedule_wakeup()
                     elif len(self.players) < self.min_players:
                         await self.send_message("Không đủ người chơi. Trò chơi đã kết thúc.")
                         del GlobalState.games[self.group_id]
@@ -606,25 +748,21 @@ class ClassicGame:
                         self.state = GameState.RUNNING
                         await self.send_message("Trò chơi đang bắt đầu...")
 
-                        random.shuffle(self.players)
-                        self.players_in_game = self.players[:]
+                        self.players_in_game = TurnQueue(random.sample(list(self.players), len(self.players)))
 
                         await self.running_initialization()
                         await self.send_turn_message()
                 elif self.state == GameState.RUNNING:
-                    # Check for prolonged negative timer
-                    if self.time_left < 0:
-                        negative_timer += 1
-                    if negative_timer >= 5:
-                        raise ValueError("Hẹn giờ âm kéo dài.")
-
                     if await self.running_phase_tick():  # True: Game ended
                         await self.update_db()
                         return
                 elif self.state == GameState.KILLGAME:
-                    await self.send_message("Trò chơi kết thúc bất ngờ.")
+                    await self.send_message(
+                        self.with_announcement("Trò chơi kết thúc bất ngờ."), parse_mode=types.ParseMode.HTML
+                    )
                     GlobalState.games.pop(self.group_id, None)
                     return
+                game_snapshots.mark(self)
         except Exception as e:
             GlobalState.games.pop(self.group_id, None)
             try:
@@ -635,3 +773,9 @@ class ClassicGame:
             except:
                 pass
             raise
+        finally:
+            if self.timer:
+                self.timer.cancel()
+            # Ended games are no longer in GlobalState.games, unlike games interrupted by shutdown
+            if self.group_id not in GlobalState.games:
+                game_snapshots.discard(self.group_id)
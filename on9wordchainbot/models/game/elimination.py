@@ -1,19 +1,20 @@
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from aiogram import types
 
 from .classic import ClassicGame
+from ..leaderboard import Leaderboard
 from ..player import Player
-from ...constants import GameSettings, GameState
-from ...utils import get_random_word
+from ...constants import GameSettings, GameState, MessagePriority
+from ...words import get_random_word
 
 
 class EliminationGame(ClassicGame):
     name = "trò chơi loại bỏ"
     command = "startelim"
 
-    __slots__ = ("round", "turns_until_elimination", "exceeded_score_limit")
+    __slots__ = ("round", "turns_until_elimination", "exceeded_score_limit", "leaderboard")
 
     def __init__(self, group_id: int) -> None:
         super().__init__(group_id)
@@ -21,7 +22,7 @@ class EliminationGame(ClassicGame):
         # Elimination game settings
         self.min_players = GameSettings.ELIM_MIN_PLAYERS
         self.max_players = GameSettings.ELIM_MAX_PLAYERS
-        self.time_left = GameSettings.ELIM_JOINING_PHASE_SECONDS
+        self.set_timer(GameSettings.ELIM_JOINING_PHASE_SECONDS)
         self.time_limit = GameSettings.ELIM_TURN_SECONDS
         # No minimum letters limit (though a word must contain at least one letter by definition)
         # Since answering words with few letters will eventually lead to elimination
@@ -31,6 +32,7 @@ class EliminationGame(ClassicGame):
         self.round = 1
         self.turns_until_elimination = 0
         self.exceeded_score_limit = False  # Remind players that there is a turn score increment ceiling
+        self.leaderboard = Leaderboard()  # Players in game, set when the game starts
 
     async def forcejoin(self, message: types.Message) -> None:
         # Joining in the middle of an elimination game puts one at a disadvantage since points are cumulative
@@ -39,59 +41,34 @@ class EliminationGame(ClassicGame):
             await super().forcejoin(message)
 
     def get_leaderboard(self, show_player: Optional[Player] = None) -> str:
-        # nightmare nightmare nightmare nightmare
+        def lines(rows: List[Tuple[int, Player]]) -> List[str]:
+            return [f"{'> ' if p is show_player else ''}{i}. {p.name}: {p.score}" for i, p in rows]
 
-        # Make a copy of players in game
-        players = self.players_in_game[:]
-        # Sort by letter count descending then user id ascending
-        # The user id part is to ensure consistent ordering of players with same letter count
-        players.sort(key=lambda k: (-k.score, k.user_id))
-        text = ""
-
-        if not show_player:
+        n = len(self.leaderboard)
+        if not show_player or n <= 10:
             # Show every player
-            for i, p in enumerate(players, start=1):
-                text += f"{i}. {p.name}: {p.score}\n"
-            return text.rstrip()
+            return "\n".join(lines(self.leaderboard.top(n)))
 
         # Highlight player (while showing 10 other players at max)
-        if len(players) <= 10:
-            # Show every player
-            for i, p in enumerate(players, start=1):
-                line = f"{i}. {p.name}: {p.score}\n"
-                if p is show_player:
-                    line = "> " + line
-                text += line
-        elif players.index(show_player) <= 4 or players.index(show_player) >= len(players) - 5:
+        rank = self.leaderboard.rank(show_player)
+        text = lines(self.leaderboard.top(5))
+        if rank <= 5 or rank > n - 5:
             # Player is in first or last 5 places, show those places
-            for i, p in enumerate(players[:5], start=1):
-                line = f"{i}. {p.name}: {p.score}\n"
-                if p is show_player:
-                    line = "> " + line
-                text += line
-            text += "...\n"
-            for i, p in enumerate(players[-5:], start=len(players) - 4):
-                line = f"{i}. {p.name}: {p.score}\n"
-                if p is show_player:
-                    line = "> " + line
-                text += line
+            text.append("...")
         else:
             # Player not in first or last 5 places, show player in middle
-            for i, p in enumerate(players[:5], start=1):
-                text += f"{i}. {p.name}: {p.score}\n"
             # Prevent unnecessary ellipses if player is 6th place from top or bottom
-            if players[5] is not show_player:
-                text += "...\n"
-            text += f"> {players.index(show_player) + 1}. {show_player.name}: {show_player.score}\n"
-            if players[-6] is not show_player:
-                text += "...\n"
-            for i, p in enumerate(players[-5:], start=len(players) - 4):
-                text += f"{i}. {p.name}: {p.score}\n"
-        return text.rstrip()
+            if rank != 6:
+                text.append("...")
+            text += lines([(rank, show_player)])
+            if rank != n - 5:
+                text.append("...")
+        text += lines(self.leaderboard.bottom(5))
+        return "\n".join(text)
 
     async def send_turn_message(self) -> None:
         await self.send_message(
-            (
+            self.with_announcement(
                 f"Lượt: {self.players_in_game[0].mention}"
                 # Do not show next player on queue if this is last turn of the round
                 # Since they could be eliminated
@@ -100,29 +77,31 @@ class EliminationGame(ClassicGame):
                   f"Bạn có <b>{self.time_limit}s</b> to answer.\n\n"
                   "Bảng xếp hạng:\n" + self.get_leaderboard(show_player=self.players_in_game[0])
             ),
-            parse_mode=types.ParseMode.HTML
+            parse_mode=types.ParseMode.HTML,
+            priority=MessagePriority.TURN
         )
 
-        # Reset per-turn attributes
-        self.answered = False
-        self.accepting_answers = True
-        self.time_left = self.time_limit
+        self.reset_turn()
+
+        await self.handle_dead_end()
 
     def post_turn_processing(self, word: str) -> None:
         super().post_turn_processing(word)
-        self.players_in_game[0].score += min(len(word), GameSettings.ELIM_MAX_TURN_SCORE)
+        self.leaderboard.add_score(self.players_in_game[0], min(len(word), GameSettings.ELIM_MAX_TURN_SCORE))
         if len(word) > GameSettings.ELIM_MAX_TURN_SCORE:
             self.exceeded_score_limit = True
 
-    async def send_post_turn_message(self, word: str) -> None:
-        text = f"_{word.capitalize()}_ được chấp nhận."
+    def post_turn_announcement(self, word: str) -> str:
+        text = f"<i>{word.capitalize()}</i> được chấp nhận."
         if self.exceeded_score_limit:
             text += f"\nĐó là một từ dài! Nó sẽ chỉ tính cho {GameSettings.ELIM_MAX_TURN_SCORE} điểm."
             self.exceeded_score_limit = False
-        await self.send_message(text)
         # No limit reduction
+        return text
 
     async def running_initialization(self) -> None:
+        self.leaderboard = Leaderboard(self.players_in_game)
+
         # Random starting word
         self.current_word = get_random_word()
         self.used_words.add(self.current_word)
@@ -141,8 +120,7 @@ class EliminationGame(ClassicGame):
 
     async def running_phase_tick(self) -> bool:
         if not self.answered:
-            self.time_left -= 1
-            if self.time_left > 0:
+            if not self.timer_expired():
                 return False
             self.accepting_answers = False
             await self.send_message(
@@ -153,7 +131,7 @@ class EliminationGame(ClassicGame):
         # Regardless of answering in time or running out of time
         # Elimination happens at the end of the round
         # Move player who just answered to the end of queue
-        self.players_in_game.append(self.players_in_game.pop(0))
+        self.players_in_game.rotate()
         self.turns_until_elimination -= 1
 
         # Handle round transition
@@ -173,18 +151,21 @@ class EliminationGame(ClassicGame):
         self.turns_until_elimination = len(self.players_in_game)
 
         await self.send_message(
-            f"Vòng {self.round} đang bắt đầu...\n\nBảng xếp hạng:\n" + self.get_leaderboard(),
+            self.with_announcement(
+                f"Vòng {self.round} đang bắt đầu...\n\nBảng xếp hạng:\n" + self.get_leaderboard()
+            ),
             parse_mode=types.ParseMode.HTML
         )
 
     async def handle_round_end(self) -> None:
         # Eliminate player(s) with lowest score
         # Hence the possibility of no winners
-        min_score = min(p.score for p in self.players_in_game)
-        eliminated = [p for p in self.players_in_game if p.score == min_score]
+        # The standings are shown with the eliminated players, who are only removed afterwards
+        eliminated = self.leaderboard.lowest()
+        min_score = eliminated[0].score
 
         await self.send_message(
-            (
+            self.with_announcement(
                 f"Vòng {self.round} đã hoàn thành.\n\nBảng xếp hạng:\n"
                 + self.get_leaderboard()
                 + "\n\n"
@@ -197,6 +178,22 @@ class EliminationGame(ClassicGame):
         )
 
         # Update attributes
-        self.players_in_game = [p for p in self.players_in_game if p not in eliminated]
+        self.leaderboard.eliminate_lowest()
+        for p in eliminated:
+            self.players_in_game.remove(p)
         self.round += 1
         self.turns_until_elimination = len(self.players_in_game)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["round"] = self.round
+        data["turns_until_elimination"] = self.turns_until_elimination
+        data["exceeded_score_limit"] = self.exceeded_score_limit
+        return data
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        super().restore(data)
+        self.round = data["round"]
+        self.turns_until_elimination = data["turns_until_elimination"]
+        self.exceeded_score_limit = data["exceeded_score_limit"]
+        self.leaderboard = Leaderboard(self.players_in_game)  # Scores are saved with players
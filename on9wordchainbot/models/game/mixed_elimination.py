@@ -1,6 +1,7 @@
 import random
 from datetime import datetime
 from string import ascii_lowercase
+from typing import Any, Dict
 
 from aiogram import types
 
@@ -9,7 +10,10 @@ from .chosen_first_letter import ChosenFirstLetterGame
 from .classic import ClassicGame
 from .elimination import EliminationGame
 from .required_letter import RequiredLetterGame
-from ...utils import check_word_existence, get_random_word
+from ..constraints import TurnConstraints
+from ..leaderboard import Leaderboard
+from ...constants import MessagePriority
+from ...words import get_random_word
 
 
 class MixedEliminationGame(EliminationGame):
@@ -55,52 +59,23 @@ class MixedEliminationGame(EliminationGame):
 
         text += f"Bạn có <b>{self.time_limit}s</b> để trả lời.\n\n"
         text += "Bảng xếp hạng:\n" + self.get_leaderboard(show_player=self.players_in_game[0])
-        await self.send_message(text, parse_mode=types.ParseMode.HTML)
+        await self.send_message(
+            self.with_announcement(text), parse_mode=types.ParseMode.HTML, priority=MessagePriority.TURN
+        )
 
-        # Reset per-turn attributes
-        self.answered = False
-        self.accepting_answers = True
-        self.time_left = self.time_limit
+        self.reset_turn()
 
-    async def additional_answer_checkers(self, word: str, message: types.Message) -> bool:
-        if self.game_mode is BannedLettersGame:
-            return await BannedLettersGame.additional_answer_checkers(self, word, message)
-        elif self.game_mode is RequiredLetterGame:
-            return await RequiredLetterGame.additional_answer_checkers(self, word, message)
-        return True
+        await self.handle_dead_end()
 
-    async def handle_answer(self, message: types.Message) -> None:
-        word = message.text.lower()
-
-        # Starting letter
-        if self.game_mode is ChosenFirstLetterGame:
-            if not word.startswith(self.current_word[0]):
-                await message.reply(
-                    f"_{word.capitalize()}_ không bắt đầu với _{self.current_word[0].upper()}_.",
-                    allow_sending_without_reply=True
-                )
-                return
-        elif not word.startswith(self.current_word[-1]):
-            await message.reply(
-                f"_{word.capitalize()}_ không bắt đầu với _{self.current_word[-1].upper()}_.",
-                allow_sending_without_reply=True
-            )
-            return
-
-        if word in self.used_words:
-            await message.reply(f"_{word.capitalize()}_ đã được dùng.", allow_sending_without_reply=True)
-            return
-        if not check_word_existence(word):
-            await message.reply(
-                f"_{word.capitalize()}_ không có trong danh sách các từ của tôi.",
-                allow_sending_without_reply=True
-            )
-            return
-        if not await self.additional_answer_checkers(word, message):
-            return
-
-        self.post_turn_processing(word)
-        await self.send_post_turn_message(word)
+    def get_turn_constraints(self) -> TurnConstraints:
+        # self.current_word is the whole last word in ChosenFirstLetterGame rounds too (see above)
+        return TurnConstraints(
+            prefix=self.current_word[0] if self.game_mode is ChosenFirstLetterGame else self.current_word[-1],
+            min_len=self.min_letters_limit,
+            used_words=self.used_words,
+            required_letter=self.required_letter if self.game_mode is RequiredLetterGame else None,
+            banned_letters=self.banned_letters if self.game_mode is BannedLettersGame else None
+        )
 
     def post_turn_processing(self, word: str) -> None:
         super().post_turn_processing(word)
@@ -108,6 +83,7 @@ class MixedEliminationGame(EliminationGame):
             RequiredLetterGame.change_required_letter(self)
 
     async def running_initialization(self) -> None:
+        self.leaderboard = Leaderboard(self.players_in_game)
         self.start_time = datetime.now().replace(microsecond=0)
         self.turns_until_elimination = len(self.players_in_game)
         self.game_mode = random.choice(self.game_modes)
@@ -142,7 +118,7 @@ class MixedEliminationGame(EliminationGame):
         elif self.game_mode is BannedLettersGame:
             round_text += f"\nTừ cấm: <i>{', '.join(c.upper() for c in self.banned_letters)}</i>"
         round_text += "\n\nBảng xếp hạng:\n" + self.get_leaderboard()
-        await self.send_message(round_text, parse_mode=types.ParseMode.HTML)
+        await self.send_message(self.with_announcement(round_text), parse_mode=types.ParseMode.HTML)
 
     def set_game_mode(self) -> None:
         # Random game mode without having the same mode twice in a row
@@ -169,4 +145,17 @@ class MixedEliminationGame(EliminationGame):
         elif self.game_mode is BannedLettersGame:
             round_text += f"\nTừ cấm: <i>{', '.join(c.upper() for c in self.banned_letters)}</i>"
         round_text += "\n\nBảng xếp hạng:\n" + self.get_leaderboard()
-        await self.send_message(round_text, parse_mode=types.ParseMode.HTML)
+        await self.send_message(self.with_announcement(round_text), parse_mode=types.ParseMode.HTML)
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["game_mode"] = self.game_mode.__name__ if self.game_mode else None
+        data["banned_letters"] = self.banned_letters
+        data["required_letter"] = self.required_letter
+        return data
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        super().restore(data)
+        self.game_mode = next((m for m in self.game_modes if m.__name__ == data["game_mode"]), None)
+        self.banned_letters = data["banned_letters"]
+        self.required_letter = data["required_letter"]
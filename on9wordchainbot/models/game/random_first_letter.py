@@ -1,16 +1,21 @@
 import random
 from datetime import datetime
+from typing import Optional
 
 from aiogram import types
 
 from .classic import ClassicGame
-from ...utils import get_random_word
+from ...words import get_random_word
 
 
 class RandomFirstLetterGame(ClassicGame):
     name = "Trò chơi chữ cái đầu tiên ngẫu nhiên"
     command = "startrfl"
 
+    def get_vp_answer(self) -> Optional[str]:
+        # The next starting letter is a random letter of the answer rather than its end letter
+        return self.constraints.random_word()
+
     def change_first_letter(self) -> None:
         self.current_word = random.choice(self.current_word)
 
@@ -1,12 +1,14 @@
 import random
 from datetime import datetime
 from string import ascii_lowercase
-from typing import Optional
+from typing import Any, Dict, Optional
 
 from aiogram import types
 
 from .classic import ClassicGame
-from ...utils import get_random_word
+from ..constraints import TurnConstraints
+from ...constants import MessagePriority
+from ...words import get_random_word
 
 
 class RequiredLetterGame(ClassicGame):
@@ -23,7 +25,7 @@ class RequiredLetterGame(ClassicGame):
 
     async def send_turn_message(self) -> None:
         await self.send_message(
-            (
+            self.with_announcement(
                 f"Lượt: {self.players_in_game[0].mention} (Tiếp theo: {self.players_in_game[1].name})\n"
                 f"Từ của bạn phải bắt đầu bằng <i>{self.current_word[-1].upper()}</i>, "
                 f"<b>bao gồm</b> <i>{self.required_letter.upper()}</i> và "
@@ -32,34 +34,26 @@ class RequiredLetterGame(ClassicGame):
                 f"Người chơi còn lại: {len(self.players_in_game)}/{len(self.players)}\n"
                 f"Tổng số từ: {self.turns}"
             ),
-            parse_mode=types.ParseMode.HTML
+            parse_mode=types.ParseMode.HTML,
+            priority=MessagePriority.TURN
         )
 
-        # Reset per-turn attributes
-        self.answered = False
-        self.accepting_answers = True
-        self.time_left = self.time_limit
+        self.reset_turn()
+
+        if await self.handle_dead_end():
+            return
 
         if self.players_in_game[0].is_vp:
             await self.vp_answer()
 
-    def get_random_valid_answer(self) -> Optional[str]:
-        return get_random_word(
-            min_len=self.min_letters_limit,
+    def get_turn_constraints(self) -> TurnConstraints:
+        return TurnConstraints(
             prefix=self.current_word[-1],
-            required_letter=self.required_letter,
-            exclude_words=self.used_words
+            min_len=self.min_letters_limit,
+            used_words=self.used_words,
+            required_letter=self.required_letter
         )
 
-    async def additional_answer_checkers(self, word: str, message: types.Message) -> bool:
-        if self.required_letter not in word:
-            await message.reply(
-                f"_{word.capitalize()}_ không bao gồm _{self.required_letter.upper()}_.",
-                allow_sending_without_reply=True
-            )
-            return False
-        return True
-
     def change_required_letter(self) -> None:
         letters = list(ascii_lowercase)
         letters.remove(self.current_word[-1])
@@ -84,3 +78,12 @@ class RequiredLetterGame(ClassicGame):
             ),
             parse_mode=types.ParseMode.HTML
         )
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = super().snapshot()
+        data["required_letter"] = self.required_letter
+        return data
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        super().restore(data)
+        self.required_letter = data["required_letter"]
@@ -0,0 +1,66 @@
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .player import Player
+
+
+class Leaderboard:
+    # Players ordered by score descending then user id ascending, for elimination games
+    # The user id part is to ensure consistent ordering of players with same score
+    # Ranks are found by bisection over the sorted (-score, user id) keys, which only shift on score changes
+
+    __slots__ = ("_keys", "_players")
+
+    def __init__(self, players: Iterable["Player"] = ()) -> None:
+        self._players: Dict[int, "Player"] = {p.user_id: p for p in players}
+        self._keys: List[Tuple[int, int]] = sorted(self._key(p) for p in self._players.values())
+
+    @staticmethod
+    def _key(player: "Player") -> Tuple[int, int]:
+        return -player.score, player.user_id
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, player: "Player") -> bool:
+        return player.user_id in self._players
+
+    def add_score(self, player: "Player", points: int) -> None:
+        # Scores must only be changed through here while the player is on the leaderboard
+        del self._keys[bisect_left(self._keys, self._key(player))]
+        player.score += points
+        insort(self._keys, self._key(player))
+
+    def rank(self, player: "Player") -> int:
+        # 1-based
+        return bisect_left(self._keys, self._key(player)) + 1
+
+    def window(self, start: int, stop: int) -> List[Tuple[int, "Player"]]:
+        # (rank, player) of 0-based positions start to stop (exclusive)
+        start, stop, _ = slice(start, stop).indices(len(self._keys))
+        return [(i + 1, self._players[self._keys[i][1]]) for i in range(start, stop)]
+
+    def top(self, k: int) -> List[Tuple[int, "Player"]]:
+        return self.window(0, k)
+
+    def bottom(self, k: int) -> List[Tuple[int, "Player"]]:
+        return self.window(max(len(self._keys) - k, 0), len(self._keys))
+
+    def _lowest_start(self) -> int:
+        return bisect_left(self._keys, (self._keys[-1][0],))
+
+    def lowest(self) -> List["Player"]:
+        # Every player with the lowest score, without removing them
+        if not self._keys:
+            return []
+        return [self._players[user_id] for _, user_id in self._keys[self._lowest_start():]]
+
+    def eliminate_lowest(self) -> List["Player"]:
+        # Remove and return every player with the lowest score
+        if not self._keys:
+            return []
+        start = self._lowest_start()
+        eliminated = [self._players.pop(user_id) for _, user_id in self._keys[start:]]
+        del self._keys[start:]
+        return eliminated
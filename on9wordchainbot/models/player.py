@@ -1,3 +1,5 @@
+from typing import Any, List
+
 from aiogram import types
 from aiogram.utils.markdown import quote_html
 
@@ -49,3 +51,20 @@ class Player:
         vp = Player(await on9bot.me)
         vp._name += " " + STAR
         return vp
+
+    def snapshot(self) -> List[Any]:
+        # See ClassicGame.snapshot
+        return [
+            self.user_id, self._username, self._name,
+            self.word_count, self.letter_count, self.longest_word, self.score
+        ]
+
+    @classmethod
+    def restore(cls, data: List[Any]) -> "Player":
+        player = cls.__new__(cls)
+        (
+            player.user_id, player._username, player._name,
+            player.word_count, player.letter_count, player.longest_word, player.score
+        ) = data
+        player.is_vp = player.user_id == on9bot.id
+        return player
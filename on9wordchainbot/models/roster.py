@@ -0,0 +1,147 @@
+import random
+from typing import Dict, Iterable, Iterator, List, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .player import Player
+
+
+class PlayerRegistry:
+    # Players of a game by user id, iterated in joining order
+
+    __slots__ = ("_players",)
+
+    def __init__(self) -> None:
+        self._players: Dict[int, "Player"] = {}
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __iter__(self) -> Iterator["Player"]:
+        return iter(self._players.values())
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._players
+
+    def get(self, user_id: int) -> Optional["Player"]:
+        return self._players.get(user_id)
+
+    def add(self, player: "Player") -> None:
+        self._players[player.user_id] = player
+
+    def remove(self, user_id: int) -> Optional["Player"]:
+        return self._players.pop(user_id, None)
+
+
+class TurnQueue:
+    # Turn order of players in game as a ring, self[0] is the current player and self[1] the next one
+    # Links between players make rotating, removing and reordering O(1)
+    # and a slot array (order not kept) makes picking a random player O(1)
+
+    __slots__ = ("_players", "_next", "_prev", "_current", "_slots", "_slot_of")
+
+    def __init__(self, players: Iterable["Player"] = ()) -> None:
+        self._players: Dict[int, "Player"] = {}
+        self._next: Dict[int, int] = {}
+        self._prev: Dict[int, int] = {}
+        self._current: Optional[int] = None
+        self._slots: List[int] = []
+        self._slot_of: Dict[int, int] = {}
+        for player in players:
+            self.append(player)
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def __contains__(self, player: "Player") -> bool:
+        return player.user_id in self._players
+
+    def __iter__(self) -> Iterator["Player"]:
+        # From the current player in turn order
+        user_id = self._current
+        for _ in range(len(self._players)):
+            yield self._players[user_id]
+            user_id = self._next[user_id]
+
+    def __getitem__(self, i: int) -> "Player":
+        # Player i turns from now, cheap for small i only
+        if not self._players:
+            raise IndexError("turn queue is empty")
+        user_id = self._current
+        for _ in range(i % len(self._players)):
+            user_id = self._next[user_id]
+        return self._players[user_id]
+
+    def _link_before_current(self, user_id: int) -> None:
+        if self._current is None:
+            self._next[user_id] = self._prev[user_id] = self._current = user_id
+            return
+        last = self._prev[self._current]
+        self._next[last] = user_id
+        self._prev[user_id] = last
+        self._next[user_id] = self._current
+        self._prev[self._current] = user_id
+
+    def _unlink(self, user_id: int) -> None:
+        prev, next_ = self._prev.pop(user_id), self._next.pop(user_id)
+        if prev == user_id:  # Only player
+            self._current = None
+            return
+        self._next[prev] = next_
+        self._prev[next_] = prev
+        if self._current == user_id:
+            self._current = next_
+
+    def append(self, player: "Player") -> None:
+        # Add to the end of the turn order
+        if player.user_id in self._players:
+            return
+        self._players[player.user_id] = player
+        self._slot_of[player.user_id] = len(self._slots)
+        self._slots.append(player.user_id)
+        self._link_before_current(player.user_id)
+
+    def remove(self, player: "Player") -> None:
+        # If player is the current player, the turn passes to the next one
+        user_id = player.user_id
+        if user_id not in self._players:
+            return
+        self._unlink(user_id)
+        del self._players[user_id]
+        # Move the last slot into the freed one
+        slot = self._slot_of.pop(user_id)
+        last = self._slots.pop()
+        if last != user_id:
+            self._slots[slot] = last
+            self._slot_of[last] = slot
+
+    def pop_current(self) -> "Player":
+        # Remove the current player and return it, the turn passes to the next one
+        if self._current is None:
+            raise IndexError("turn queue is empty")
+        player = self._players[self._current]
+        self.remove(player)
+        return player
+
+    def rotate(self) -> None:
+        # Move the current player to the end of the turn order
+        if self._current is not None:
+            self._current = self._next[self._current]
+
+    def move_to_front(self, player: "Player") -> None:
+        # Make player the current player, keeping the order of everyone else
+        if player.user_id == self._current:
+            return
+        self._unlink(player.user_id)
+        self._link_before_current(player.user_id)
+        self._current = player.user_id
+
+    def random(self, exclude: Optional["Player"] = None) -> "Player":
+        # Random player, other than exclude if it is given (and in the queue)
+        n = len(self._slots)
+        if exclude is not None and exclude.user_id in self._players:
+            i = random.randrange(n - 1)
+            # Stand in the last slot for the excluded player
+            user_id = self._slots[i] if self._slots[i] != exclude.user_id else self._slots[-1]
+        else:
+            user_id = self._slots[random.randrange(n)]
+        return self._players[user_id]
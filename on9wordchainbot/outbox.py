@@ -0,0 +1,180 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from .chatqueues import QueueStats
+from .constants import MessagePriority
+
+logger = logging.getLogger(__name__)
+
+# (priority, sequence number, time.monotonic() when queued, seconds before it expires or None, send, result)
+OutboxItem = Tuple[int, int, float, Optional[float], Callable[[], Awaitable[Any]], asyncio.Future]
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate  # Tokens per second
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.tokens + (now - self.updated) * self.rate, self.capacity)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        # Seconds until a token is available
+        self.refill(now)
+        return max((1 - self.tokens) / self.rate, 0)
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class ChatOutbox:
+    __slots__ = ("bucket", "items", "paused_until", "posted")
+
+    def __init__(self, bucket: TokenBucket) -> None:
+        self.bucket = bucket
+        self.items: List[OutboxItem] = []  # Heap
+        self.paused_until = 0.0  # After RetryAfter
+        self.posted = asyncio.Event()
+
+
+class Outbox:
+    # Sends the bot's messages to groups while staying under Telegram's limits, per chat and for the whole bot,
+    # with a token bucket for each instead of sleeping in the game code
+    # Queued messages of a chat are sent by priority (see MessagePriority), then in order,
+    # so that a turn prompt waiting on the limit goes before rejection replies and reminders
+    # A RetryAfter pauses the chat for the given time and the message is retried, instead of reaching error_handler
+    # Each chat with messages queued has a task sending them, which ends once its bucket is full again
+
+    __slots__ = (
+        "chat_rate", "chat_burst", "bucket", "retry_after", "error_handler", "_chats", "_sequence", "stats",
+        "retry_afters"
+    )
+
+    def __init__(
+        self, chat_rate: float, chat_burst: float, global_rate: float, global_burst: float,
+        retry_after: Type[Exception]  # aiogram's RetryAfter, raised by send with the seconds to wait in timeout
+    ) -> None:
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.bucket = TokenBucket(global_rate, global_burst)
+        self.retry_after = retry_after
+        # Called with the chat id and the error when a posted message fails, since post has no caller to raise to
+        # Errors are only logged if None
+        self.error_handler: Optional[Callable[[int, Exception], Awaitable[Any]]] = None
+        self._chats: Dict[int, ChatOutbox] = {}
+        self._sequence = itertools.count()
+        # Time messages spent queued, by priority
+        self.stats = [QueueStats() for _ in MessagePriority.ALL]
+        self.retry_afters = 0
+
+    def __len__(self) -> int:
+        # Messages waiting to be sent
+        return sum(len(chat.items) for chat in self._chats.values())
+
+    async def send(
+        self, chat_id: int, send: Callable[[], Awaitable[Any]],
+        priority: int = MessagePriority.GAME, ttl: Optional[float] = None
+    ) -> Any:
+        # Wait for send() to be called and return its result, or None if it expired after ttl seconds in the queue
+        # send may be called again after a RetryAfter
+        return await self._enqueue(chat_id, send, priority, ttl)
+
+    def post(
+        self, chat_id: int, send: Callable[[], Awaitable[Any]],
+        priority: int = MessagePriority.GAME, ttl: Optional[float] = None
+    ) -> None:
+        # Same without waiting, for handlers that should not hold back the next updates of the chat
+        # Errors go to error_handler
+        self._enqueue(chat_id, send, priority, ttl).add_done_callback(functools.partial(self._posted, chat_id))
+
+    def _enqueue(
+        self, chat_id: int, send: Callable[[], Awaitable[Any]], priority: int, ttl: Optional[float]
+    ) -> asyncio.Future:
+        future = asyncio.get_event_loop().create_future()
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            chat = self._chats[chat_id] = ChatOutbox(TokenBucket(self.chat_rate, self.chat_burst))
+            asyncio.create_task(self._run(chat_id, chat))
+        heapq.heappush(chat.items, (priority, next(self._sequence), time.monotonic(), ttl, send, future))
+        chat.posted.set()
+        stats = self.stats[priority]
+        stats.max_depth = max(stats.max_depth, len(chat.items))
+        return future
+
+    def _posted(self, chat_id: int, future: asyncio.Future) -> None:
+        if future.cancelled() or not future.exception():
+            return
+        error = future.exception()
+        if self.error_handler:
+            asyncio.create_task(self._handle_error(chat_id, error))
+        else:
+            logger.warning(f"Unable to send message to {chat_id}: {error.__class__.__name__}: {error}")
+
+    async def _handle_error(self, chat_id: int, error: Exception) -> None:
+        try:
+            await self.error_handler(chat_id, error)
+        except Exception:
+            logger.exception(f"Error while handling a failed message to {chat_id}")
+
+    async def _run(self, chat_id: int, chat: ChatOutbox) -> None:
+        while True:
+            now = time.monotonic()
+            if not chat.items:
+                # Forget the chat once its bucket is full, so a new one would be no different
+                chat.bucket.refill(now)
+                idle = (chat.bucket.capacity - chat.bucket.tokens) / chat.bucket.rate
+                if idle <= 0:
+                    break
+                chat.posted.clear()
+                try:
+                    await asyncio.wait_for(chat.posted.wait(), idle)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            delay = max(chat.paused_until - now, chat.bucket.delay(now), self.bucket.delay(now))
+            if delay > 0:
+                # Messages posted meanwhile are still sent by priority since the next one is only picked after
+                await asyncio.sleep(delay)
+                continue
+
+            item = heapq.heappop(chat.items)
+            priority, _, queued_at, ttl, send, future = item
+            if future.done():  # Cancelled by the caller
+                continue
+            wait = now - queued_at
+            stats = self.stats[priority]
+            if ttl is not None and wait > ttl:
+                stats.dropped += 1
+                future.set_result(None)
+                continue
+
+            chat.bucket.take()
+            self.bucket.take()
+            try:
+                result = await send()
+            except self.retry_after as e:
+                self.retry_afters += 1
+                chat.paused_until = time.monotonic() + e.timeout
+                heapq.heappush(chat.items, item)
+                logger.warning(f"Messages to {chat_id} paused for {e.timeout}s by flood control")
+                continue
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            stats.add(wait)
+            if not future.done():
+                future.set_result(result)
+        # No await since the last check, so nothing can have been posted in between
+        del self._chats[chat_id]
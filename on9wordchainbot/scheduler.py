@@ -0,0 +1,85 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Timer:
+    # Handle of a scheduled callback, see DeadlineScheduler.schedule
+
+    __slots__ = ("when", "callback", "cancelled")
+
+    def __init__(self, when: float, callback: Callable[[], None]) -> None:
+        self.when = when  # time.monotonic() deadline
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class DeadlineScheduler:
+    # Fires game timers (joining phase reminders, game starts, turn timeouts) from a single task
+    # Timers sit in a heap keyed on monotonic deadlines, so nothing runs until the earliest one is due
+    # Cancelled timers stay in the heap and are dropped when they reach the top
+
+    __slots__ = ("_heap", "_counter", "_changed", "_task", "fired", "total_lateness", "max_lateness")
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, Timer]] = []
+        self._counter = itertools.count()  # Tie breaker, keeps timers with equal deadlines in scheduling order
+        self._changed: Optional[asyncio.Event] = None  # Set when a timer earlier than all others is scheduled
+        self._task: Optional[asyncio.Task] = None
+
+        # Delay between deadlines and callbacks, reported by /runinfo
+        self.fired = 0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, delay: float, callback: Callable[[], None]) -> Timer:
+        # callback runs on the event loop delay seconds from now, it must not block
+        timer = Timer(time.monotonic() + delay, callback)
+        heapq.heappush(self._heap, (timer.when, next(self._counter), timer))
+
+        if self._task is None:  # Started on first use since it needs a running event loop
+            self._changed = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+        if self._heap[0][2] is timer:
+            self._changed.set()
+        return timer
+
+    async def _run(self) -> None:
+        while True:
+            while self._heap and self._heap[0][2].cancelled:
+                heapq.heappop(self._heap)
+
+            self._changed.clear()
+            if not self._heap:
+                await self._changed.wait()
+                continue
+
+            now = time.monotonic()
+            when, _, timer = self._heap[0]
+            if when > now:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), when - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue  # Deadlines are checked against time.monotonic() again in case of early wakeups
+
+            heapq.heappop(self._heap)
+            lateness = now - when
+            self.fired += 1
+            self.total_lateness += lateness
+            self.max_lateness = max(self.max_lateness, lateness)
+            try:
+                timer.callback()
+            except Exception:
+                logger.exception("Timer callback failed")
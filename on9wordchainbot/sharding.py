@@ -0,0 +1,237 @@
+# Sharded mode, enabled with SHARDS > 1
+# A front process polls Telegram, keeps the dictionary up to date and supervises SHARDS worker processes.
+# Each worker is a regular bot process owning the chats whose id maps to it (see shard_of),
+# it receives their updates from the front over local HTTP instead of polling.
+# Workers memory-map the dictionary snapshot written by the front, so they share the pages of its word tables,
+# but each worker holds its own copy of the DAWG, which cannot be loaded from a mapping.
+# Commands about the whole bot (/runinfo, /playinggroups, /killgame, /maintmode, word list changes)
+# reach the other workers through RPC methods, which also work unchanged in a single process.
+
+import asyncio
+import hmac
+import logging
+import os
+import secrets
+import signal
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+import aiohttp
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+
+from . import bot, dp, loop, session
+from .constants import SHARD_BASE_PORT, SHARD_ID, SHARD_SECRET, SHARDS
+from .dispatcher import update_chat_id
+from .words import Words
+
+logger = logging.getLogger(__name__)
+
+FORWARD_TIMEOUT = 60  # Seconds to keep retrying updates for a worker that is down before dropping them
+DICTIONARY_UPDATE_INTERVAL = 3 * 60 * 60
+
+# Sent with every request to a worker, workers reject requests without it
+# so that other local processes cannot inject updates or call RPC methods
+SECRET_HEADER = "X-Shard-Secret"
+secret = SHARD_SECRET or secrets.token_urlsafe(32)
+
+# Name mapped to coroutine function taking JSON-compatible keyword arguments and returning a JSON-compatible result
+rpc_methods: Dict[str, Callable[..., Awaitable[Any]]] = {}
+
+
+def rpc_method(func: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+    rpc_methods[func.__name__] = func
+    return func
+
+
+def sharded() -> bool:
+    return SHARDS > 1
+
+
+def shard_of(chat_id: int) -> int:
+    return chat_id % SHARDS
+
+
+def owns_chat(chat_id: int) -> bool:
+    return not sharded() or shard_of(chat_id) == SHARD_ID
+
+
+def shard_url(shard: int, path: str) -> str:
+    return f"http://127.0.0.1:{SHARD_BASE_PORT + shard}{path}"
+
+
+async def call_shard(shard: int, method: str, **kwargs: Any) -> Any:
+    if not sharded() or shard == SHARD_ID:
+        return await rpc_methods[method](**kwargs)
+    async with session.post(shard_url(shard, f"/rpc/{method}"), json=kwargs, headers={SECRET_HEADER: secret}) as resp:
+        resp.raise_for_status()
+        return (await resp.json())["result"]
+
+
+async def call_shards(method: str, **kwargs: Any) -> List[Any]:
+    # Results of every shard in shard order, a single result if not sharded
+    return await asyncio.gather(*[call_shard(shard, method, **kwargs) for shard in range(SHARDS)])
+
+
+@rpc_method
+async def reload_dictionary() -> bool:
+    # Called by the front after it rebuilds the dictionary
+    return Words.load_snapshot()
+
+
+# Worker
+
+@web.middleware
+async def check_secret(request: web.Request, handler: Callable[[web.Request], Awaitable[web.StreamResponse]]) -> Any:
+    if not hmac.compare_digest(request.headers.get(SECRET_HEADER, ""), secret):
+        logger.warning(f"Rejected request to {request.path} without the shard secret")
+        raise web.HTTPForbidden()
+    return await handler(request)
+
+
+async def handle_updates(request: web.Request) -> web.Response:
+    Bot.set_current(dp.bot)
+    Dispatcher.set_current(dp)
+    # Queued for their chats and handled in the background like polled updates, the front only waits for delivery
+    await dp.process_raw_updates(await request.json())
+    return web.Response()
+
+
+async def handle_rpc(request: web.Request) -> web.Response:
+    method = rpc_methods.get(request.match_info["method"])
+    if not method:
+        raise web.HTTPNotFound()
+    return web.json_response({"result": await method(**await request.json())})
+
+
+def run_worker(
+    on_startup: Callable[[Dispatcher], Awaitable[None]], on_shutdown: Callable[[Dispatcher], Awaitable[None]]
+) -> None:
+    app = web.Application(middlewares=[check_secret])
+    app.router.add_post("/updates", handle_updates)
+    app.router.add_post("/rpc/{method}", handle_rpc)
+    runner = web.AppRunner(app)
+
+    Bot.set_current(dp.bot)
+    Dispatcher.set_current(dp)
+    loop.add_signal_handler(signal.SIGTERM, loop.stop)
+    # Only listen once ready, the front holds updates back until then
+    loop.run_until_complete(on_startup(dp))
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", SHARD_BASE_PORT + SHARD_ID).start())
+    logger.info(f"Shard {SHARD_ID}/{SHARDS} ready")
+    try:
+        loop.run_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        loop.run_until_complete(runner.cleanup())
+        loop.run_until_complete(dp.queues.drain(FORWARD_TIMEOUT))
+        loop.run_until_complete(on_shutdown(dp))
+
+
+# Front
+
+async def supervise_worker(shard: int, processes: Dict[int, asyncio.subprocess.Process]) -> None:
+    while True:
+        processes[shard] = await asyncio.create_subprocess_exec(
+            sys.executable, "-m", "on9wordchainbot", env={**os.environ, "SHARD_ID": str(shard), "SHARD_SECRET": secret}
+        )
+        code = await processes[shard].wait()
+        logger.error(f"Shard {shard} exited with code {code}, restarting")
+        await asyncio.sleep(1)
+
+
+async def forward_updates(shard: int, queue: "asyncio.Queue[List[Dict[str, Any]]]") -> None:
+    # Updates of a shard are delivered in order, so a worker that is down only holds back its own chats
+    while True:
+        batch = await queue.get()
+        while not queue.empty():
+            batch += queue.get_nowait()
+
+        give_up = time.monotonic() + FORWARD_TIMEOUT
+        delay = 0.1
+        while True:
+            try:
+                async with session.post(
+                    shard_url(shard, "/updates"), json=batch, headers={SECRET_HEADER: secret}
+                ) as resp:
+                    resp.raise_for_status()
+                break
+            except aiohttp.ClientError as e:
+                if time.monotonic() > give_up:
+                    logger.error(f"Dropped {len(batch)} updates for shard {shard}: {e.__class__.__name__}: {e}")
+                    break
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 5)
+
+
+async def update_dictionary(first_delay: float) -> None:
+    await asyncio.sleep(first_delay)
+    while True:
+        version = Words.version
+        try:
+            await Words.update()
+            if Words.version != version:
+                await call_shards("reload_dictionary")
+        except Exception:
+            logger.exception("Unable to update dictionary")
+        await asyncio.sleep(DICTIONARY_UPDATE_INTERVAL)
+
+
+async def poll_updates(queues: List["asyncio.Queue[List[Dict[str, Any]]]"]) -> None:
+    await bot.delete_webhook()  # In case webhook mode was used before, pending updates are kept
+    offset = None
+    while True:
+        try:
+            updates = await bot.get_updates(offset=offset, timeout=20)
+        except Exception as e:
+            logger.error(f"Unable to get updates: {e.__class__.__name__}: {e}")
+            await asyncio.sleep(5)
+            continue
+
+        batches: Dict[int, List[Dict[str, Any]]] = {}
+        for update in updates:
+            offset = update.update_id + 1
+            batches.setdefault(shard_of(update_chat_id(update)), []).append(update.to_python())
+        for shard, batch in batches.items():
+            queues[shard].put_nowait(batch)
+
+
+def run_front() -> None:
+    # Workers need a dictionary snapshot to start with
+    if Words.load_snapshot():
+        first_update_delay = 0
+    else:
+        loop.run_until_complete(Words.update())
+        first_update_delay = DICTIONARY_UPDATE_INTERVAL
+
+    processes: Dict[int, asyncio.subprocess.Process] = {}
+    queues: List["asyncio.Queue[List[Dict[str, Any]]]"] = [asyncio.Queue() for _ in range(SHARDS)]
+    tasks = [loop.create_task(supervise_worker(shard, processes)) for shard in range(SHARDS)]
+    tasks += [loop.create_task(forward_updates(shard, queues[shard])) for shard in range(SHARDS)]
+    tasks.append(loop.create_task(update_dictionary(first_update_delay)))
+    tasks.append(loop.create_task(poll_updates(queues)))
+
+    loop.add_signal_handler(signal.SIGTERM, loop.stop)
+    logger.info(f"Routing updates to {SHARDS} shards")
+    try:
+        loop.run_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Workers save their games on SIGTERM
+        for process in processes.values():
+            if process.returncode is None:
+                process.terminate()
+        loop.run_until_complete(asyncio.gather(*[process.wait() for process in processes.values()]))
+        loop.run_until_complete(on_front_shutdown())
+
+
+async def on_front_shutdown() -> None:
+    from . import pool
+
+    await asyncio.gather(session.close(), pool.close())
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .models import ClassicGame
+
+logger = logging.getLogger(__name__)
+
+
+class GameSnapshots:
+    # Saves the state of running games to the gamesnapshot table so that they survive restarts and crashes
+    # Games are only marked as changed during play and a single task writes them out every interval seconds,
+    # so turns never wait on the database and any number of changes to a game in between costs one write
+    # See ClassicGame.snapshot for what is saved
+
+    __slots__ = ("interval", "_pending", "_changed", "_task", "_flush_lock")
+
+    def __init__(self, interval: float = 1.0) -> None:
+        self.interval = interval
+        # Group id mapped to the game to save, or None to delete the saved game
+        self._pending: Dict[int, Optional["ClassicGame"]] = {}
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None  # Keeps writes in order
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def mark(self, game: "ClassicGame") -> None:
+        self._pending[game.group_id] = game
+        self._notify()
+
+    def discard(self, group_id: int) -> None:
+        self._pending[group_id] = None
+        self._notify()
+
+    def _notify(self) -> None:
+        if self._task is None:  # Started on first use since it needs a running event loop
+            self._changed = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+        self._changed.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._changed.wait()
+            await asyncio.sleep(self.interval)  # Let changes pile up
+            self._changed.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Unable to save game snapshots")
+                self._changed.set()  # Retry after the next interval
+
+    async def flush(self) -> None:
+        from . import pool
+
+        if self._flush_lock is None:
+            return
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            # Games are serialized here rather than when marked, so only their latest state is written
+            rows = []
+            deleted = []
+            for group_id, game in pending.items():
+                if game is None:
+                    deleted.append(group_id)
+                else:
+                    rows.append((group_id, game.__class__.__name__, json.dumps(game.snapshot(), separators=(",", ":"))))
+
+            try:
+                async with pool.acquire() as conn:
+                    async with conn.transaction():
+                        if deleted:
+                            await conn.execute("DELETE FROM gamesnapshot WHERE group_id = ANY($1::BIGINT[]);", deleted)
+                        if rows:
+                            await conn.executemany(
+                                """\
+                                INSERT INTO gamesnapshot (group_id, game_mode, data, saved_at)
+                                    VALUES ($1, $2, $3, NOW())
+                                ON CONFLICT (group_id) DO UPDATE
+                                    SET game_mode = EXCLUDED.game_mode,
+                                        data = EXCLUDED.data,
+                                        saved_at = EXCLUDED.saved_at;""",
+                                rows
+                            )
+            except Exception:
+                # Put back whatever was not superseded in the meantime
+                for group_id, game in pending.items():
+                    self._pending.setdefault(group_id, game)
+                raise
+
+    async def restore(self) -> None:
+        # Resume the games saved before the last shutdown or crash, the dictionary must be loaded
+        from . import GlobalState, pool
+        from .sharding import owns_chat
+
+        async with pool.acquire() as conn:
+            rows = await conn.fetch("SELECT group_id, game_mode, data FROM gamesnapshot;")
+
+        rows = [row for row in rows if owns_chat(row["group_id"])]  # Other shards restore the rest
+        for group_id, game_mode, data in rows:
+            try:
+                self.resume(group_id, game_mode, json.loads(data))
+            except Exception:
+                logger.exception(f"Unable to restore {game_mode} in {group_id}")
+                self.discard(group_id)
+        if rows:
+            logger.info(f"Restored {len(GlobalState.games)} of {len(rows)} saved games")
+
+    async def migrate(self, group_id: int, new_group_id: int) -> None:
+        # Move the game of a group that became a supergroup to the new group id
+        # If another shard owns the new id, the game is stopped here and continues there from its snapshot
+        from . import GlobalState
+        from .sharding import call_shard, owns_chat, shard_of
+
+        game = GlobalState.games.pop(group_id, None)
+        if game is None:
+            return
+        self.discard(group_id)
+        if owns_chat(new_group_id):
+            game.group_id = new_group_id
+            GlobalState.games[new_group_id] = game
+            self.mark(game)
+            return
+
+        data = game.snapshot()
+        game.stop()
+        await call_shard(
+            shard_of(new_group_id), "adopt_game",
+            group_id=new_group_id, game_mode=game.__class__.__name__, data=data
+        )
+
+    def resume(
+        self, group_id: int, game_mode: str, data: Dict[str, Any], reason: str = "sau khi bot khởi động lại"
+    ) -> "ClassicGame":
+        # Continue a game from its snapshot, raises if the snapshot cannot be loaded
+        from . import GlobalState
+        from .models import GAME_MODES
+
+        game_modes = {game_mode.__name__: game_mode for game_mode in GAME_MODES}
+        game = game_modes[game_mode](group_id)
+        game.restore(data)
+        GlobalState.games[group_id] = game
+        asyncio.create_task(game.main_loop(resume_reason=reason))
+        return game
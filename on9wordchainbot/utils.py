@@ -1,54 +1,18 @@
-import random
 from functools import wraps
 from string import ascii_lowercase
-from typing import Any, Callable, List, Optional, Set
+from typing import Any, Callable
 
 from aiocache import cached
 from aiogram import types
 
 from . import bot, on9bot, pool
 from .constants import ADMIN_GROUP_ID, VIP
-from .words import Words
 
 
 def is_word(s: str) -> bool:
     return all(c in ascii_lowercase for c in s)
 
 
-def check_word_existence(word: str) -> bool:
-    return word in Words.dawg
-
-
-def filter_words(
-    min_len: int = 1,
-    prefix: Optional[str] = None,
-    required_letter: Optional[str] = None,
-    banned_letters: Optional[List[str]] = None,
-    exclude_words: Optional[Set[str]] = None
-) -> List[str]:
-    words = Words.dawg.keys(prefix) if prefix else Words.dawg.keys()
-    if min_len > 1:
-        words = [w for w in words if len(w) >= min_len]
-    if required_letter:
-        words = [w for w in words if required_letter in w]
-    if banned_letters:
-        words = [w for w in words if all(i not in w for i in banned_letters)]
-    if exclude_words:
-        words = [w for w in words if w not in exclude_words]
-    return words
-
-
-def get_random_word(
-    min_len: int = 1,
-    prefix: Optional[str] = None,
-    required_letter: Optional[str] = None,
-    banned_letters: Optional[List[str]] = None,
-    exclude_words: Optional[Set[str]] = None
-) -> Optional[str]:
-    words = filter_words(min_len, prefix, required_letter, banned_letters, exclude_words)
-    return random.choice(words) if words else None
-
-
 async def send_admin_group(*args: Any, **kwargs: Any) -> types.Message:
     return await bot.send_message(ADMIN_GROUP_ID, *args, disable_web_page_preview=True, **kwargs)
 
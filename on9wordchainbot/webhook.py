@@ -0,0 +1,85 @@
+# Webhook mode, enabled by setting WEBHOOK_URL
+# Telegram POSTs updates to an embedded aiohttp server, so an answer reaches the bot as soon as it is sent
+# instead of waiting on the round trips of a single getUpdates long poll.
+# Try it locally with benchmarks/fake_bot_api.py.
+
+import hmac
+import logging
+import secrets
+import signal
+from typing import Awaitable, Callable
+
+from aiogram import Bot, Dispatcher
+from aiohttp import web
+
+from . import bot, dp, loop
+from .constants import (WEBHOOK_DRAIN_SECONDS, WEBHOOK_HOST, WEBHOOK_MAX_CONCURRENCY, WEBHOOK_PATH, WEBHOOK_PORT,
+                        WEBHOOK_SECRET, WEBHOOK_URL)
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookServer:
+    # Receives updates and queues them for their chats like polled updates
+    # While draining, new updates are refused so that Telegram redelivers them after the restart
+
+    __slots__ = ("secret", "draining", "received", "rejected")
+
+    def __init__(self, secret: str) -> None:
+        self.secret = secret
+        self.draining = False
+
+        self.received = 0
+        self.rejected = 0  # Wrong secret token
+
+    async def handle(self, request: web.Request) -> web.Response:
+        if not hmac.compare_digest(request.headers.get("X-Telegram-Bot-Api-Secret-Token", ""), self.secret):
+            self.rejected += 1
+            raise web.HTTPUnauthorized()
+        if self.draining:
+            raise web.HTTPServiceUnavailable()
+
+        self.received += 1
+        Bot.set_current(dp.bot)
+        Dispatcher.set_current(dp)
+        await dp.process_raw_updates([await request.json()])
+        return web.Response()
+
+    async def drain(self, timeout: float) -> None:
+        self.draining = True
+        await dp.queues.drain(timeout)
+
+
+def run_webhook(
+    on_startup: Callable[[Dispatcher], Awaitable[None]], on_shutdown: Callable[[Dispatcher], Awaitable[None]]
+) -> None:
+    server = WebhookServer(WEBHOOK_SECRET or secrets.token_urlsafe(32))
+    app = web.Application()
+    app.router.add_post(WEBHOOK_PATH, server.handle)
+    runner = web.AppRunner(app)
+
+    Bot.set_current(dp.bot)
+    Dispatcher.set_current(dp)
+    loop.add_signal_handler(signal.SIGTERM, loop.stop)
+    loop.run_until_complete(on_startup(dp))
+    loop.run_until_complete(runner.setup())
+    loop.run_until_complete(web.TCPSite(runner, WEBHOOK_HOST, WEBHOOK_PORT).start())
+    # Updates sent while the bot was down are kept and delivered now
+    loop.run_until_complete(
+        bot.set_webhook(
+            WEBHOOK_URL.rstrip("/") + WEBHOOK_PATH,
+            max_connections=min(WEBHOOK_MAX_CONCURRENCY, 100),  # Bot API limit
+            drop_pending_updates=False,
+            secret_token=server.secret
+        )
+    )
+    logger.info(f"Receiving updates on {WEBHOOK_HOST}:{WEBHOOK_PORT}{WEBHOOK_PATH}")
+    try:
+        loop.run_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        loop.run_until_complete(server.drain(WEBHOOK_DRAIN_SECONDS))
+        loop.run_until_complete(runner.cleanup())
+        logger.info(f"Handled {server.received} updates, rejected {server.rejected} with a wrong secret token")
+        loop.run_until_complete(on_shutdown(dp))
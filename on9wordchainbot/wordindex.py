@@ -0,0 +1,383 @@
+import json
+import os
+import random
+import resource
+import struct
+import sys
+from array import array
+from itertools import groupby
+from string import ascii_lowercase
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from zlib import crc32
+
+import numpy as np
+from dawg import IntCompletionDAWG
+
+# Bit of each letter in word letter masks
+LETTER_BITS = {c: 1 << i for i, c in enumerate(ascii_lowercase)}
+# Set in the masks of words with letters other than English ones, which cannot be answered (see answer_handler)
+# and are left out of the transition tables
+NON_ASCII_BIT = 1 << len(ascii_lowercase)
+# Row/column of each letter in the letter-transition tables
+LETTER_INDEX = {c: i for i, c in enumerate(ascii_lowercase)}
+
+# Bump SNAPSHOT_VERSION whenever the snapshot layout or the meaning of its contents changes
+SNAPSHOT_MAGIC = b"ON9DICT\0"
+SNAPSHOT_VERSION = 4
+SNAPSHOT_ARRAYS = (
+    "data", "offsets", "masks", "lengths", "suggest_keys", "suggest_ids", "transitions", "transition_ids"
+)
+
+# Spelling suggestions use a symmetric delete index over the first SUGGEST_PREFIX_LENGTH letters of each word
+# Words are indexed with deletes up to distance 2 unless that exceeds SUGGEST_MAX_ENTRIES, then distance 1
+# Every word is indexed either way, at distance 1 with at most SUGGEST_PREFIX_LENGTH + 1 entries each
+SUGGEST_PREFIX_LENGTH = 7
+SUGGEST_MAX_ENTRIES = 4_000_000
+
+
+def letter_mask(letters: Iterable[str]) -> int:
+    mask = 0
+    for c in letters:
+        mask |= LETTER_BITS.get(c, 0)
+    return mask
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def deletes(word: str, depth: int) -> Set[str]:
+    # word and all strings obtained by deleting up to depth letters from it
+    result = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    # Optimal string alignment distance (adjacent transpositions count as one edit)
+    # Returns max_distance + 1 as soon as the distance is known to exceed max_distance
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return min(prev[-1], max_distance + 1)
+
+
+def packed_bits(bits: np.ndarray, lo: int, hi: int) -> np.ndarray:
+    # Unpack bits lo to hi (exclusive) of a little-endian packed bitset
+    offset = lo & 7
+    return np.unpackbits(bits[lo >> 3:(hi + 7) >> 3], bitorder="little")[offset:offset + hi - lo]
+
+
+class WordIndex:
+    # Words bucketed by first letter and sorted by length within each bucket
+    # so that candidates for a turn (starting letter + minimum length) form a contiguous slice
+    # A word's position in the index is its word id
+    # Word tables are flat arrays so that a saved index can be memory-mapped and shared between processes
+    # The DAWG is not shared: the dawg library can only load from bytes or a file into its own memory,
+    # so every process loading a snapshot holds a private copy of it
+
+    __slots__ = (
+        "dawg", "data", "offsets", "masks", "lengths", "suggest_keys", "suggest_ids", "suggest_depth",
+        "transitions", "transition_ids", "transition_ends", "start_transitions", "buckets", "meta"
+    )
+
+    def __init__(
+        self,
+        dawg: IntCompletionDAWG,
+        data: np.ndarray,
+        offsets: np.ndarray,
+        masks: np.ndarray,
+        lengths: np.ndarray,
+        suggest_keys: np.ndarray,
+        suggest_ids: np.ndarray,
+        suggest_depth: int,
+        transitions: np.ndarray,
+        transition_ids: np.ndarray,
+        buckets: Dict[str, Tuple[int, int, List[int]]],
+        meta: Dict[str, Any]
+    ) -> None:
+        # Directed acyclic word graph (DAWG) mapping words to word ids
+        self.dawg = dawg
+        # UTF-8 encoded words back to back, word i is data[offsets[i]:offsets[i + 1]]
+        self.data = data
+        self.offsets = offsets
+        # Per-word mask of contained letters (and NON_ASCII_BIT) and word lengths for vectorized filtering
+        self.masks = masks
+        self.lengths = lengths
+        # Sorted CRC32 hashes of word prefix deletes and the ids of the words they came from
+        self.suggest_keys = suggest_keys
+        self.suggest_ids = suggest_ids
+        self.suggest_depth = suggest_depth
+        # Letter-transition counts of words made of ASCII letters
+        # transitions[s, e, n] is the number of words starting with letter s, ending with letter e
+        # and having at least n letters, the last length column is always zero
+        self.transitions = transitions.reshape(len(ascii_lowercase), len(ascii_lowercase), -1)
+        # Ids of those words sorted by (start letter, end letter, length), so that the words of a
+        # (start letter, end letter) cell with at least n letters are the last transitions[s, e, n] of the cell
+        self.transition_ids = transition_ids
+        self.transition_ends = np.cumsum(self.transitions[:, :, 0], dtype=np.int64).reshape(self.transitions.shape[:2])
+        # Counts by start letter and minimum length only
+        self.start_transitions = self.transitions.sum(axis=1, dtype=np.int64)
+        # First letter mapped to (start, end, length offsets) of its bucket
+        # length offsets[n] is the index of the first word in the bucket with at least n letters
+        self.buckets = buckets
+        # Information about the word sources the index was built from
+        self.meta = meta
+
+    @classmethod
+    def build(cls, words: Iterable[str], meta: Optional[Dict[str, Any]] = None) -> "WordIndex":
+        words = sorted(set(words), key=lambda w: (w[0], len(w), w))
+        dawg = IntCompletionDAWG(zip(words, range(len(words))))
+
+        encoded = [w.encode() for w in words]
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        offsets = np.zeros(len(words) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+        del encoded
+
+        buckets = {}
+        start = 0
+        for letter, group in groupby(words, key=lambda w: w[0]):
+            lengths = [len(w) for w in group]
+            end = start + len(lengths)
+            length_offsets = [start] * 2  # No word has fewer than one letter
+            i = start
+            for n in range(2, lengths[-1] + 1):
+                while len(words[i]) < n:
+                    i += 1
+                length_offsets.append(i)
+            buckets[letter] = (start, end, length_offsets)
+            start = end
+
+        masks = np.fromiter(
+            (letter_mask(set(w)) | (0 if w.isascii() else NON_ASCII_BIT) for w in words),
+            dtype=np.uint32, count=len(words)
+        )
+        lengths = np.fromiter((len(w) for w in words), dtype=np.uint16, count=len(words))
+
+        # Upper bound of index entries at distance 2, fall back to distance 1 beyond the memory cap
+        entries = sum(1 + n + n * (n - 1) // 2 for n in (min(len(w), SUGGEST_PREFIX_LENGTH) for w in words))
+        suggest_depth = 2 if entries <= SUGGEST_MAX_ENTRIES else 1
+        keys = array("I")
+        ids = array("I")
+        for i, w in enumerate(words):
+            for d in deletes(w[:SUGGEST_PREFIX_LENGTH], suggest_depth):
+                keys.append(crc32(d.encode()))
+                ids.append(i)
+        suggest_keys = np.frombuffer(keys, dtype=np.uint32)
+        order = np.argsort(suggest_keys, kind="stable")
+        suggest_keys = suggest_keys[order]
+        suggest_ids = np.frombuffer(ids, dtype=np.uint32)[order]
+
+        # Letter-transition tables, only words that can be answered (ASCII letters) are counted
+        first = np.fromiter((LETTER_INDEX.get(w[0], -1) for w in words), dtype=np.int64, count=len(words))
+        last = np.fromiter((LETTER_INDEX.get(w[-1], -1) for w in words), dtype=np.int64, count=len(words))
+        playable = np.flatnonzero(np.fromiter((w.isascii() for w in words), dtype=bool, count=len(words)))
+        cells = first[playable] * len(ascii_lowercase) + last[playable]
+        playable_lengths = lengths[playable].astype(np.int64)
+        columns = int(playable_lengths.max()) + 2 if len(playable) else 2
+        histogram = np.bincount(
+            cells * columns + playable_lengths, minlength=len(ascii_lowercase) ** 2 * columns
+        ).reshape(-1, columns)
+        # Reverse cumulative sum over lengths: words with at least n letters
+        transitions = np.cumsum(histogram[:, ::-1], axis=1)[:, ::-1].astype(np.uint32)
+        transition_ids = playable[np.lexsort((playable_lengths, cells))].astype(np.uint32)
+
+        return cls(
+            dawg, data, offsets, masks, lengths, suggest_keys, suggest_ids, suggest_depth,
+            transitions, transition_ids, buckets, meta or {}
+        )
+
+    def save(self, path: str) -> None:
+        # Snapshot layout: magic, header length, JSON header, then 8-byte aligned blobs
+        # Written to a temporary file first so that readers never see a partial snapshot
+        blobs = [self.dawg.tobytes()] + [getattr(self, name).tobytes() for name in SNAPSHOT_ARRAYS]
+        positions = []
+        position = 0
+        for blob in blobs:
+            positions.append((position, len(blob)))
+            position = _align(position + len(blob))
+
+        header = json.dumps(
+            {
+                "version": SNAPSHOT_VERSION,
+                "meta": self.meta,
+                "buckets": self.buckets,
+                "suggest_depth": self.suggest_depth,
+                "dawg": positions[0],
+                "arrays": {
+                    name: (*pos, getattr(self, name).dtype.str)
+                    for name, pos in zip(SNAPSHOT_ARRAYS, positions[1:])
+                }
+            }
+        ).encode()
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(SNAPSHOT_MAGIC + struct.pack("<I", len(header)) + header)
+            f.write(bytes(_align(f.tell()) - f.tell()))
+            for blob in blobs:
+                f.write(blob)
+                f.write(bytes(_align(len(blob)) - len(blob)))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "WordIndex":
+        # Word tables stay memory-mapped, so processes loading the same snapshot share their pages
+        # The DAWG is copied out of the mapping (see WordIndex)
+        mm = np.memmap(path, dtype=np.uint8, mode="r")
+        if bytes(mm[:len(SNAPSHOT_MAGIC)]) != SNAPSHOT_MAGIC:
+            raise ValueError("Not a dictionary snapshot")
+        (header_len,) = struct.unpack("<I", bytes(mm[len(SNAPSHOT_MAGIC):len(SNAPSHOT_MAGIC) + 4]))
+        header_start = len(SNAPSHOT_MAGIC) + 4
+        header = json.loads(bytes(mm[header_start:header_start + header_len]))
+        if header["version"] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported dictionary snapshot version {header['version']}")
+
+        body = mm[_align(header_start + header_len):]
+        dawg_start, dawg_len = header["dawg"]
+        dawg = IntCompletionDAWG().frombytes(bytes(body[dawg_start:dawg_start + dawg_len]))
+        arrays = {
+            name: body[start:start + length].view(np.dtype(dtype))
+            for name, (start, length, dtype) in header["arrays"].items()
+        }
+        buckets = {letter: tuple(bucket) for letter, bucket in header["buckets"].items()}
+        return cls(dawg, suggest_depth=header["suggest_depth"], buckets=buckets, meta=header["meta"], **arrays)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def id(self, word: str) -> Optional[int]:
+        return self.dawg.get(word)
+
+    def word(self, i: int) -> str:
+        return self.data[self.offsets[i]:self.offsets[i + 1]].tobytes().decode()
+
+    def span(self, letter: str, min_len: int = 1) -> Tuple[int, int]:
+        # Index range of words starting with letter and having at least min_len letters
+        if letter not in self.buckets:
+            return 0, 0
+        start, end, offsets = self.buckets[letter]
+        if min_len < len(offsets):
+            return offsets[max(min_len, 0)], end
+        return end, end
+
+    def spans(self, min_len: int = 1, prefix: Optional[str] = None) -> List[Tuple[int, int]]:
+        # Index ranges that may contain words matching prefix and min_len
+        # Only the first letter of prefix is taken into account
+        if prefix:
+            spans = [self.span(prefix[0], max(min_len, len(prefix)))]
+        else:
+            spans = [self.span(letter, min_len) for letter in self.buckets]
+        return [(lo, hi) for lo, hi in spans if lo < hi]
+
+    def query(
+        self,
+        min_len: int = 1,
+        prefix: Optional[str] = None,
+        required_letter: Optional[str] = None,
+        banned_letters: Optional[Iterable[str]] = None,
+        exclude: Optional[np.ndarray] = None,
+        answerable: bool = False
+    ) -> np.ndarray:
+        # Ids of words matching all conditions
+        # exclude is a little-endian packed bitset over word ids (see packed_bits)
+        # answerable leaves out words with letters other than English ones, like the transition tables
+        required = letter_mask(required_letter) if required_letter else 0
+        banned = (letter_mask(banned_letters) if banned_letters else 0) | (NON_ASCII_BIT if answerable else 0)
+        if required_letter and not required or required & banned:  # No word can match
+            return np.empty(0, dtype=np.intp)
+
+        result = []
+        for lo, hi in self.spans(min_len, prefix):
+            masks = self.masks[lo:hi]
+            if required and banned:
+                selected = (masks & (required | banned)) == required
+            elif required:
+                selected = (masks & required) != 0
+            elif banned:
+                selected = (masks & banned) == 0
+            else:
+                selected = None
+            if exclude is not None:
+                unused = packed_bits(exclude, lo, hi) == 0
+                selected = unused if selected is None else selected & unused
+            result.append(np.arange(lo, hi) if selected is None else np.flatnonzero(selected) + lo)
+
+        ids = np.concatenate(result) if result else np.empty(0, dtype=np.intp)
+        if prefix and len(prefix) > 1:
+            ids = ids[[self.word(i).startswith(prefix) for i in ids]] if len(ids) else ids
+        return ids
+
+    def similar(self, word: str, max_distance: int = 2) -> Tuple[int, List[int]]:
+        # Smallest distance up to max_distance with words that far from word, and the ids of those words
+        # Recall at distance 2 is partial when the index only holds distance 1 deletes
+        for distance in range(1, max_distance + 1):
+            hashes = np.fromiter(
+                (crc32(d.encode()) for d in deletes(word[:SUGGEST_PREFIX_LENGTH], distance)), dtype=np.uint32
+            )
+            starts = np.searchsorted(self.suggest_keys, hashes, side="left")
+            ends = np.searchsorted(self.suggest_keys, hashes, side="right")
+            ids = np.unique(np.concatenate([self.suggest_ids[start:end] for start, end in zip(starts, ends)]))
+            ids = ids[np.abs(self.lengths[ids].astype(np.int32) - len(word)) <= distance]
+            ids = [int(i) for i in ids if edit_distance(word, self.word(i), distance) <= distance]
+            if ids:
+                return distance, ids
+        return max_distance + 1, []
+
+    def transition_counts(self, min_len: int = 1) -> np.ndarray:
+        # 26x26 matrix of the number of words by start letter and end letter having at least min_len letters
+        return self.transitions[:, :, min(max(min_len, 0), self.transitions.shape[2] - 1)]
+
+    def start_counts(self, min_len: int = 1) -> np.ndarray:
+        # Number of words by start letter having at least min_len letters
+        return self.start_transitions[:, min(max(min_len, 0), self.start_transitions.shape[1] - 1)]
+
+    def sample_transition(
+        self, start: str, end: str, min_len: int = 1, exclude: Optional[np.ndarray] = None, attempts: int = 16
+    ) -> Optional[int]:
+        # Id of a random word starting with start, ending with end and having at least min_len letters
+        # Excluded words are skipped by rejection sampling, then by a scan of the cell once it is mostly excluded
+        s, e = LETTER_INDEX[start], LETTER_INDEX[end]
+        hi = int(self.transition_ends[s, e])
+        lo = hi - int(self.transition_counts(min_len)[s, e])
+        if lo >= hi:
+            return None
+        if exclude is None:
+            return int(self.transition_ids[random.randrange(lo, hi)])
+        for _ in range(attempts):
+            i = int(self.transition_ids[random.randrange(lo, hi)])
+            if not exclude[i >> 3] >> (i & 7) & 1:
+                return i
+        ids = self.transition_ids[lo:hi]
+        ids = ids[(exclude[ids >> 3] >> (ids & 7) & 1) == 0]
+        return int(ids[random.randrange(len(ids))]) if len(ids) else None
+
+
+def build_index(words: Iterable[str], path: str, meta: Dict[str, Any]) -> int:
+    # Runs in a worker process, the bot process loads the index from the saved snapshot
+    # Returns the peak RSS of the worker in kilobytes
+    WordIndex.build(words, meta).save(path)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+if __name__ == "__main__":
+    # Build worker, run as a script by Words.update so that it does not import the bot package
+    # Usage: wordindex.py <words file, one per line> <snapshot path> <meta JSON>
+    # Prints the peak RSS of the worker in kilobytes
+    words_path, snapshot_path, snapshot_meta = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+    with open(words_path, encoding="utf-8") as f:
+        print(build_index((line.rstrip("\n") for line in f), snapshot_path, snapshot_meta))
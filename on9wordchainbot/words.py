@@ -1,45 +1,459 @@
 import asyncio
+import heapq
+import json
 import logging
-from typing import List
+import os
+import random
+import resource
+import sys
+import time
+from collections import OrderedDict
+from itertools import islice
+from string import ascii_lowercase
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Set, Tuple
 
-from dawg import CompletionDAWG
+import numpy as np
+from dawg import IntCompletionDAWG
 
-from .constants import WORDLIST_SOURCE
+from .constants import DICTIONARY_SNAPSHOT_PATH, VPDifficulty, WORDLIST_SOURCE
+from . import wordindex
+from .wordindex import LETTER_INDEX, WordIndex, edit_distance
 
 logger = logging.getLogger(__name__)
 
 
 class Words:
-    # Directed acyclic word graph (DAWG)
-    dawg: CompletionDAWG
+    # Directed acyclic word graph (DAWG) mapping words to word ids
+    dawg: IntCompletionDAWG
+    # Words bucketed by first letter and length for candidate queries
+    index: WordIndex
     count: int
+    version = 0  # Incremented whenever the set of words changes
+
+    # State of both word sources at the last rebuild, used to skip rebuilds when nothing changed
+    source_etag: Optional[str] = None
+    source_last_modified: Optional[str] = None
+    db_count: Optional[int] = None
+    db_checksum: Optional[str] = None
+
+    # Words accepted since the last rebuild, consulted together with the index
+    # Folded into the index on the next rebuild since the database then reflects them
+    added: Set[str] = set()
+
+    # Rejected words mapped to rejection reasons
+    rejected: Dict[str, Optional[str]] = {}
+
+    update_lock = asyncio.Lock()  # Startup and periodic updates must not race each other
 
     @staticmethod
     async def update() -> None:
+        async with Words.update_lock:
+            await asyncio.gather(Words._update(), Words.update_rejected())
+
+    @staticmethod
+    async def update_rejected() -> None:
+        from . import pool
+
+        async with pool.acquire() as conn:
+            res = await conn.fetch("CHỌN từ, lý do TỪ danh sách từ KHÔNG được chấp nhận;")
+        Words.rejected = {word: reason for word, reason in res}
+
+    @staticmethod
+    async def _update() -> None:
         # Words retrieved from online repo and database table with additional approved words
         logger.info("Lấy từ")
 
-        async def get_words_from_source() -> List[str]:
+        # Words are normalized as they arrive and written out for the build worker, which deduplicates them
+        words_path = f"{DICTIONARY_SNAPSHOT_PATH}.{os.getpid()}.words"
+        words_file = open(words_path, "w", encoding="utf-8")
+
+        def add_word(word: str) -> None:
+            word = word.rstrip("\r\n").lower()
+            if word.isalpha():
+                words_file.write(word + "\n")
+
+        async def add_words_from_source(conditional: bool) -> Optional[Mapping[str, str]]:
+            # Response headers, or None if the source is unchanged since the last rebuild
             from . import session
 
-            async with session.get(WORDLIST_SOURCE) as resp:
-                return (await resp.text()).splitlines()
+            headers = {}
+            if conditional and Words.source_etag:
+                headers["If-None-Match"] = Words.source_etag
+            if conditional and Words.source_last_modified:
+                headers["If-Modified-Since"] = Words.source_last_modified
+
+            async with session.get(WORDLIST_SOURCE, headers=headers) as resp:
+                if resp.status == 304:
+                    return None
+                resp.raise_for_status()
+                # Stream line by line instead of holding the whole response
+                encoding = resp.get_encoding()
+                async for line in resp.content:
+                    add_word(line.decode(encoding))
+                return resp.headers
 
-        async def get_words_from_db() -> List[str]:
+        async def get_db_checksum() -> Tuple[int, str]:
             from . import pool
 
             async with pool.acquire() as conn:
-                res = await conn.fetch("CHỌN từ từ danh sách từ NƠI được chấp nhận;")
-                return [row[0] for row in res]
+                return tuple(await conn.fetchrow(
+                    "SELECT COUNT(*), MD5(COALESCE(STRING_AGG(word, ' ' ORDER BY word), '')) "
+                    "FROM wordlist WHERE accepted;"
+                ))
+
+        async def add_words_from_db() -> None:
+            from . import pool
+
+            async with pool.acquire() as conn:
+                async with conn.transaction():  # Cursors require a transaction
+                    async for row in conn.cursor("CHỌN từ từ danh sách từ NƠI được chấp nhận;"):
+                        add_word(row[0])
+
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        try:
+            # Only validate against the previous state if there is a dictionary to keep
+            built = hasattr(Words, "index")
+            source_task = asyncio.create_task(add_words_from_source(conditional=built))
+            checksum_task = asyncio.create_task(get_db_checksum())
+            source_headers = await source_task
+            db_count, db_checksum = await checksum_task
+
+            changes = []
+            if source_headers is not None:
+                changes.append("source" + (" (first load)" if not built else ""))
+            if db_checksum != Words.db_checksum:
+                changes.append(f"accepted words ({Words.db_count} -> {db_count})")
+            if not changes:
+                logger.info("Word list unchanged, skipping rebuild")
+                return
+            logger.info("Word list changed: " + ", ".join(changes))
+
+            if source_headers is None:  # Only the database changed, but the source words are needed for the rebuild
+                source_headers = await add_words_from_source(conditional=False)
+            await add_words_from_db()
+            words_file.close()
+
+            logger.info("Đang xử lý từ")
+
+            meta = {
+                "source_etag": source_headers.get("ETag"),
+                "source_last_modified": source_headers.get("Last-Modified"),
+                "db_count": db_count,
+                "db_checksum": db_checksum
+            }
+
+            # Build in a separate process so that running games are not stalled,
+            # they keep using the current dictionary until the new one is swapped in
+            # The worker is a fresh interpreter running wordindex.py rather than a fork of this process,
+            # whose threads may hold locks at the time of the fork, and it must not import the bot package,
+            # which connects to Telegram and the database
+            start = time.perf_counter()
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, wordindex.__file__, words_path, DICTIONARY_SNAPSHOT_PATH, json.dumps(meta),
+                stdout=asyncio.subprocess.PIPE
+            )
+            stdout, _ = await process.communicate()
+            if process.returncode:
+                raise RuntimeError(f"Dictionary build worker exited with code {process.returncode}")
+            worker_rss = int(stdout)
+            build_time = time.perf_counter() - start
+        finally:
+            words_file.close()
+            os.remove(words_path)
+
+        start = time.perf_counter()
+        Words.swap(WordIndex.load(DICTIONARY_SNAPSHOT_PATH))
+        stall_time = time.perf_counter() - start
+
+        logger.info(f"DAWG updated in {build_time:.3f}s, event loop blocked for {stall_time * 1000:.1f}ms on swap")
+        # ru_maxrss is in kilobytes on Linux
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        logger.info(
+            f"Peak RSS: {rss / 1024:.1f}MB in bot process (+{(rss - rss_before) / 1024:.1f}MB during refresh), "
+            f"{worker_rss / 1024:.1f}MB in build worker"
+        )
+
+    @staticmethod
+    def load_snapshot() -> bool:
+        # Serve from the dictionary saved by the last build, if any
+        start = time.perf_counter()
+        try:
+            index = WordIndex.load(DICTIONARY_SNAPSHOT_PATH)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            logger.warning(f"Unable to load dictionary snapshot: {e.__class__.__name__}: {e}")
+            return False
+        Words.swap(index)
+        logger.info(f"Loaded {Words.count} words from snapshot in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return True
+
+    @staticmethod
+    def swap(index: WordIndex) -> None:
+        # No awaits in here so that the swap is atomic to everything else on the event loop
+        Words.index = index
+        Words.dawg = index.dawg
+        Words.added = {w for w in Words.added if w not in index.dawg}
+        Words.count = len(index) + len(Words.added)
+        Words.version += 1
+        Words.source_etag = index.meta.get("source_etag")
+        Words.source_last_modified = index.meta.get("source_last_modified")
+        Words.db_count = index.meta.get("db_count")
+        Words.db_checksum = index.meta.get("db_checksum")
+
+    @staticmethod
+    def add_words(words: Iterable[str]) -> None:
+        Words.added.update(w for w in words if w not in Words.dawg)
+        Words.count = len(Words.index) + len(Words.added)
+        Words.version += 1
+
+    @staticmethod
+    def exists(word: str) -> bool:
+        return word in Words.added or word in Words.dawg
+
+    @staticmethod
+    def suggest(word: str, limit: int = 3, prefix: Optional[str] = None) -> List[str]:
+        # Closest words within 2 edits of a word not in the dictionary, for "did you mean" replies
+        distance, ids = Words.index.similar(word)
+        words = [Words.index.word(i) for i in ids]
+        for w in Words.added:
+            d = edit_distance(word, w, min(distance, 2))
+            if d < distance:
+                distance, words = d, [w]
+            elif d == distance <= 2:
+                words.append(w)
+        return sorted(w for w in words if not prefix or w.startswith(prefix))[:limit]
+
+    @staticmethod
+    def count_remaining(letter: str, min_len: int, used_words: "UsedWords") -> int:
+        # Number of unused words starting with letter and having at least min_len letters
+        # Read off the index and game letter counts, only the overlay is scanned
+        count = 0
+        if letter in LETTER_INDEX:
+            count = int(Words.index.start_counts(min_len)[LETTER_INDEX[letter]])
+            count -= int(used_words.start_counts(min_len)[LETTER_INDEX[letter]])
+        for w in Words.added:
+            if w[0] == letter and len(w) >= min_len and w.isascii() and w not in used_words:
+                count += 1
+        return count
+
+    @staticmethod
+    def iterkeys(prefix: str = "") -> Iterator[str]:
+        # Words with prefix in Words.dawg.iterkeys order, including the overlay
+        return heapq.merge(Words.dawg.iterkeys(prefix), sorted(w for w in Words.added if w.startswith(prefix)))
+
+    @staticmethod
+    def query(
+        min_len: int = 1,
+        prefix: Optional[str] = None,
+        required_letter: Optional[str] = None,
+        banned_letters: Optional[List[str]] = None,
+        exclude_words: Optional["UsedWords"] = None,
+        answerable: bool = False
+    ) -> Tuple[np.ndarray, List[str]]:
+        # Ids of matching words in the index and matching words in the overlay
+        # answerable only keeps words that players can answer with (see WordIndex.query), as counted by count_remaining
+        ids = Words.index.query(
+            min_len, prefix, required_letter, banned_letters, exclude_words.bitset() if exclude_words else None,
+            answerable
+        )
+        added = [
+            w for w in Words.added
+            if len(w) >= min_len
+            and (not answerable or w.isascii())
+            and (not prefix or w.startswith(prefix))
+            and (not required_letter or required_letter in w)
+            and (not banned_letters or all(c not in w for c in banned_letters))
+            and (not exclude_words or w not in exclude_words)
+        ]
+        return ids, added
+
+
+class UsedWords:
+    # Words used in a game, tracked as a bitset over word ids for candidate exclusion
+    # Used words are also counted in the shape of the index letter-transition table (see WordIndex.transitions)
+    # The bitset and counts are rebuilt from the used words when the dictionary is swapped mid-game
+
+    __slots__ = ("words", "_index", "_bits", "_transitions", "_starts", "_missing")
+
+    def __init__(self) -> None:
+        self.words: List[str] = []
+        self._index: Optional[WordIndex] = None
+        self._bits = np.zeros(0, dtype=np.uint8)
+        self._transitions = np.zeros((0, 0, 0), dtype=np.int32)
+        self._starts = np.zeros((0, 0), dtype=np.int32)
+        self._missing: Set[str] = set()  # Used words not in the current dictionary
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def __contains__(self, word: str) -> bool:
+        self._sync()
+        i = self._index.id(word)
+        if i is None:
+            return word in self._missing
+        return bool(self._bits[i >> 3] >> (i & 7) & 1)
+
+    def _sync(self) -> None:
+        if self._index is Words.index:
+            return
+        self._index = Words.index
+        self._bits = np.zeros((len(self._index) + 7) // 8, dtype=np.uint8)
+        self._transitions = np.zeros(self._index.transitions.shape, dtype=np.int32)
+        self._starts = np.zeros(self._index.start_transitions.shape, dtype=np.int32)
+        self._missing.clear()
+        for word in self.words:
+            self._mark(word)
+
+    def _mark(self, word: str) -> None:
+        i = self._index.id(word)
+        if i is None:
+            self._missing.add(word)
+        else:
+            self._bits[i >> 3] |= 1 << (i & 7)
+            if word.isascii():
+                self._transitions[LETTER_INDEX[word[0]], LETTER_INDEX[word[-1]], :len(word) + 1] += 1
+                self._starts[LETTER_INDEX[word[0]], :len(word) + 1] += 1
+
+    def add(self, word: str) -> None:
+        if word in self:
+            return
+        self.words.append(word)
+        self._mark(word)
+
+    def bitset(self) -> np.ndarray:
+        # Packed bitset over word ids of Words.index
+        self._sync()
+        return self._bits
+
+    def transition_counts(self, min_len: int = 1) -> np.ndarray:
+        # Used words counted like WordIndex.transition_counts
+        self._sync()
+        return self._transitions[:, :, min(max(min_len, 0), self._transitions.shape[2] - 1)]
+
+    def start_counts(self, min_len: int = 1) -> np.ndarray:
+        # Used words counted like WordIndex.start_counts
+        self._sync()
+        return self._starts[:, min(max(min_len, 0), self._starts.shape[1] - 1)]
+
+
+class PrefixSearch:
+    # Paged prefix search over Words.iterkeys
+    # Each cached prefix keeps its iterator so that the next page resumes where the last one stopped
+    # Least recently used prefixes are evicted beyond maxsize, entries expire after ttl seconds
+
+    __slots__ = ("maxsize", "ttl", "_entries")
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # Prefix mapped to [Words.version, expiry time, words found so far, remaining words iterator]
+        self._entries: "OrderedDict[str, List[Any]]" = OrderedDict()
+
+    def page(self, prefix: str, offset: int, limit: int) -> Tuple[List[str], Optional[int]]:
+        # Words for the page and the offset of the next page (None if this is the last page)
+        now = time.monotonic()
+        entry = self._entries.get(prefix)
+        if entry is None or entry[0] != Words.version or entry[1] < now:
+            entry = [Words.version, now + self.ttl, [], Words.iterkeys(prefix)]
+            self._entries[prefix] = entry
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(prefix)
+
+        # One extra word to tell whether there is a next page
+        words, remaining = entry[2], entry[3]
+        if len(words) <= offset + limit:
+            words.extend(islice(remaining, offset + limit + 1 - len(words)))
+        return words[offset:offset + limit], offset + limit if len(words) > offset + limit else None
+
+
+def check_word_existence(word: str) -> bool:
+    return Words.exists(word)
+
+
+def suggestions_text(word: str, prefix: Optional[str] = None) -> str:
+    # Markdown "did you mean" line for a word not in the dictionary, empty if nothing is close
+    suggestions = Words.suggest(word, prefix=prefix)
+    if not suggestions:
+        return ""
+    return f"\nCó phải ý bạn là {', '.join('_' + w.capitalize() + '_' for w in suggestions)}?"
+
+
+def filter_words(
+    min_len: int = 1,
+    prefix: Optional[str] = None,
+    required_letter: Optional[str] = None,
+    banned_letters: Optional[List[str]] = None,
+    exclude_words: Optional[UsedWords] = None
+) -> List[str]:
+    ids, added = Words.query(min_len, prefix, required_letter, banned_letters, exclude_words)
+    # Same order as Words.dawg.keys()
+    return sorted([Words.index.word(i) for i in ids] + added)
+
+
+def get_random_word(
+    min_len: int = 1,
+    prefix: Optional[str] = None,
+    required_letter: Optional[str] = None,
+    banned_letters: Optional[List[str]] = None,
+    exclude_words: Optional[UsedWords] = None,
+    answerable: bool = False  # Only words players can answer with, for the virtual player
+) -> Optional[str]:
+    ids, added = Words.query(min_len, prefix, required_letter, banned_letters, exclude_words, answerable)
+    if not len(ids) and not added:
+        return None
+    i = random.randrange(len(ids) + len(added))
+    return Words.index.word(ids[i]) if i < len(ids) else added[i - len(ids)]
+
+
+def count_words(
+    min_len: int = 1,
+    prefix: Optional[str] = None,
+    required_letter: Optional[str] = None,
+    banned_letters: Optional[List[str]] = None,
+    exclude_words: Optional[UsedWords] = None
+) -> int:
+    # Only words players can answer with, as kept in the counts
+    if prefix and len(prefix) == 1 and not required_letter and not banned_letters and exclude_words is not None:
+        # Counts kept up to date as words are used, no dictionary scan
+        return Words.count_remaining(prefix, min_len, exclude_words)
+    ids, added = Words.query(min_len, prefix, required_letter, banned_letters, exclude_words, answerable=True)
+    return len(ids) + len(added)
 
-        source_task = asyncio.create_task(get_words_from_source())
-        db_task = asyncio.create_task(get_words_from_db())
-        wordlist = await source_task + await db_task
 
-        logger.info("Đang xử lý từ")
+def get_strategic_word(letter: str, min_len: int, exclude_words: UsedWords, difficulty: str) -> Optional[str]:
+    # Virtual player answer starting with letter, choosing the end letter by the replies it leaves the next player
+    # Only the 26x26 letter-transition counts are scored, so the time taken does not depend on the dictionary size
+    if letter not in LETTER_INDEX:
+        return get_random_word(min_len=min_len, prefix=letter, exclude_words=exclude_words, answerable=True)
+    remaining = (
+        Words.index.transition_counts(min_len).astype(np.int64) - exclude_words.transition_counts(min_len)
+    )
+    start = LETTER_INDEX[letter]
+    available = remaining[start]
+    if not available.any():  # Only words added since the last rebuild (if any) are left
+        return get_random_word(min_len=min_len, prefix=letter, exclude_words=exclude_words, answerable=True)
 
-        wordlist = [w.lower() for w in wordlist if w.isalpha()]
-        Words.dawg = CompletionDAWG(wordlist)
-        Words.count = len(Words.dawg.keys())
+    # Words left for the next player by end letter, not counting the answer itself
+    replies = remaining.sum(axis=1)
+    replies[start] -= 1
+    if difficulty == VPDifficulty.HARD:
+        candidates = np.flatnonzero(available > 0)
+        candidates = candidates[replies[candidates] == replies[candidates].min()]
+        end = int(random.choice(candidates))
+    elif difficulty == VPDifficulty.NORMAL:
+        end = random.choices(range(len(available)), weights=available / (replies + 1))[0]
+    else:  # Uniform over valid words
+        end = random.choices(range(len(available)), weights=available)[0]
 
-        logger.info("DAWG updated")
+    i = Words.index.sample_transition(letter, ascii_lowercase[end], min_len, exclude_words.bitset())
+    word = Words.index.word(i) if i is not None else None
+    if not word:
+        return get_random_word(min_len=min_len, prefix=letter, exclude_words=exclude_words, answerable=True)
+    return word
@@ -0,0 +1,115 @@
+# Tests cover the parts of the bot that need neither aiogram nor the database, except game snapshots (see there)
+# The package __init__ connects to Telegram and the database, so the packages are registered without running it
+# and only the tested modules are imported. Run from the repository root, constants are read from config.json
+
+import asyncio
+import selectors
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+
+for name in ("on9wordchainbot", "on9wordchainbot.models"):
+    if name not in sys.modules:
+        package = types.ModuleType(name)
+        package.__path__ = [str(ROOT.joinpath(*name.split(".")))]
+        sys.modules[name] = package
+
+
+class FakePlayer:
+    # Stands in for Player, which needs aiogram
+    def __init__(self, user_id: int, score: int = 0) -> None:
+        self.user_id = user_id
+        self.score = score
+
+    def __repr__(self) -> str:
+        return f"FakePlayer({self.user_id}, {self.score})"
+
+
+class FakeGame:
+    # Stands in for ClassicGame, which needs aiogram
+    def __init__(self, group_id: int, *user_ids: int) -> None:
+        self.group_id = group_id
+        self.players_in_game = [FakePlayer(user_id) for user_id in user_ids]
+        self.data = {}
+        self.stopped = False
+        self.resumed = None
+
+    def snapshot(self):
+        return dict(self.data)
+
+    def restore(self, data) -> None:
+        self.data = data
+
+    def stop(self) -> None:
+        self.stopped = True
+
+    async def main_loop(self, message=None, resume_reason=""):
+        self.resumed = resume_reason
+
+
+class VirtualTimeSelector(selectors.DefaultSelector):
+    # Instead of blocking until the next timer, moves the clock of VirtualTimeLoop forward to it
+    # Every poll also takes a nanosecond, otherwise code waiting for a deadline that rounds to the current time
+    # (such as a token bucket short of a token by a rounding error) would never get there
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.now = 0.0
+
+    def select(self, timeout=None):
+        if timeout is None:  # No timers, only another thread can wake the loop
+            return super().select()
+        self.now += max(timeout, 1e-9)
+        return super().select(0)
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    # Event loop whose clock only moves when every task is waiting, straight to the next timer
+    # Sleeps take no real time and timing is exact to within microseconds, so timing tests neither slow down
+    # nor flake under load
+
+    def __init__(self) -> None:
+        self.clock = VirtualTimeSelector()
+        super().__init__(self.clock)
+
+    def time(self) -> float:
+        return self.clock.now
+
+
+@pytest.fixture
+def run_virtual(monkeypatch):
+    # Runs a coroutine like asyncio.run, on a VirtualTimeLoop
+    # time.monotonic() of the given modules follows the loop clock, the real one is left alone since asyncio uses it
+    def run(coro, *modules):
+        loop = VirtualTimeLoop()
+        for module in modules:
+            monkeypatch.setattr(module, "time", types.SimpleNamespace(monotonic=loop.time))
+        try:
+            return loop.run_until_complete(coro)
+        finally:
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    return run
+
+
+@pytest.fixture
+def use_words():
+    # Serves the dictionary from an index of the given words for the test, without words added since
+    from on9wordchainbot.wordindex import WordIndex
+    from on9wordchainbot.words import Words
+
+    def use(words):
+        Words.added = set()
+        Words.swap(WordIndex.build(words))
+
+    yield use
+    Words.added = set()
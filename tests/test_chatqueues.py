@@ -0,0 +1,149 @@
+import asyncio
+
+from on9wordchainbot.chatqueues import ChatQueues
+
+
+def test_items_of_a_chat_are_handled_in_order_one_at_a_time():
+    async def main():
+        handled = []
+        running = set()
+        overlaps = []
+
+        async def handle(item):
+            chat_id, i = item
+            overlaps.append(chat_id in running)
+            running.add(chat_id)
+            await asyncio.sleep(0.01 if i % 2 else 0)  # Later items must not overtake slow earlier ones
+            running.discard(chat_id)
+            handled.append(item)
+
+        queues = ChatQueues(handle)
+        for i in range(6):
+            queues.put(1, (1, i))
+        await queues.drain(1)
+        return handled, overlaps, queues
+
+    handled, overlaps, queues = asyncio.run(main())
+    assert handled == [(1, i) for i in range(6)]
+    assert not any(overlaps)
+    assert len(queues) == 0
+    assert queues.stats.handled == 6
+
+
+def test_chats_are_handled_in_parallel():
+    async def main():
+        events = []
+
+        async def handle(item):
+            chat_id, i = item
+            events.append(("start", chat_id, i))
+            await asyncio.sleep(0.02)
+            events.append(("end", chat_id, i))
+
+        queues = ChatQueues(handle)
+        queues.put(1, (1, 0))
+        queues.put(2, (2, 0))
+        queues.put(1, (1, 1))
+        await queues.drain(1)
+        return events
+
+    events = asyncio.run(main())
+    # Chat 2 starts before the first item of chat 1 ends, chat 1 still waits for its own first item
+    assert events.index(("start", 2, 0)) < events.index(("end", 1, 0))
+    assert events.index(("end", 1, 0)) < events.index(("start", 1, 1))
+
+
+def test_max_concurrency_bounds_items_handled_at_once():
+    async def main():
+        running = 0
+        peak = 0
+
+        async def handle(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        queues = ChatQueues(handle, max_concurrency=2)
+        for chat_id in range(5):
+            queues.put(chat_id, chat_id)
+        await queues.drain(1)
+        return peak
+
+    assert asyncio.run(main()) == 2
+
+
+def test_full_queue_drops_new_items():
+    async def main():
+        handled = []
+
+        async def handle(item):
+            handled.append(item)
+
+        queues = ChatQueues(handle, max_depth=3)
+        results = [queues.put(1, i) for i in range(5)]
+        assert queues.put(2, "other chat")
+        await queues.drain(1)
+        return results, handled, queues
+
+    results, handled, queues = asyncio.run(main())
+    assert results == [True, True, True, False, False]
+    assert handled == [0, 1, 2, "other chat"]
+    assert queues.chat_stats[1].dropped == 2
+    assert queues.chat_stats[1].max_depth == 3
+    assert queues.stats.dropped == 2
+
+
+def test_items_waiting_too_long_are_dropped():
+    async def main():
+        handled = []
+
+        async def handle(item):
+            await asyncio.sleep(0.05)
+            handled.append(item)
+
+        queues = ChatQueues(handle, max_wait=0.02)
+        for i in range(3):
+            queues.put(1, i)
+        await queues.drain(1)
+        return handled, queues
+
+    handled, queues = asyncio.run(main())
+    assert handled == [0]
+    assert queues.stats.dropped == 2
+
+
+def test_handler_errors_do_not_stop_the_queue():
+    async def main():
+        handled = []
+
+        async def handle(item):
+            if item == 0:
+                raise ValueError
+            handled.append(item)
+
+        queues = ChatQueues(handle)
+        queues.put(1, 0)
+        queues.put(1, 1)
+        await queues.drain(1)
+        return handled
+
+    assert asyncio.run(main()) == [1]
+
+
+def test_chat_stats_keep_recently_active_chats():
+    async def main():
+        async def handle(item):
+            pass
+
+        queues = ChatQueues(handle, stats_size=2)
+        queues.put(1, None)
+        queues.put(2, None)
+        queues.put(1, None)
+        queues.put(3, None)
+        chats = list(queues.chat_stats)
+        await queues.drain(1)
+        return chats
+
+    assert asyncio.run(main()) == [1, 3]
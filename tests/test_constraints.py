@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from on9wordchainbot.constants import VPDifficulty
+from on9wordchainbot.models.constraints import TurnConstraints
+from on9wordchainbot.words import UsedWords, Words, get_strategic_word
+
+# From "a", the only word ending in x leaves no replies, the words ending in y leave many
+WORDS = ["ax", "ay", "aby", "acy", "apply", "yak", "yam", "yes", "yet", "yew", "yo", "yolk", "you", "yule"]
+
+
+@pytest.fixture(autouse=True)
+def words(use_words):
+    use_words(WORDS)
+
+
+def test_rejection_reasons():
+    used = UsedWords()
+    used.add("apply")
+    constraints = TurnConstraints("a", min_len=3, used_words=used, required_letter="c", banned_letters=["b"])
+    assert constraints.rejection_reason("yak") == "_Yak_ không bắt đầu với _A_."
+    assert constraints.rejection_reason("ay") == "_Ay_ có ít hơn 3 letters."
+    assert constraints.rejection_reason("apply") == "_Apply_ đã được dùng."
+    assert constraints.rejection_reason("aply") == (
+        "_Aply_ không có trong danh sách các từ của tôi.\nCó phải ý bạn là _Apply_?"
+    )
+    # Unknown words are reported before banned letters
+    assert constraints.rejection_reason("abzzz") == "_Abzzz_ không có trong danh sách các từ của tôi."
+    assert constraints.rejection_reason("aby") == "_Aby_ chứa các chữ cái bị cấm (B)."
+    assert constraints.rejection_reason("acy") is None
+
+    Words.add_words(["axe"])
+    assert constraints.rejection_reason("axe") == "_Axe_ không bao gồm _C_."
+    assert TurnConstraints("a").rejection_reason("axe") is None
+
+
+def test_hard_leaves_the_fewest_replies():
+    used = UsedWords()
+    assert {get_strategic_word("a", 1, used, VPDifficulty.HARD) for _ in range(20)} == {"ax"}
+    # Next best once ax is used or too short
+    used.add("ax")
+    assert get_strategic_word("a", 1, used, VPDifficulty.HARD) in ("ay", "aby", "acy", "apply")
+    assert get_strategic_word("a", 3, UsedWords(), VPDifficulty.HARD) in ("aby", "acy", "apply")
+
+
+def test_normal_prefers_fewer_replies_and_easy_is_uniform():
+    def end_x_share(difficulty):
+        random.seed(0)
+        picks = [get_strategic_word("a", 2, UsedWords(), difficulty) for _ in range(2000)]
+        assert set(picks) <= {"ax", "ay", "aby", "acy", "apply"}
+        return picks.count("ax") / len(picks)
+
+    # Weights by end letter: x 1 / (0 + 1), y 4 / (9 + 1)
+    assert end_x_share(VPDifficulty.NORMAL) == pytest.approx(1 / 1.4, abs=0.05)
+    # Each of the 5 words equally
+    assert end_x_share(VPDifficulty.EASY) == pytest.approx(1 / 5, abs=0.05)
+
+
+def test_strategic_word_falls_back_to_the_overlay():
+    used = UsedWords()
+    for word in ("ax", "ay", "aby", "acy", "apply"):
+        used.add(word)
+    assert get_strategic_word("a", 1, used, VPDifficulty.HARD) is None
+    Words.add_words(["azo"])
+    assert get_strategic_word("a", 1, used, VPDifficulty.HARD) == "azo"
+
+
+def test_strategic_word_of_constraints_keeps_letter_rules():
+    used = UsedWords()
+    constraints = TurnConstraints("a", used_words=used, banned_letters=["x"])
+    assert {constraints.strategic_word(VPDifficulty.HARD) for _ in range(20)} <= {"ay", "aby", "acy", "apply"}
+    assert TurnConstraints("a", used_words=used).strategic_word(VPDifficulty.HARD) == "ax"
@@ -0,0 +1,142 @@
+import json
+import sys
+import time
+import types
+from datetime import datetime
+
+import pytest
+
+from on9wordchainbot.constants import GameState, VPDifficulty
+from on9wordchainbot.scheduler import Timer
+from on9wordchainbot.wordindex import WordIndex
+from on9wordchainbot.words import Words
+
+# Game modes need aiogram, unlike the rest of the tests
+pytest.importorskip("aiogram")
+pytest.importorskip("aiocache")
+
+GROUP_ID = -100
+VP_ID = 99
+WORDS = ["apple", "egg", "giraffe", "elephant", "tiger", "rabbit", "zebra"]
+
+
+@pytest.fixture(scope="module")
+def game():
+    # The game modes import the bots, the outbox and the timers from the package, which tests do not create
+    # Timers are armed without firing since game loops are not run
+    before = set(sys.modules)
+    with pytest.MonkeyPatch.context() as mp:
+        package = sys.modules["on9wordchainbot"]
+        for name in ("bot", "outbox", "pool", "game_snapshots", "GlobalState"):
+            mp.setattr(package, name, types.SimpleNamespace(), raising=False)
+        mp.setattr(package, "on9bot", types.SimpleNamespace(id=VP_ID), raising=False)
+        mp.setattr(package, "scheduler", types.SimpleNamespace(
+            schedule=lambda delay, callback: Timer(time.monotonic() + delay, callback)
+        ), raising=False)
+        from on9wordchainbot.models import game
+
+        yield game
+        for name in set(sys.modules) - before:
+            del sys.modules[name]
+
+
+@pytest.fixture(autouse=True)
+def words(use_words):
+    use_words(WORDS)
+
+
+def running_game(mode):
+    from on9wordchainbot.models.player import Player
+    from on9wordchainbot.models.roster import TurnQueue
+
+    game = mode(GROUP_ID)
+    game.state = GameState.RUNNING
+    # user_id, username, name, word_count, letter_count, longest_word, score as in Player.snapshot
+    game.players.add(Player.restore([1, "alice", "Alice", 2, 10, "giraffe", 10]))
+    game.players.add(Player.restore([2, None, "Bob", 1, 5, "apple", 5]))
+    game.players.add(Player.restore([VP_ID, "bot", "VP", 1, 3, "egg", 3]))
+    game.players_in_game = TurnQueue(game.players.get(user_id) for user_id in (2, VP_ID, 1))
+    game.start_time = datetime(2026, 10, 17, 12, 30)
+    game.extended_user_ids = {1}
+    game.vp_difficulty = VPDifficulty.HARD
+    game.current_word = "egg"
+    game.longest_word = "giraffe"
+    game.longest_word_sender_id = 1
+    game.turns = 4
+    game.announcement = "<i>Egg</i> được chấp nhận."
+    for word in ("apple", "elephant", "tiger", "egg"):
+        game.used_words.add(word)
+    return game
+
+
+def round_trip(game):
+    # Through JSON as game_snapshots saves them
+    data = json.loads(json.dumps(game.snapshot()))
+    restored = game.__class__(game.group_id)
+    restored.restore(data)
+    return data, restored
+
+
+@pytest.mark.parametrize("mode_name", [
+    "ClassicGame", "HardModeGame", "ChaosGame", "ChosenFirstLetterGame", "RandomFirstLetterGame",
+    "BannedLettersGame", "RequiredLetterGame", "EliminationGame", "MixedEliminationGame"
+])
+def test_running_game_round_trip(game, mode_name):
+    original = running_game(getattr(game, mode_name))
+    data, restored = round_trip(original)
+
+    # The time left of a running turn is not restored, resume gives the current player a full turn
+    del data["time_left"]
+    snapshot = restored.snapshot()
+    del snapshot["time_left"]
+    assert snapshot == data
+    assert [p.user_id for p in restored.players_in_game] == [2, VP_ID, 1]
+    assert restored.players_in_game[1] is restored.players.get(VP_ID) and restored.players.get(VP_ID).is_vp
+    assert restored.players.get(1).name == original.players.get(1).name
+    assert restored.start_time == original.start_time
+    assert list(restored.used_words) == ["apple", "elephant", "tiger", "egg"]
+    assert "tiger" in restored.used_words and "rabbit" not in restored.used_words
+
+
+def test_joining_game_keeps_the_time_left(game):
+    original = game.ClassicGame(GROUP_ID)
+    original.set_timer(42)
+    data, restored = round_trip(original)
+    assert restored.state == GameState.JOINING
+    assert data["time_left"] == 42
+    assert restored.time_left in (41, 42)
+
+
+def test_used_words_survive_a_dictionary_rebuild(game):
+    data = running_game(game.ClassicGame).snapshot()
+    # Word ids change, apple is gone and zebra is new
+    Words.swap(WordIndex.build(["aardvark", "egg", "elephant", "giraffe", "tiger", "zebra"]))
+    restored = game.ClassicGame(GROUP_ID)
+    restored.restore(json.loads(json.dumps(data)))
+    assert list(restored.used_words) == ["apple", "elephant", "tiger", "egg"]
+    assert "apple" in restored.used_words and "tiger" in restored.used_words and "zebra" not in restored.used_words
+    assert restored.used_words.start_counts(1).sum() == 3
+
+
+def test_elimination_round_trip(game):
+    original = running_game(game.EliminationGame)
+    original.round = 3
+    original.turns_until_elimination = 2
+    original.exceeded_score_limit = True
+    _, restored = round_trip(original)
+    assert (restored.round, restored.turns_until_elimination, restored.exceeded_score_limit) == (3, 2, True)
+    # Rebuilt from the saved scores
+    assert [(rank, p.user_id) for rank, p in restored.leaderboard.top(3)] == [(1, 1), (2, 2), (3, VP_ID)]
+
+
+def test_mixed_elimination_round_trip(game):
+    original = running_game(game.MixedEliminationGame)
+    original.game_mode = game.BannedLettersGame
+    original.banned_letters = ["x", "q"]
+    _, restored = round_trip(original)
+    assert restored.game_mode is game.BannedLettersGame
+    assert restored.banned_letters == ["x", "q"]
+
+    original.game_mode = None
+    _, restored = round_trip(original)
+    assert restored.game_mode is None
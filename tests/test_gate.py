@@ -0,0 +1,47 @@
+from conftest import FakeGame
+from on9wordchainbot.gate import UpdateGate
+
+GROUP_ID = -100
+
+
+def group_message(text=None, user_id=1, chat_id=GROUP_ID, key="message", **fields):
+    message = {"chat": {"id": chat_id, "type": "supergroup"}, "from": {"id": user_id}, **fields}
+    if text is not None:
+        message["text"] = text
+    return {"update_id": 1, key: message}
+
+
+def test_commands_pass():
+    gate = UpdateGate({})
+    assert gate(group_message("/startclassic"))
+    assert not gate(group_message("/startclassic", key="edited_message"))
+
+
+def test_answers_of_the_current_player_pass():
+    gate = UpdateGate({GROUP_ID: FakeGame(GROUP_ID, 1, 2)})
+    assert gate(group_message("Apple", user_id=1))
+    assert gate(group_message("apple", user_id=1, key="edited_message"))
+    assert not gate(group_message("apple", user_id=2))  # Not their turn
+    assert not gate(group_message("apple", chat_id=-200))  # No game
+
+
+def test_chatter_is_dropped():
+    gate = UpdateGate({GROUP_ID: FakeGame(GROUP_ID, 1)})
+    assert not gate(group_message("đi"))
+    assert not gate(group_message("123"))
+    assert not gate(group_message(sticker={"file_id": "x"}))
+    assert gate.checked == 3
+    assert gate.dropped == 3
+
+
+def test_new_members_pass():
+    gate = UpdateGate({})
+    assert gate(group_message(new_chat_members=[{"id": 5}]))
+
+
+def test_other_updates_pass():
+    gate = UpdateGate({})
+    private = {"update_id": 1, "message": {"chat": {"id": 1, "type": "private"}, "text": "hi"}}
+    assert gate(private)
+    assert gate({"update_id": 2, "callback_query": {"id": "1"}})
+    assert gate.checked == 0
@@ -0,0 +1,33 @@
+from conftest import FakePlayer
+from on9wordchainbot.models.leaderboard import Leaderboard
+
+
+def test_ranks_by_score_then_user_id():
+    a, b, c, d = FakePlayer(4, 10), FakePlayer(2, 30), FakePlayer(3, 10), FakePlayer(1, 0)
+    leaderboard = Leaderboard([a, b, c, d])
+    assert [p for _, p in leaderboard.top(4)] == [b, c, a, d]
+    assert [leaderboard.rank(p) for p in (b, c, a, d)] == [1, 2, 3, 4]
+    assert leaderboard.bottom(2) == [(3, a), (4, d)]
+    assert leaderboard.window(1, 3) == [(2, c), (3, a)]
+
+
+def test_add_score_reorders():
+    a, b = FakePlayer(1), FakePlayer(2)
+    leaderboard = Leaderboard([a, b])
+    leaderboard.add_score(b, 5)
+    assert a.score == 0 and b.score == 5
+    assert leaderboard.top(2) == [(1, b), (2, a)]
+    leaderboard.add_score(a, 5)
+    assert leaderboard.top(2) == [(1, a), (2, b)]
+
+
+def test_lowest_and_eliminate_lowest():
+    a, b, c = FakePlayer(1, 3), FakePlayer(2, 1), FakePlayer(3, 1)
+    leaderboard = Leaderboard([a, b, c])
+    assert leaderboard.lowest() == [b, c]
+    assert len(leaderboard) == 3  # lowest only peeks
+    assert leaderboard.eliminate_lowest() == [b, c]
+    assert len(leaderboard) == 1
+    assert b not in leaderboard and a in leaderboard
+    assert leaderboard.eliminate_lowest() == [a]
+    assert leaderboard.lowest() == leaderboard.eliminate_lowest() == []
@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+
+from on9wordchainbot import outbox as outbox_module
+from on9wordchainbot.constants import MessagePriority
+from on9wordchainbot.outbox import Outbox, TokenBucket
+
+
+class FloodError(Exception):
+    # Stands in for aiogram's RetryAfter
+    def __init__(self, timeout: float) -> None:
+        super().__init__(f"Retry in {timeout} seconds")
+        self.timeout = timeout
+
+
+def make_outbox(chat_rate=1000.0, chat_burst=1000.0, global_rate=1000.0, global_burst=1000.0):
+    return Outbox(chat_rate, chat_burst, global_rate, global_burst, FloodError)
+
+
+def recorder(sent, name, timed=False):
+    # With timed, records when the message was sent on the virtual clock
+    async def send():
+        sent.append((name, asyncio.get_running_loop().time()) if timed else name)
+        return name
+
+    return send
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=2, capacity=2)
+    now = bucket.updated
+    assert bucket.delay(now) == 0
+    bucket.take()
+    bucket.take()
+    assert bucket.delay(now) == 0.5
+    assert bucket.delay(now + 0.5) == 0
+    bucket.refill(now + 10)
+    assert bucket.tokens == 2  # Capped
+
+
+def test_send_returns_result(run_virtual):
+    async def main():
+        outbox = make_outbox()
+        return await outbox.send(1, recorder([], "hello"))
+
+    assert run_virtual(main(), outbox_module) == "hello"
+
+
+def test_queued_messages_are_sent_by_priority_then_in_order(run_virtual):
+    async def main():
+        outbox = make_outbox(chat_rate=50, chat_burst=1)
+        sent = []
+        await outbox.send(1, recorder(sent, "first"))  # Takes the only token, the rest has to queue
+        outbox.post(1, recorder(sent, "reminder"), MessagePriority.REMINDER)
+        outbox.post(1, recorder(sent, "reply 1"), MessagePriority.REPLY)
+        outbox.post(1, recorder(sent, "game"), MessagePriority.GAME)
+        outbox.post(1, recorder(sent, "reply 2"), MessagePriority.REPLY)
+        outbox.post(1, recorder(sent, "turn"), MessagePriority.TURN)
+        await asyncio.sleep(1)
+        return outbox, sent
+
+    outbox, sent = run_virtual(main(), outbox_module)
+    assert sent == ["first", "turn", "game", "reply 1", "reply 2", "reminder"]
+    assert outbox.stats[MessagePriority.TURN].handled == 1
+    assert len(outbox) == 0
+
+
+def test_chat_rate_limit(run_virtual):
+    async def main():
+        outbox = make_outbox(chat_rate=20, chat_burst=2)
+        sent = []
+        for i in range(6):
+            outbox.post(1, recorder(sent, i, timed=True))
+        outbox.post(2, recorder(sent, "other chat", timed=True))
+        await asyncio.sleep(1)
+        return sent
+
+    times = dict(run_virtual(main(), outbox_module))
+    # A burst of 2, then one message every 1 / 20 seconds
+    assert [times[i] for i in range(6)] == pytest.approx([0, 0, 1 / 20, 2 / 20, 3 / 20, 4 / 20], abs=1e-6)
+    # Other chats have their own limit
+    assert times["other chat"] == pytest.approx(0, abs=1e-6)
+
+
+def test_global_rate_limit(run_virtual):
+    async def main():
+        outbox = make_outbox(global_rate=20, global_burst=1)
+        sent = []
+        for chat_id in range(4):
+            outbox.post(chat_id, recorder(sent, chat_id, timed=True))
+        await asyncio.sleep(1)
+        return sent
+
+    sent = run_virtual(main(), outbox_module)
+    assert len(sent) == 4
+    assert sorted(t for _, t in sent) == pytest.approx([0, 1 / 20, 2 / 20, 3 / 20], abs=1e-6)
+
+
+def test_expired_messages_are_dropped(run_virtual):
+    async def main():
+        outbox = make_outbox(chat_rate=1, chat_burst=1)
+        sent = []
+        outbox.post(1, recorder(sent, "first"))
+        result = await outbox.send(1, recorder(sent, "reminder"), MessagePriority.REMINDER, ttl=0.5)
+        return outbox, sent, result
+
+    outbox, sent, result = run_virtual(main(), outbox_module)
+    assert sent == ["first"]
+    assert result is None
+    assert outbox.stats[MessagePriority.REMINDER].dropped == 1
+
+
+def test_retry_after_pauses_the_chat_and_retries(run_virtual):
+    async def main():
+        outbox = make_outbox()
+        sent = []
+        attempts = 0
+
+        async def flooded():
+            nonlocal attempts
+            attempts += 1
+            if attempts == 1:
+                raise FloodError(5)
+            sent.append(("retried", asyncio.get_running_loop().time()))
+
+        outbox.post(1, flooded)
+        outbox.post(1, recorder(sent, "next", timed=True))
+        outbox.post(2, recorder(sent, "other chat", timed=True))
+        await asyncio.sleep(10)
+        return outbox, sent
+
+    outbox, sent = run_virtual(main(), outbox_module)
+    assert [name for name, _ in sent] == ["other chat", "retried", "next"]
+    assert [t for _, t in sent] == pytest.approx([0, 5, 5], abs=1e-6)
+    assert outbox.retry_afters == 1
+
+
+def test_errors_are_raised_to_the_sender(run_virtual):
+    async def main():
+        outbox = make_outbox()
+
+        async def fail():
+            raise ValueError("bad request")
+
+        try:
+            await outbox.send(1, fail)
+        except ValueError as e:
+            return str(e)
+
+    assert run_virtual(main(), outbox_module) == "bad request"
+
+
+def test_posted_errors_go_to_the_error_handler(run_virtual):
+    async def main():
+        outbox = make_outbox()
+        handled = []
+
+        async def error_handler(chat_id, error):
+            handled.append((chat_id, str(error)))
+
+        async def fail():
+            raise ValueError("migrated")
+
+        outbox.error_handler = error_handler
+        outbox.post(5, fail)
+        await asyncio.sleep(1)
+        return handled
+
+    assert run_virtual(main(), outbox_module) == [(5, "migrated")]
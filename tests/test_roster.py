@@ -0,0 +1,67 @@
+import pytest
+
+from conftest import FakePlayer
+from on9wordchainbot.models.roster import PlayerRegistry, TurnQueue
+
+
+def test_player_registry_keeps_joining_order():
+    players = [FakePlayer(i) for i in (3, 1, 2)]
+    registry = PlayerRegistry()
+    for p in players:
+        registry.add(p)
+    assert list(registry) == players
+    assert 1 in registry and registry.get(1) is players[1]
+    assert registry.remove(1) is players[1]
+    assert registry.remove(1) is None
+    assert list(registry) == [players[0], players[2]]
+
+
+def test_rotate_and_indexing():
+    a, b, c = players = [FakePlayer(i) for i in range(3)]
+    queue = TurnQueue(players)
+    assert list(queue) == [a, b, c]
+    assert queue[0] is a and queue[1] is b and queue[5] is c
+    queue.rotate()
+    assert list(queue) == [b, c, a]
+    queue.append(FakePlayer(9))
+    assert [p.user_id for p in queue] == [1, 2, 0, 9]
+
+
+def test_remove_current_passes_the_turn():
+    a, b, c = players = [FakePlayer(i) for i in range(3)]
+    queue = TurnQueue(players)
+    queue.remove(b)
+    assert list(queue) == [a, c]
+    queue.remove(a)
+    assert list(queue) == [c]
+    assert a not in queue and c in queue
+
+
+def test_pop_current():
+    a, b, c = players = [FakePlayer(i) for i in range(3)]
+    queue = TurnQueue(players)
+    queue.rotate()
+    assert queue.pop_current() is b
+    assert list(queue) == [c, a]
+    assert queue.pop_current() is c
+    assert queue.pop_current() is a
+    assert len(queue) == 0
+    with pytest.raises(IndexError):
+        queue.pop_current()
+    with pytest.raises(IndexError):
+        queue[0]
+
+
+def test_move_to_front_keeps_the_order_of_others():
+    a, b, c, d = players = [FakePlayer(i) for i in range(4)]
+    queue = TurnQueue(players)
+    queue.move_to_front(c)
+    assert list(queue) == [c, a, b, d]
+
+
+def test_random_excludes_player():
+    a, b = players = [FakePlayer(i) for i in range(2)]
+    queue = TurnQueue(players)
+    assert all(queue.random(exclude=a) is b for _ in range(20))
+    queue.remove(b)
+    assert queue.random() is a
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from on9wordchainbot import scheduler as scheduler_module
+from on9wordchainbot.scheduler import DeadlineScheduler
+
+
+def fire_time(fired, name):
+    # Callback recording when it fired on the virtual clock
+    return lambda: fired.append((name, asyncio.get_running_loop().time()))
+
+
+def test_timers_fire_in_deadline_order(run_virtual):
+    async def main():
+        scheduler = DeadlineScheduler()
+        fired = []
+        scheduler.schedule(6, fire_time(fired, "c"))
+        scheduler.schedule(2, fire_time(fired, "a"))
+        scheduler.schedule(4, fire_time(fired, "b"))
+        await asyncio.sleep(10)
+        return scheduler, fired
+
+    scheduler, fired = run_virtual(main(), scheduler_module)
+    assert [name for name, _ in fired] == ["a", "b", "c"]
+    assert [t for _, t in fired] == pytest.approx([2, 4, 6], abs=1e-6)
+    assert scheduler.fired == 3
+    assert scheduler.max_lateness < 1e-6
+    assert len(scheduler) == 0
+
+
+def test_equal_deadlines_fire_in_scheduling_order(run_virtual):
+    async def main():
+        scheduler = DeadlineScheduler()
+        fired = []
+        for i in range(5):
+            scheduler.schedule(1, lambda i=i: fired.append(i))
+        await asyncio.sleep(2)
+        return fired
+
+    assert run_virtual(main(), scheduler_module) == [0, 1, 2, 3, 4]
+
+
+def test_earlier_timer_wakes_the_scheduler(run_virtual):
+    async def main():
+        scheduler = DeadlineScheduler()
+        fired = []
+        scheduler.schedule(100, fire_time(fired, "late"))
+        await asyncio.sleep(0)  # The scheduler now sleeps until the late timer
+        scheduler.schedule(2, fire_time(fired, "early"))
+        await asyncio.sleep(5)
+        return fired
+
+    assert run_virtual(main(), scheduler_module) == [("early", pytest.approx(2, abs=1e-6))]
+
+
+def test_cancelled_timers_do_not_fire(run_virtual):
+    async def main():
+        scheduler = DeadlineScheduler()
+        fired = []
+        timer = scheduler.schedule(2, fire_time(fired, "cancelled"))
+        scheduler.schedule(3, fire_time(fired, "kept"))
+        timer.cancel()
+        await asyncio.sleep(5)
+        return fired
+
+    assert run_virtual(main(), scheduler_module) == [("kept", pytest.approx(3, abs=1e-6))]
+
+
+def test_failing_callback_does_not_stop_later_timers(run_virtual):
+    async def main():
+        scheduler = DeadlineScheduler()
+        fired = []
+        scheduler.schedule(1, lambda: 1 / 0)
+        scheduler.schedule(2, fire_time(fired, "next"))
+        await asyncio.sleep(4)
+        return fired
+
+    assert run_virtual(main(), scheduler_module) == [("next", pytest.approx(2, abs=1e-6))]
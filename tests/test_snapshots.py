@@ -0,0 +1,67 @@
+import asyncio
+import sys
+import types
+
+import pytest
+
+import on9wordchainbot
+from conftest import FakeGame
+from on9wordchainbot.snapshots import GameSnapshots
+
+OLD_GROUP_ID = -100
+NEW_GROUP_ID = -1001
+
+
+@pytest.fixture
+def shards(monkeypatch):
+    # Two shards in one process, sharing GlobalState.games; calls to the other shard are recorded
+    games = {}
+    calls = []
+    snapshots = GameSnapshots(interval=60)
+
+    async def call_shard(shard, method, **kwargs):
+        calls.append((shard, method, kwargs))
+        assert method == "adopt_game"
+        # What handlers.gameplay.adopt_game does on the owning shard
+        game = snapshots.resume(**kwargs, reason="sau khi nhóm được nâng cấp")
+        snapshots.mark(game)
+
+    sharding = types.ModuleType("on9wordchainbot.sharding")
+    sharding.owns_chat = lambda chat_id: chat_id % 2 == 0
+    sharding.shard_of = lambda chat_id: chat_id % 2
+    sharding.call_shard = call_shard
+    monkeypatch.setitem(sys.modules, "on9wordchainbot.sharding", sharding)
+    monkeypatch.setattr(on9wordchainbot, "GlobalState", types.SimpleNamespace(games=games), raising=False)
+    monkeypatch.setattr(sys.modules["on9wordchainbot.models"], "GAME_MODES", (FakeGame,), raising=False)
+    return snapshots, games, calls
+
+
+def test_migrated_game_is_adopted_by_the_owning_shard(shards):
+    snapshots, games, calls = shards
+    game = games[OLD_GROUP_ID] = FakeGame(OLD_GROUP_ID)
+    game.data = {"state": 1, "turns": 7}
+
+    async def main():
+        await snapshots.migrate(OLD_GROUP_ID, NEW_GROUP_ID)
+        await asyncio.sleep(0)  # Let the adopted game loop start
+
+    asyncio.run(main())
+    assert game.stopped
+    assert calls == [(1, "adopt_game", {"group_id": NEW_GROUP_ID, "game_mode": "FakeGame", "data": game.data})]
+    adopted = games[NEW_GROUP_ID]
+    assert adopted is not game and adopted.group_id == NEW_GROUP_ID
+    assert adopted.data == {"state": 1, "turns": 7}
+    assert adopted.resumed == "sau khi nhóm được nâng cấp"
+    assert OLD_GROUP_ID not in games
+    assert snapshots._pending == {OLD_GROUP_ID: None, NEW_GROUP_ID: adopted}
+
+
+def test_migrated_game_stays_on_the_shard_owning_the_new_id(shards):
+    snapshots, games, calls = shards
+    game = games[OLD_GROUP_ID] = FakeGame(OLD_GROUP_ID)
+
+    asyncio.run(snapshots.migrate(OLD_GROUP_ID, NEW_GROUP_ID - 1))
+    assert not game.stopped and not calls
+    assert games == {NEW_GROUP_ID - 1: game}
+    assert game.group_id == NEW_GROUP_ID - 1
+    assert snapshots._pending == {OLD_GROUP_ID: None, NEW_GROUP_ID - 1: game}
@@ -0,0 +1,98 @@
+import json
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from on9wordchainbot import wordindex
+from on9wordchainbot.wordindex import LETTER_INDEX, WordIndex
+
+WORDS = ["apple", "ant", "axe", "abé", "banana", "bee", "bob", "cat", "crab", "éclair", "zebra"]
+
+
+@pytest.fixture
+def index():
+    return WordIndex.build(WORDS, {"source_etag": "etag"})
+
+
+def words(index, ids):
+    return sorted(index.word(i) for i in ids)
+
+
+def test_lookup(index):
+    assert len(index) == len(WORDS)
+    for w in WORDS:
+        assert index.word(index.id(w)) == w
+    assert index.id("nope") is None
+
+
+def test_query_filters(index):
+    assert words(index, index.query(prefix="a")) == ["abé", "ant", "apple", "axe"]
+    assert words(index, index.query(prefix="a", answerable=True)) == ["ant", "apple", "axe"]
+    assert words(index, index.query(min_len=4, prefix="b")) == ["banana"]
+    assert words(index, index.query(prefix="ba")) == ["banana"]
+    assert words(index, index.query(required_letter="r")) == ["crab", "zebra", "éclair"]
+    assert words(index, index.query(banned_letters=["a", "e"])) == ["bob"]
+    assert words(index, index.query(banned_letters=["a", "e"], answerable=True)) == ["bob"]
+    exclude = np.zeros((len(index) + 7) // 8, dtype=np.uint8)
+    i = index.id("ant")
+    exclude[i // 8] |= 1 << (i % 8)
+    assert words(index, index.query(prefix="a", exclude=exclude, answerable=True)) == ["apple", "axe"]
+
+
+def test_query_agrees_with_transition_counts(index):
+    # Both only count words that can be answered, so "abé" and "éclair" are left out of either
+    for letter in "abcz":
+        for min_len in range(1, 7):
+            count = int(index.start_counts(min_len)[LETTER_INDEX[letter]])
+            assert len(index.query(min_len, letter, answerable=True)) == count
+    assert int(index.transition_counts(3)[LETTER_INDEX["b"], LETTER_INDEX["b"]]) == 1  # bob
+
+
+def test_snapshot_round_trip(index, tmp_path):
+    path = str(tmp_path / "dictionary.snapshot")
+    index.save(path)
+    loaded = WordIndex.load(path)
+
+    assert loaded.meta == {"source_etag": "etag"}
+    assert loaded.buckets == index.buckets
+    assert loaded.suggest_depth == index.suggest_depth
+    assert list(loaded.dawg.keys()) == list(index.dawg.keys())
+    for name in ("data", "offsets", "masks", "lengths", "suggest_keys", "suggest_ids", "transitions", "transition_ids"):
+        assert np.array_equal(getattr(loaded, name), getattr(index, name)), name
+    assert [loaded.word(i) for i in range(len(loaded))] == [index.word(i) for i in range(len(index))]
+    assert words(loaded, loaded.query(prefix="c")) == ["cat", "crab"]
+    assert loaded.similar("aple") == index.similar("aple")
+
+
+def test_build_worker_script(tmp_path):
+    # Run the way Words.update runs it, duplicates included
+    words_path = tmp_path / "words"
+    words_path.write_text("".join(w + "\n" for w in WORDS + ["apple"]), encoding="utf-8")
+    path = str(tmp_path / "dictionary.snapshot")
+    result = subprocess.run(
+        [sys.executable, wordindex.__file__, str(words_path), path, json.dumps({"db_count": 1})],
+        stdout=subprocess.PIPE, check=True
+    )
+
+    assert int(result.stdout) > 0
+    loaded = WordIndex.load(path)
+    assert loaded.meta == {"db_count": 1}
+    assert sorted(loaded.word(i) for i in range(len(loaded))) == sorted(WORDS)
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other"
+    path.write_bytes(b"not a snapshot at all")
+    with pytest.raises(ValueError):
+        WordIndex.load(str(path))
+
+
+def test_suggestions_cover_every_word_at_distance_1(monkeypatch):
+    monkeypatch.setattr("on9wordchainbot.wordindex.SUGGEST_MAX_ENTRIES", 10)
+    index = WordIndex.build(WORDS)
+    assert index.suggest_depth == 1
+    # The last words of the index are indexed too
+    assert [index.word(i) for i in index.similar("zebr")[1]] == ["zebra"]
+    assert [index.word(i) for i in index.similar("eclair")[1]] == ["éclair"]
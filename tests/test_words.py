@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from on9wordchainbot.wordindex import LETTER_INDEX, WordIndex
+from on9wordchainbot.words import UsedWords, Words
+
+WORDS = ["apple", "ant", "axe", "abé", "banana", "bee", "éclair", "zebra"]
+
+
+@pytest.fixture(autouse=True)
+def words(use_words):
+    use_words(WORDS)
+
+
+def query(**kwargs):
+    ids, added = Words.query(**kwargs)
+    return sorted([Words.index.word(i) for i in ids] + added)
+
+
+def test_query_keeps_every_word_by_default():
+    # The results of filter_words and get_random_word
+    assert query() == sorted(WORDS)
+    assert query(prefix="a") == ["abé", "ant", "apple", "axe"]
+    assert query(prefix="é") == ["éclair"]
+    assert query(required_letter="b") == ["abé", "banana", "bee", "zebra"]
+    assert query(banned_letters=["p", "x"], prefix="a") == ["abé", "ant"]
+
+
+def test_answerable_query_leaves_out_non_english_letters():
+    # Virtual player answers and remaining word counts
+    assert query(answerable=True) == sorted(w for w in WORDS if w.isascii())
+    assert query(prefix="a", answerable=True) == ["ant", "apple", "axe"]
+    assert query(prefix="é", answerable=True) == []
+    Words.add_words(["abcé", "abc"])
+    assert query(prefix="ab") == ["abc", "abcé", "abé"]
+    assert query(prefix="ab", answerable=True) == ["abc"]
+
+
+def test_added_words_are_served_from_the_overlay():
+    version = Words.version
+    Words.add_words(["ape", "apple", "cab"])  # apple is already in the index
+    assert Words.added == {"ape", "cab"}
+    assert Words.count == len(WORDS) + 2
+    assert Words.version == version + 1
+    assert Words.exists("ape") and Words.exists("apple") and not Words.exists("apes")
+    assert list(Words.iterkeys("ap")) == ["ape", "apple"]
+    assert query(prefix="c") == ["cab"]
+    assert Words.suggest("aple") == ["ape", "apple"]  # From the overlay and the index
+
+
+def test_overlay_is_counted_in_remaining_words():
+    used = UsedWords()
+    assert Words.count_remaining("a", 3, used) == 3  # abé cannot be answered
+    Words.add_words(["ape", "ap"])
+    assert Words.count_remaining("a", 3, used) == 4
+    used.add("ape")
+    used.add("ant")
+    assert Words.count_remaining("a", 3, used) == 2
+
+
+def test_swap_folds_the_overlay_into_the_new_index():
+    used = UsedWords()
+    used.add("apple")
+    used.add("ape")
+    Words.add_words(["ape", "cab"])
+    version = Words.version
+
+    # The rebuild picked up "ape" from the database, "cab" was accepted while it ran
+    Words.swap(WordIndex.build(WORDS + ["ape"]))
+    assert Words.added == {"cab"}
+    assert Words.count == len(WORDS) + 2
+    assert Words.version == version + 1
+    assert Words.exists("ape") and Words.exists("cab")
+    # Used words are tracked over the new word ids
+    assert "apple" in used and "ape" in used and "ant" not in used
+    assert query(prefix="a", exclude_words=used) == ["abé", "ant", "axe"]
+    assert Words.count_remaining("a", 1, used) == 2
+
+
+def test_used_words_are_rebuilt_on_swap():
+    used = UsedWords()
+    for word in ("apple", "bee", "cab"):  # cab is only in the overlay
+        used.add(word)
+    Words.add_words(["cab"])
+    old_index = Words.index
+    assert "cab" in used and "ant" not in used
+
+    # Ids shift since the new index has words sorting before the used ones, and bee is gone
+    Words.swap(WordIndex.build(["aardvark", "abacus", "apple", "ant", "banana", "cab", "zebra"]))
+    new_index = Words.index
+    assert old_index.id("apple") != new_index.id("apple")
+
+    assert list(used) == ["apple", "bee", "cab"]
+    assert "apple" in used and "bee" in used and "cab" in used
+    assert "ant" not in used and "abacus" not in used
+    bits = used.bitset()
+    assert len(bits) == (len(new_index) + 7) // 8
+    marked = [i for i in range(len(new_index)) if bits[i >> 3] >> (i & 7) & 1]
+    assert sorted(new_index.word(i) for i in marked) == ["apple", "cab"]
+    # Counts only cover used words in the new index
+    assert used.transition_counts(1).sum() == 2
+    assert used.start_counts(1)[LETTER_INDEX["a"]] == 1
+    assert used.start_counts(4)[LETTER_INDEX["a"]] == 1 and used.start_counts(6)[LETTER_INDEX["a"]] == 0
+    assert np.array_equal(
+        new_index.transition_counts(1) - used.transition_counts(1),
+        WordIndex.build(["aardvark", "abacus", "ant", "banana", "zebra"]).transition_counts(1)
+    )
+
+    # Bee is counted again once a later dictionary has it, cab is not in this one
+    Words.swap(WordIndex.build(WORDS))
+    used.add("bee")
+    assert list(used) == ["apple", "bee", "cab"]
+    assert used.start_counts(1)[LETTER_INDEX["b"]] == 1
+    assert used.transition_counts(1).sum() == 2